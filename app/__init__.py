@@ -10,6 +10,7 @@ and initializes authentication mechanisms.
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from .socketio import socketio
+from .cli import db_cli
 from app.routes import (
     projects_bp,
     issues_bp,
@@ -17,6 +18,8 @@ from app.routes import (
     users_bp,
     auth_bp,
     notifications_bp,
+    dashboard_bp,
+    ingest_bp,
 )
 
 
@@ -41,5 +44,9 @@ def create_app() -> Flask:
     app.register_blueprint(users_bp, url_prefix="/api/users")
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(notifications_bp, url_prefix="/api/notifications")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+    app.register_blueprint(ingest_bp, url_prefix="/api/ingest")
+
+    app.cli.add_command(db_cli)
 
     return app
@@ -0,0 +1,187 @@
+"""Flask CLI commands.
+
+Registered on the app by `create_app`, for example:
+
+    flask --app flytrap db upgrade
+    flask --app flytrap db status
+    flask --app flytrap db partitions
+    flask --app flytrap db archive
+    flask --app flytrap db seed --errors 1000000
+"""
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from db import (
+    init_db_pool,
+    get_db_connection_from_pool,
+    return_db_connection_to_pool,
+)
+from app.migrations import apply_migrations, migration_status
+from app.utils.archive import archive_issues
+from app.utils.partitions import maintain_partitions
+from app.utils.synthetic_data import seed_synthetic_data
+
+db_cli = AppGroup("db", help="Manage the database schema.")
+
+
+@db_cli.command("upgrade")
+@click.option("--target", type=int, default=None, help="Stop after this version.")
+def upgrade_command(target: int) -> None:
+    """Applies pending schema migrations."""
+    init_db_pool(current_app)
+    connection = get_db_connection_from_pool()
+    try:
+        applied = apply_migrations(connection, target, log=click.echo)
+    finally:
+        return_db_connection_to_pool(connection)
+
+    if applied:
+        click.echo(f"Applied {len(applied)} migration(s).")
+    else:
+        click.echo("Database schema is up to date.")
+
+
+@db_cli.command("status")
+def status_command() -> None:
+    """Lists schema migrations and whether they have been applied."""
+    init_db_pool(current_app)
+    connection = get_db_connection_from_pool()
+    try:
+        migrations = migration_status(connection)
+    finally:
+        return_db_connection_to_pool(connection)
+
+    for migration in migrations:
+        state = "applied" if migration["applied"] else "pending"
+        click.echo(f"{migration['version']:04d} {migration['name']}: {state}")
+
+
+@db_cli.command("partitions")
+def partitions_command() -> None:
+    """Pre-creates log partitions and enforces issue retention.
+
+    Meant to run periodically (e.g. daily from cron).
+    """
+    init_db_pool(current_app)
+    connection = get_db_connection_from_pool()
+    try:
+        summary = maintain_partitions(
+            connection,
+            interval=current_app.config.get("ISSUE_PARTITION_INTERVAL", "month"),
+            premake=current_app.config.get("ISSUE_PARTITION_PREMAKE", 3),
+            retention_days=current_app.config.get("ISSUE_RETENTION_DAYS"),
+            log=click.echo,
+        )
+    finally:
+        return_db_connection_to_pool(connection)
+
+    click.echo(
+        f"Created {summary['created']} partition(s), dropped {summary['dropped']} "
+        f"and deleted {summary['deleted']} expired issue(s)."
+    )
+
+
+@db_cli.command("archive")
+@click.option(
+    "--older-than",
+    type=int,
+    default=None,
+    help="Archive issues older than this many days (default: ARCHIVE_AFTER_DAYS).",
+)
+def archive_command(older_than: int) -> None:
+    """Moves old issues into the compressed on-disk archive.
+
+    Meant to run periodically (e.g. daily from cron).
+    """
+    archive_dir = current_app.config.get("ARCHIVE_DIR")
+    if older_than is None:
+        older_than = current_app.config.get("ARCHIVE_AFTER_DAYS")
+    if not archive_dir or older_than is None:
+        raise click.UsageError(
+            "Set ARCHIVE_DIR and ARCHIVE_AFTER_DAYS (or pass --older-than)."
+        )
+
+    init_db_pool(current_app)
+    connection = get_db_connection_from_pool()
+    try:
+        summary = archive_issues(
+            connection,
+            archive_dir,
+            older_than,
+            batch_size=current_app.config.get("ARCHIVE_BATCH_SIZE", 5000),
+            log=click.echo,
+        )
+    finally:
+        return_db_connection_to_pool(connection)
+
+    click.echo(
+        f"Archived {summary['error']} error(s) and "
+        f"{summary['rejection']} rejection(s)."
+    )
+
+
+@db_cli.command("seed")
+@click.option("--projects", type=int, default=10, show_default=True)
+@click.option("--users", type=int, default=50, show_default=True)
+@click.option("--errors", type=int, default=100_000, show_default=True)
+@click.option("--rejections", type=int, default=20_000, show_default=True)
+@click.option(
+    "--days", type=int, default=30, show_default=True, help="Spread issues over."
+)
+@click.option(
+    "--groups",
+    type=int,
+    default=500,
+    show_default=True,
+    help="Error groups per project.",
+)
+@click.option("--seed", type=int, default=None, help="Seed for reproducible data.")
+@click.option(
+    "--batch-size", type=int, default=250_000, show_default=True, help="Rows per COPY."
+)
+def seed_command(
+    projects: int,
+    users: int,
+    errors: int,
+    rejections: int,
+    days: int,
+    groups: int,
+    seed: int,
+    batch_size: int,
+) -> None:
+    """Loads realistic synthetic projects, users and issues.
+
+    Meant for development and benchmark databases: the log tables are locked and
+    their indexes rebuilt while the data loads.
+    """
+    if current_app.config["ENVIRONMENT"] == "production":
+        raise click.UsageError("Refusing to seed a production database.")
+    if min(projects, users, groups, days) < 1 or min(errors, rejections) < 0:
+        raise click.UsageError(
+            "--projects, --users, --groups and --days must be positive."
+        )
+
+    init_db_pool(current_app)
+    connection = get_db_connection_from_pool()
+    try:
+        summary = seed_synthetic_data(
+            connection,
+            projects,
+            users,
+            errors,
+            rejections,
+            days=days,
+            groups=groups,
+            seed=seed,
+            batch_size=batch_size,
+            interval=current_app.config.get("ISSUE_PARTITION_INTERVAL", "month"),
+            log=click.echo,
+        )
+    finally:
+        return_db_connection_to_pool(connection)
+
+    click.echo(
+        f"Added {summary['errors']} error(s) and {summary['rejections']} "
+        f"rejection(s) to {summary['projects']} project(s)."
+    )
@@ -0,0 +1,219 @@
+"""Versioned schema migrations.
+
+Each module in `app.migrations.versions` defines a `VERSION` number, a `NAME`, a
+`TRANSACTIONAL` flag and an `upgrade(cursor)` function. Applied versions are
+recorded in the `schema_migrations` table; `schema.sql` always describes the latest
+schema and records every shipped version as applied.
+
+Transactional migrations run in a single transaction together with their
+bookkeeping row. Non-transactional ones run in autocommit mode so they can use
+statements such as `CREATE INDEX CONCURRENTLY`, and must therefore be safe to re-run
+after a partial failure.
+"""
+
+import importlib
+import pkgutil
+from types import ModuleType
+from typing import Callable, List, Optional, Set
+from psycopg2.extensions import connection as Connection, cursor as Cursor
+
+# Arbitrary key for the advisory lock that keeps concurrent runners apart
+MIGRATION_LOCK_KEY = 74_616_001
+
+
+def load_migrations() -> List[ModuleType]:
+    """Imports every migration module, ordered by version."""
+    from . import versions
+
+    migrations = [
+        importlib.import_module(f"{versions.__name__}.{module.name}")
+        for module in pkgutil.iter_modules(versions.__path__)
+    ]
+    migrations.sort(key=lambda migration: migration.VERSION)
+
+    seen = set()
+    for migration in migrations:
+        if migration.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version: {migration.VERSION}")
+        seen.add(migration.VERSION)
+
+    return migrations
+
+
+def ensure_migrations_table(cursor: Cursor) -> None:
+    """Creates the bookkeeping table on databases that predate migrations."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version INT PRIMARY KEY,
+          name VARCHAR(255) NOT NULL,
+          applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def fetch_applied_versions(cursor: Cursor) -> Set[int]:
+    """Returns the versions recorded in `schema_migrations`."""
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(
+    connection: Connection,
+    target: Optional[int] = None,
+    log: Callable[[str], None] = print,
+) -> List[int]:
+    """Applies pending migrations up to `target` (or all of them) in order.
+
+    Returns the versions that were applied.
+    """
+    previous_autocommit = connection.autocommit
+    connection.autocommit = True
+    cursor = connection.cursor()
+    applied = []
+
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [MIGRATION_LOCK_KEY])
+        try:
+            ensure_migrations_table(cursor)
+            done = fetch_applied_versions(cursor)
+
+            for migration in load_migrations():
+                if migration.VERSION in done:
+                    continue
+                if target is not None and migration.VERSION > target:
+                    break
+
+                log(f"Applying migration {migration.VERSION}: {migration.NAME}")
+                run_migration(cursor, migration)
+                applied.append(migration.VERSION)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_KEY])
+    finally:
+        cursor.close()
+        connection.autocommit = previous_autocommit
+
+    return applied
+
+
+def run_migration(cursor: Cursor, migration: ModuleType) -> None:
+    """Runs one migration and records it as applied."""
+    record_query = "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)"
+
+    if not migration.TRANSACTIONAL:
+        migration.upgrade(cursor)
+        cursor.execute(record_query, [migration.VERSION, migration.NAME])
+        return
+
+    cursor.execute("BEGIN")
+    try:
+        migration.upgrade(cursor)
+        cursor.execute(record_query, [migration.VERSION, migration.NAME])
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def migration_status(connection: Connection) -> List[dict]:
+    """Lists every known migration and whether it has been applied."""
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        done = fetch_applied_versions(cursor)
+        connection.commit()
+    finally:
+        cursor.close()
+
+    return [
+        {
+            "version": migration.VERSION,
+            "name": migration.NAME,
+            "applied": migration.VERSION in done,
+        }
+        for migration in load_migrations()
+    ]
+
+
+def is_partitioned(cursor: Cursor, table: str) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+    row = cursor.fetchone()
+    return bool(row) and row[0] in ("p", "I")
+
+
+def create_index_concurrently(
+    cursor: Cursor, name: str, table: str, definition: str, unique: bool = False
+) -> None:
+    """Builds an index without blocking writes.
+
+    A valid index with the same name is left in place. An invalid one, left behind
+    by an interrupted build, is dropped and rebuilt. Must run outside a transaction.
+
+    Partitioned tables cannot be indexed concurrently, so the index is created on
+    the parent alone, built concurrently on each partition and then attached. The
+    parent index becomes valid once every partition has been attached, and an
+    interrupted build resumes with the partitions that are still missing.
+    """
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+
+    cursor.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [name]
+    )
+    existing = cursor.fetchone()
+
+    if existing and existing[0]:
+        return
+
+    if is_partitioned(cursor, table):
+        cursor.execute(
+            f"CREATE {kind} IF NOT EXISTS {name} ON ONLY {table} {definition}"
+        )
+        cursor.execute(
+            """
+            SELECT c.relname,
+              EXISTS (
+                SELECT 1 FROM pg_inherits ii
+                JOIN pg_index x ON x.indexrelid = ii.inhrelid
+                WHERE ii.inhparent = to_regclass(%s) AND x.indrelid = c.oid
+              )
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [name, table],
+        )
+        for partition, attached in cursor.fetchall():
+            if attached:
+                continue
+            child = f"{name}_{partition.removeprefix(table + '_')}"
+            create_index_concurrently(cursor, child, partition, definition, unique)
+            cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+        return
+
+    if existing:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    cursor.execute(f"CREATE {kind} CONCURRENTLY {name} ON {table} {definition}")
+
+
+def drop_index_concurrently(cursor: Cursor, name: str) -> None:
+    """Drops an index, if it exists, without blocking reads or writes.
+
+    Indexes on partitioned tables cannot be dropped concurrently; they are dropped
+    with a brief lock instead.
+    """
+    if is_partitioned(cursor, name):
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    else:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+__all__ = [
+    "load_migrations",
+    "apply_migrations",
+    "migration_status",
+    "create_index_concurrently",
+    "drop_index_concurrently",
+    "is_partitioned",
+]
@@ -0,0 +1 @@
+"""Migration modules, named `vNNNN_<name>.py` and applied in version order."""
@@ -0,0 +1,62 @@
+"""Composite and covering indexes for the issue list, count and group queries.
+
+- Issue pages, summaries and most-recent lookups walk `(project_id, created_at,
+  uuid)`; `handled` and `resolved` are included so the merged page is index-only.
+- Filtered counts range-scan `(project_id, handled, resolved, created_at)`.
+- Exact distinct-user counts read `ip` from the error-hash index.
+- Project membership lookups by user get their own index.
+- Plain `uuid` indexes duplicate the indexes behind the UNIQUE constraints.
+"""
+
+from app.migrations import create_index_concurrently, drop_index_concurrently
+
+VERSION = 1
+NAME = "hot_path_indexes"
+TRANSACTIONAL = False
+
+
+def upgrade(cursor) -> None:
+    create_index_concurrently(
+        cursor,
+        "idx_error_log_project_recent",
+        "error_logs",
+        "(project_id, created_at DESC, uuid DESC) INCLUDE (handled, resolved)",
+    )
+    create_index_concurrently(
+        cursor,
+        "idx_rejection_log_project_recent",
+        "rejection_logs",
+        "(project_id, created_at DESC, uuid DESC) INCLUDE (handled, resolved)",
+    )
+    create_index_concurrently(
+        cursor,
+        "idx_error_log_project_state",
+        "error_logs",
+        "(project_id, handled, resolved, created_at DESC)",
+    )
+    create_index_concurrently(
+        cursor,
+        "idx_rejection_log_project_state",
+        "rejection_logs",
+        "(project_id, handled, resolved, created_at DESC)",
+    )
+    create_index_concurrently(
+        cursor,
+        "idx_error_log_project_hash_ip",
+        "error_logs",
+        "(project_id, error_hash, created_at DESC) INCLUDE (ip)",
+    )
+    create_index_concurrently(
+        cursor,
+        "idx_projects_users_user",
+        "projects_users",
+        "(user_id, project_id)",
+    )
+
+    for name in [
+        "idx_error_log_uuid",
+        "idx_rejection_log_uuid",
+        "idx_project_uuid",
+        "idx_user_uuid",
+    ]:
+        drop_index_concurrently(cursor, name)
@@ -0,0 +1,506 @@
+"""Maintain error groups, distinct-user sketches, issue counters and hourly rollups.
+
+Creates `error_groups`, `error_group_hourly_sketches`, `project_issue_counters` and
+`issue_rollups` together with the HyperLogLog helper functions and the
+statement-level triggers that keep them current as issues are written.
+
+The triggers are installed first, so every write from then on is counted. Each
+project is then recomputed from its logs in its own short transaction, which
+replaces whatever the triggers counted for it so far. The log tables are locked
+against writes (reads go on) only while one project is recomputed. Rerunning the
+migration recomputes every project again.
+"""
+
+VERSION = 2
+NAME = "issue_aggregates"
+TRANSACTIONAL = False
+
+CREATE_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION hll_empty() RETURNS bytea AS $$
+      SELECT decode(repeat('00', 1024), 'hex');
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hll_register(value text) RETURNS int AS $$
+      SELECT substring(('x' || substr(md5(value), 1, 16))::bit(64) FROM 1 FOR 10)::int;
+    $$ LANGUAGE sql IMMUTABLE STRICT
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hll_rank(value text) RETURNS int AS $$
+      SELECT COALESCE(
+        NULLIF(
+          position(
+            B'1' IN substring(('x' || substr(md5(value), 1, 16))::bit(64) FROM 11)
+          ),
+          0
+        ),
+        55
+      );
+    $$ LANGUAGE sql IMMUTABLE STRICT
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hll_set_registers(
+      sketch bytea, registers int[], ranks int[]
+    ) RETURNS bytea AS $$
+    DECLARE
+      result bytea := COALESCE(sketch, hll_empty());
+    BEGIN
+      FOR i IN 1 .. COALESCE(array_length(registers, 1), 0) LOOP
+        IF get_byte(result, registers[i]) < ranks[i] THEN
+          result := set_byte(result, registers[i], ranks[i]);
+        END IF;
+      END LOOP;
+
+      RETURN result;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hour_bucket(ts timestamptz) RETURNS timestamptz AS $$
+      SELECT date_trunc('hour', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION error_groups_after_insert() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO error_groups AS g (
+        project_id, error_hash, first_seen, last_seen, occurrences,
+        unresolved_occurrences, representative_uuid
+      )
+      SELECT
+        project_id,
+        error_hash,
+        MIN(created_at),
+        MAX(created_at),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE NOT resolved),
+        (ARRAY_AGG(uuid ORDER BY created_at DESC, uuid DESC))[1]
+      FROM new_rows
+      WHERE project_id IS NOT NULL AND error_hash IS NOT NULL
+      GROUP BY project_id, error_hash
+      ON CONFLICT (project_id, error_hash) DO UPDATE SET
+        first_seen = LEAST(g.first_seen, EXCLUDED.first_seen),
+        last_seen = GREATEST(g.last_seen, EXCLUDED.last_seen),
+        occurrences = g.occurrences + EXCLUDED.occurrences,
+        unresolved_occurrences =
+          g.unresolved_occurrences + EXCLUDED.unresolved_occurrences,
+        representative_uuid = CASE
+          WHEN EXCLUDED.last_seen >= g.last_seen THEN EXCLUDED.representative_uuid
+          ELSE g.representative_uuid
+        END;
+
+      -- Fold the new IPs into the distinct-user sketches. Only the registers that
+      -- the batch raises are touched.
+      UPDATE error_groups g
+      SET ip_sketch = hll_set_registers(g.ip_sketch, r.registers, r.ranks)
+      FROM (
+        SELECT project_id, error_hash, ARRAY_AGG(register) AS registers,
+          ARRAY_AGG(rank) AS ranks
+        FROM (
+          SELECT project_id, error_hash, hll_register(ip) AS register,
+            MAX(hll_rank(ip)) AS rank
+          FROM new_rows
+          WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+          GROUP BY 1, 2, 3
+        ) per_register
+        GROUP BY 1, 2
+      ) r
+      WHERE g.project_id = r.project_id AND g.error_hash = r.error_hash;
+
+      INSERT INTO error_group_hourly_sketches (project_id, error_hash, bucket)
+      SELECT DISTINCT project_id, error_hash, hour_bucket(created_at)
+      FROM new_rows
+      WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+      ON CONFLICT DO NOTHING;
+
+      UPDATE error_group_hourly_sketches s
+      SET ip_sketch = hll_set_registers(s.ip_sketch, r.registers, r.ranks)
+      FROM (
+        SELECT project_id, error_hash, bucket, ARRAY_AGG(register) AS registers,
+          ARRAY_AGG(rank) AS ranks
+        FROM (
+          SELECT project_id, error_hash, hour_bucket(created_at) AS bucket,
+            hll_register(ip) AS register, MAX(hll_rank(ip)) AS rank
+          FROM new_rows
+          WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+          GROUP BY 1, 2, 3, 4
+        ) per_register
+        GROUP BY 1, 2, 3
+      ) r
+      WHERE s.project_id = r.project_id
+        AND s.error_hash = r.error_hash
+        AND s.bucket = r.bucket;
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION error_groups_after_update() RETURNS trigger AS $$
+    BEGIN
+      UPDATE error_groups g
+      SET unresolved_occurrences = g.unresolved_occurrences + d.delta
+      FROM (
+        SELECT
+          n.project_id,
+          n.error_hash,
+          SUM((NOT n.resolved)::int - (NOT o.resolved)::int) AS delta
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n.resolved IS DISTINCT FROM o.resolved AND n.error_hash IS NOT NULL
+        GROUP BY n.project_id, n.error_hash
+      ) d
+      WHERE g.project_id = d.project_id AND g.error_hash = d.error_hash;
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION error_groups_after_delete() RETURNS trigger AS $$
+    BEGIN
+      UPDATE error_groups g
+      SET
+        occurrences = g.occurrences - d.occurrences,
+        unresolved_occurrences = g.unresolved_occurrences - d.unresolved_occurrences
+      FROM (
+        SELECT
+          project_id,
+          error_hash,
+          COUNT(*) AS occurrences,
+          COUNT(*) FILTER (WHERE NOT resolved) AS unresolved_occurrences
+        FROM old_rows
+        WHERE project_id IS NOT NULL AND error_hash IS NOT NULL
+        GROUP BY project_id, error_hash
+      ) d
+      WHERE g.project_id = d.project_id AND g.error_hash = d.error_hash;
+
+      DELETE FROM error_groups g
+      USING (SELECT DISTINCT project_id, error_hash FROM old_rows) d
+      WHERE g.project_id = d.project_id
+        AND g.error_hash = d.error_hash
+        AND g.occurrences <= 0;
+
+      -- Groups that lost their newest or oldest row are re-pointed with two index
+      -- probes on (project_id, error_hash, created_at).
+      WITH affected AS (
+        SELECT DISTINCT g.project_id, g.error_hash
+        FROM error_groups g
+        JOIN old_rows o
+          ON o.project_id = g.project_id AND o.error_hash = g.error_hash
+        WHERE o.uuid = g.representative_uuid OR o.created_at <= g.first_seen
+      )
+      UPDATE error_groups g
+      SET
+        representative_uuid = latest.uuid,
+        last_seen = latest.created_at,
+        first_seen = earliest.created_at
+      FROM affected a
+      CROSS JOIN LATERAL (
+        SELECT e.uuid, e.created_at
+        FROM error_logs e
+        WHERE e.project_id = a.project_id AND e.error_hash = a.error_hash
+        ORDER BY e.created_at DESC, e.uuid DESC
+        LIMIT 1
+      ) latest
+      CROSS JOIN LATERAL (
+        SELECT e.created_at
+        FROM error_logs e
+        WHERE e.project_id = a.project_id AND e.error_hash = a.error_hash
+        ORDER BY e.created_at
+        LIMIT 1
+      ) earliest
+      WHERE g.project_id = a.project_id AND g.error_hash = a.error_hash;
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION issue_counts_after_change() RETURNS trigger AS $$
+    DECLARE
+      project_ids int[];
+      buckets timestamptz[];
+      handled_values boolean[];
+      resolved_values boolean[];
+      deltas bigint[];
+    BEGIN
+      IF TG_OP = 'INSERT' THEN
+        SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+          ARRAY_AGG(resolved), ARRAY_AGG(delta)
+        INTO project_ids, buckets, handled_values, resolved_values, deltas
+        FROM (
+          SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+            COUNT(*) AS delta
+          FROM new_rows
+          GROUP BY 1, 2, 3, 4
+        ) d;
+      ELSIF TG_OP = 'DELETE' THEN
+        SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+          ARRAY_AGG(resolved), ARRAY_AGG(delta)
+        INTO project_ids, buckets, handled_values, resolved_values, deltas
+        FROM (
+          SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+            -COUNT(*) AS delta
+          FROM old_rows
+          GROUP BY 1, 2, 3, 4
+        ) d;
+      ELSE
+        SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+          ARRAY_AGG(resolved), ARRAY_AGG(delta)
+        INTO project_ids, buckets, handled_values, resolved_values, deltas
+        FROM (
+          SELECT project_id, bucket, handled, resolved, SUM(delta) AS delta
+          FROM (
+            SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+              1 AS delta
+            FROM new_rows
+            UNION ALL
+            SELECT project_id, hour_bucket(created_at), handled, resolved, -1
+            FROM old_rows
+          ) changes
+          GROUP BY 1, 2, 3, 4
+          HAVING SUM(delta) <> 0
+        ) d;
+      END IF;
+
+      -- Rows removed along with their project have nothing left to count against.
+      INSERT INTO project_issue_counters AS c (
+        project_id, issue_type, handled, resolved, issue_count
+      )
+      SELECT d.project_id, TG_ARGV[0], d.handled, d.resolved, SUM(d.delta)
+      FROM unnest(project_ids, handled_values, resolved_values, deltas)
+        AS d(project_id, handled, resolved, delta)
+      JOIN projects p ON p.id = d.project_id
+      GROUP BY 1, 2, 3, 4
+      ORDER BY 1, 2, 3, 4
+      ON CONFLICT (project_id, issue_type, handled, resolved) DO UPDATE SET
+        issue_count = c.issue_count + EXCLUDED.issue_count;
+
+      INSERT INTO issue_rollups AS r (
+        project_id, bucket, issue_type, handled, resolved, issue_count
+      )
+      SELECT d.project_id, d.bucket, TG_ARGV[0], d.handled, d.resolved, d.delta
+      FROM unnest(project_ids, buckets, handled_values, resolved_values, deltas)
+        AS d(project_id, bucket, handled, resolved, delta)
+      JOIN projects p ON p.id = d.project_id
+      ORDER BY 1, 2, 3, 4, 5
+      ON CONFLICT (project_id, bucket, issue_type, handled, resolved) DO UPDATE SET
+        issue_count = r.issue_count + EXCLUDED.issue_count;
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+CREATE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS error_groups (
+      project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+      error_hash VARCHAR(64) NOT NULL,
+      first_seen TIMESTAMPTZ NOT NULL,
+      last_seen TIMESTAMPTZ NOT NULL,
+      occurrences BIGINT NOT NULL DEFAULT 0,
+      unresolved_occurrences BIGINT NOT NULL DEFAULT 0,
+      resolved BOOLEAN GENERATED ALWAYS AS (unresolved_occurrences = 0) STORED,
+      representative_uuid VARCHAR(36) NOT NULL,
+      ip_sketch BYTEA NOT NULL DEFAULT hll_empty(),
+      PRIMARY KEY (project_id, error_hash)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_error_group_last_seen
+      ON error_groups(project_id, last_seen DESC, error_hash DESC)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS error_group_hourly_sketches (
+      project_id INT NOT NULL,
+      error_hash VARCHAR(64) NOT NULL,
+      bucket TIMESTAMPTZ NOT NULL,
+      ip_sketch BYTEA NOT NULL DEFAULT hll_empty(),
+      PRIMARY KEY (project_id, error_hash, bucket),
+      FOREIGN KEY (project_id, error_hash)
+        REFERENCES error_groups(project_id, error_hash) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS project_issue_counters (
+      project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+      issue_type VARCHAR(9) NOT NULL,
+      handled BOOLEAN NOT NULL,
+      resolved BOOLEAN NOT NULL,
+      issue_count BIGINT NOT NULL DEFAULT 0,
+      PRIMARY KEY (project_id, issue_type, handled, resolved)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS issue_rollups (
+      project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+      bucket TIMESTAMPTZ NOT NULL,
+      issue_type VARCHAR(9) NOT NULL,
+      handled BOOLEAN NOT NULL,
+      resolved BOOLEAN NOT NULL,
+      issue_count BIGINT NOT NULL DEFAULT 0,
+      PRIMARY KEY (project_id, bucket, issue_type, handled, resolved)
+    )
+    """,
+]
+
+# Table -> triggers as (name, event, function)
+TABLES = {
+    "error_logs": [
+        ("error_groups_insert", "INSERT", "error_groups_after_insert()"),
+        ("error_groups_update", "UPDATE", "error_groups_after_update()"),
+        ("error_groups_delete", "DELETE", "error_groups_after_delete()"),
+        ("error_counts_insert", "INSERT", "issue_counts_after_change('error')"),
+        ("error_counts_update", "UPDATE", "issue_counts_after_change('error')"),
+        ("error_counts_delete", "DELETE", "issue_counts_after_change('error')"),
+    ],
+    "rejection_logs": [
+        ("rejection_counts_insert", "INSERT", "issue_counts_after_change('rejection')"),
+        ("rejection_counts_update", "UPDATE", "issue_counts_after_change('rejection')"),
+        ("rejection_counts_delete", "DELETE", "issue_counts_after_change('rejection')"),
+    ],
+}
+
+TRANSITION_TABLES = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+# Run for one project at a time; deleting its groups also deletes their hourly
+# sketches.
+RECOMPUTE_GROUPS = [
+    "DELETE FROM error_groups WHERE project_id = %(project_id)s",
+    """
+    INSERT INTO error_groups (
+      project_id, error_hash, first_seen, last_seen, occurrences,
+      unresolved_occurrences, representative_uuid
+    )
+    SELECT
+      project_id,
+      error_hash,
+      MIN(created_at),
+      MAX(created_at),
+      COUNT(*),
+      COUNT(*) FILTER (WHERE NOT resolved),
+      (ARRAY_AGG(uuid ORDER BY created_at DESC, uuid DESC))[1]
+    FROM error_logs
+    WHERE project_id = %(project_id)s AND error_hash IS NOT NULL
+    GROUP BY project_id, error_hash
+    """,
+    """
+    UPDATE error_groups g
+    SET ip_sketch = hll_set_registers(g.ip_sketch, r.registers, r.ranks)
+    FROM (
+      SELECT project_id, error_hash, ARRAY_AGG(register) AS registers,
+        ARRAY_AGG(rank) AS ranks
+      FROM (
+        SELECT project_id, error_hash, hll_register(ip) AS register,
+          MAX(hll_rank(ip)) AS rank
+        FROM error_logs
+        WHERE project_id = %(project_id)s
+          AND error_hash IS NOT NULL
+          AND ip IS NOT NULL
+        GROUP BY 1, 2, 3
+      ) per_register
+      GROUP BY 1, 2
+    ) r
+    WHERE g.project_id = r.project_id AND g.error_hash = r.error_hash
+    """,
+    """
+    INSERT INTO error_group_hourly_sketches (
+      project_id, error_hash, bucket, ip_sketch
+    )
+    SELECT project_id, error_hash, bucket,
+      hll_set_registers(hll_empty(), ARRAY_AGG(register), ARRAY_AGG(rank))
+    FROM (
+      SELECT project_id, error_hash, hour_bucket(created_at) AS bucket,
+        hll_register(ip) AS register, MAX(hll_rank(ip)) AS rank
+      FROM error_logs
+      WHERE project_id = %(project_id)s
+        AND error_hash IS NOT NULL
+        AND ip IS NOT NULL
+      GROUP BY 1, 2, 3, 4
+    ) per_register
+    GROUP BY 1, 2, 3
+    """,
+]
+
+RECOMPUTE_COUNTS = [
+    "DELETE FROM project_issue_counters WHERE project_id = %(project_id)s",
+    "DELETE FROM issue_rollups WHERE project_id = %(project_id)s",
+    """
+    INSERT INTO issue_rollups (
+      project_id, bucket, issue_type, handled, resolved, issue_count
+    )
+    SELECT project_id, hour_bucket(created_at), 'error', handled, resolved,
+      COUNT(*)
+    FROM error_logs
+    WHERE project_id = %(project_id)s
+    GROUP BY 1, 2, 4, 5
+    UNION ALL
+    SELECT project_id, hour_bucket(created_at), 'rejection', handled, resolved,
+      COUNT(*)
+    FROM rejection_logs
+    WHERE project_id = %(project_id)s
+    GROUP BY 1, 2, 4, 5
+    """,
+    """
+    INSERT INTO project_issue_counters (
+      project_id, issue_type, handled, resolved, issue_count
+    )
+    SELECT project_id, issue_type, handled, resolved, SUM(issue_count)
+    FROM issue_rollups
+    WHERE project_id = %(project_id)s
+    GROUP BY 1, 2, 3, 4
+    """,
+]
+
+
+def install_triggers(cursor) -> None:
+    cursor.execute("BEGIN")
+    try:
+        for table, triggers in TABLES.items():
+            for name, event, function in triggers:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER {name}
+                      AFTER {event} ON {table}
+                      {TRANSITION_TABLES[event]}
+                      FOR EACH STATEMENT EXECUTE FUNCTION {function}
+                    """
+                )
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def recompute_project(cursor, project_id: int) -> None:
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("LOCK TABLE error_logs, rejection_logs IN SHARE MODE")
+        for query in RECOMPUTE_GROUPS + RECOMPUTE_COUNTS:
+            cursor.execute(query, {"project_id": project_id})
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def upgrade(cursor) -> None:
+    for function in CREATE_FUNCTIONS:
+        cursor.execute(function)
+    for table in CREATE_TABLES:
+        cursor.execute(table)
+
+    install_triggers(cursor)
+
+    cursor.execute("SELECT id FROM projects ORDER BY id")
+    for (project_id,) in cursor.fetchall():
+        recompute_project(cursor, project_id)
@@ -0,0 +1,225 @@
+"""Range partition error_logs and rejection_logs by created_at.
+
+Each existing table becomes the `<table>_legacy` partition covering everything
+before the start of next month, so no rows are copied:
+
+1. A NOT VALID range CHECK is added and validated, and the (id, created_at) and
+   (uuid, created_at) unique indexes are built concurrently, without blocking
+   writes.
+2. In one short transaction the table is renamed, its indexes are renamed out of
+   the way, the unique indexes are promoted to constraints, and a partitioned
+   parent with the same columns, indexes and triggers takes over the name. The
+   legacy table is then attached; its CHECK constraint proves the range, so the
+   attach neither scans the table nor builds indexes.
+
+Later partitions are created by the partition manager (`flask db partitions`).
+"""
+
+from datetime import datetime, timedelta, timezone
+from app.migrations import create_index_concurrently, is_partitioned
+
+VERSION = 3
+NAME = "partition_issue_logs"
+TRANSACTIONAL = False
+
+ERROR_COLUMNS = """
+    id INT NOT NULL DEFAULT nextval('error_logs_id_seq'),
+    uuid VARCHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    filename VARCHAR(255),
+    line_number INT,
+    col_number INT,
+    project_id INT REFERENCES projects(id) ON DELETE CASCADE,
+    stack_trace TEXT,
+    handled BOOLEAN NOT NULL,
+    resolved BOOLEAN NOT NULL DEFAULT FALSE,
+    contexts JSONB,
+    method VARCHAR(10),
+    path TEXT,
+    ip VARCHAR(64),
+    os VARCHAR(255),
+    browser VARCHAR(255),
+    runtime VARCHAR(255),
+    error_hash VARCHAR(64)
+"""
+
+REJECTION_COLUMNS = """
+    id INT NOT NULL DEFAULT nextval('rejection_logs_id_seq'),
+    uuid VARCHAR(36) NOT NULL,
+    value TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    project_id INT REFERENCES projects(id) ON DELETE CASCADE,
+    handled BOOLEAN NOT NULL,
+    resolved BOOLEAN NOT NULL DEFAULT FALSE,
+    method VARCHAR(10),
+    path TEXT,
+    ip VARCHAR(64),
+    os VARCHAR(255),
+    browser VARCHAR(255),
+    runtime VARCHAR(255)
+"""
+
+# Table -> (columns, secondary indexes, triggers as (name, event, function))
+TABLES = {
+    "error_logs": (
+        ERROR_COLUMNS,
+        {
+            "idx_error_log_project_recent": (
+                "(project_id, created_at DESC, uuid DESC) INCLUDE (handled, resolved)"
+            ),
+            "idx_error_log_project_state": (
+                "(project_id, handled, resolved, created_at DESC)"
+            ),
+            "idx_error_log_project_hash_ip": (
+                "(project_id, error_hash, created_at DESC) INCLUDE (ip)"
+            ),
+        },
+        [
+            ("error_groups_insert", "INSERT", "error_groups_after_insert()"),
+            ("error_groups_update", "UPDATE", "error_groups_after_update()"),
+            ("error_groups_delete", "DELETE", "error_groups_after_delete()"),
+            ("error_counts_insert", "INSERT", "issue_counts_after_change('error')"),
+            ("error_counts_update", "UPDATE", "issue_counts_after_change('error')"),
+            ("error_counts_delete", "DELETE", "issue_counts_after_change('error')"),
+        ],
+    ),
+    "rejection_logs": (
+        REJECTION_COLUMNS,
+        {
+            "idx_rejection_log_project_recent": (
+                "(project_id, created_at DESC, uuid DESC) INCLUDE (handled, resolved)"
+            ),
+            "idx_rejection_log_project_state": (
+                "(project_id, handled, resolved, created_at DESC)"
+            ),
+        },
+        [
+            (
+                "rejection_counts_insert",
+                "INSERT",
+                "issue_counts_after_change('rejection')",
+            ),
+            (
+                "rejection_counts_update",
+                "UPDATE",
+                "issue_counts_after_change('rejection')",
+            ),
+            (
+                "rejection_counts_delete",
+                "DELETE",
+                "issue_counts_after_change('rejection')",
+            ),
+        ],
+    ),
+}
+
+TRANSITION_TABLES = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def partition_table(cursor, table: str, boundary: datetime) -> None:
+    columns, indexes, triggers = TABLES[table]
+    legacy = f"{table}_legacy"
+
+    cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {legacy}_range")
+    cursor.execute(
+        f"""
+        ALTER TABLE {table} ADD CONSTRAINT {legacy}_range
+        CHECK (created_at < %s) NOT VALID
+        """,
+        [boundary],
+    )
+    cursor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {legacy}_range")
+
+    create_index_concurrently(
+        cursor, f"{legacy}_id_created", table, "(id, created_at)", unique=True
+    )
+    create_index_concurrently(
+        cursor, f"{legacy}_uuid_created", table, "(uuid, created_at)", unique=True
+    )
+
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+
+        for name, _, _ in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {legacy}")
+        for name in indexes:
+            cursor.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+        cursor.execute(
+            f"""
+            ALTER TABLE {legacy} RENAME CONSTRAINT {table}_project_id_fkey
+            TO {legacy}_project_id_fkey
+            """
+        )
+        cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey")
+        cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_uuid_key")
+        cursor.execute(
+            f"""
+            ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_pkey
+            PRIMARY KEY USING INDEX {legacy}_id_created
+            """
+        )
+        cursor.execute(
+            f"""
+            ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_uuid_created_at_key
+            UNIQUE USING INDEX {legacy}_uuid_created
+            """
+        )
+
+        cursor.execute(
+            f"""
+            CREATE TABLE {table} (
+              {columns},
+              PRIMARY KEY (id, created_at),
+              UNIQUE (uuid, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+        for name, definition in indexes.items():
+            cursor.execute(f"CREATE INDEX {name} ON {table} {definition}")
+
+        for name, event, function in triggers:
+            cursor.execute(
+                f"""
+                CREATE TRIGGER {name}
+                  AFTER {event} ON {table}
+                  {TRANSITION_TABLES[event]}
+                  FOR EACH STATEMENT EXECUTE FUNCTION {function}
+                """
+            )
+
+        cursor.execute(
+            f"""
+            ALTER TABLE {table} ATTACH PARTITION {legacy}
+            FOR VALUES FROM (MINVALUE) TO (%s)
+            """,
+            [boundary],
+        )
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def upgrade(cursor) -> None:
+    cursor.execute("ALTER TABLE projects ADD COLUMN IF NOT EXISTS retention_days INT")
+
+    now = datetime.now(timezone.utc)
+    boundary = (now.replace(day=1) + timedelta(days=32)).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+    for table in TABLES:
+        if not is_partitioned(cursor, table):
+            partition_table(cursor, table, boundary)
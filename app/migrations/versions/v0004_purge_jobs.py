@@ -0,0 +1,31 @@
+"""Add the purge_jobs table that tracks background issue and project purges."""
+
+VERSION = 4
+NAME = "purge_jobs"
+TRANSACTIONAL = True
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purge_jobs (
+          id SERIAL PRIMARY KEY,
+          uuid VARCHAR(36) NOT NULL UNIQUE,
+          project_uuid VARCHAR(36) NOT NULL,
+          scope VARCHAR(16) NOT NULL,
+          status VARCHAR(16) NOT NULL DEFAULT 'pending',
+          rows_deleted BIGINT NOT NULL DEFAULT 0,
+          error TEXT,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          completed_at TIMESTAMPTZ
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_purge_jobs_active
+        ON purge_jobs(project_uuid, scope)
+        WHERE status IN ('pending', 'running')
+        """
+    )
@@ -0,0 +1,132 @@
+"""Maintain a pointer to each project's most recent issue.
+
+Statement-level triggers keep `project_latest_issues` current as issues are inserted
+and deleted; existing projects are backfilled from the logs.
+"""
+
+VERSION = 5
+NAME = "project_latest_issues"
+TRANSACTIONAL = True
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS project_latest_issues (
+      project_id INT PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+      issue_uuid VARCHAR(36) NOT NULL,
+      issue_type VARCHAR(9) NOT NULL,
+      last_seen TIMESTAMPTZ NOT NULL
+    )
+"""
+
+CREATE_REFRESH_FUNCTION = """
+    CREATE OR REPLACE FUNCTION refresh_latest_issues(project_ids int[])
+    RETURNS void AS $$
+      DELETE FROM project_latest_issues WHERE project_id = ANY(project_ids);
+
+      INSERT INTO project_latest_issues AS l (
+        project_id, issue_uuid, issue_type, last_seen
+      )
+      SELECT p.id, i.uuid, i.issue_type, i.created_at
+      FROM projects p
+      CROSS JOIN LATERAL (
+        (
+          SELECT e.uuid, 'error' AS issue_type, e.created_at
+          FROM error_logs e
+          WHERE e.project_id = p.id
+          ORDER BY e.created_at DESC, e.uuid DESC
+          LIMIT 1
+        )
+        UNION ALL
+        (
+          SELECT r.uuid, 'rejection', r.created_at
+          FROM rejection_logs r
+          WHERE r.project_id = p.id
+          ORDER BY r.created_at DESC, r.uuid DESC
+          LIMIT 1
+        )
+        ORDER BY created_at DESC, uuid DESC
+        LIMIT 1
+      ) i
+      WHERE p.id = ANY(project_ids)
+      ON CONFLICT (project_id) DO UPDATE
+      SET
+        issue_uuid = EXCLUDED.issue_uuid,
+        issue_type = EXCLUDED.issue_type,
+        last_seen = EXCLUDED.last_seen
+      WHERE (EXCLUDED.last_seen, EXCLUDED.issue_uuid) > (l.last_seen, l.issue_uuid);
+    $$ LANGUAGE sql
+"""
+
+CREATE_INSERT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION latest_issues_after_insert() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO project_latest_issues AS l (
+        project_id, issue_uuid, issue_type, last_seen
+      )
+      SELECT DISTINCT ON (n.project_id) n.project_id, n.uuid, TG_ARGV[0], n.created_at
+      FROM new_rows n
+      JOIN projects p ON p.id = n.project_id
+      ORDER BY n.project_id, n.created_at DESC, n.uuid DESC
+      ON CONFLICT (project_id) DO UPDATE
+      SET
+        issue_uuid = EXCLUDED.issue_uuid,
+        issue_type = EXCLUDED.issue_type,
+        last_seen = EXCLUDED.last_seen
+      WHERE (EXCLUDED.last_seen, EXCLUDED.issue_uuid) > (l.last_seen, l.issue_uuid);
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+CREATE_DELETE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION latest_issues_after_delete() RETURNS trigger AS $$
+    BEGIN
+      PERFORM refresh_latest_issues(ARRAY(
+        SELECT l.project_id
+        FROM project_latest_issues l
+        JOIN old_rows o
+          ON o.project_id = l.project_id
+          AND o.uuid = l.issue_uuid
+          AND o.created_at = l.last_seen
+        WHERE l.issue_type = TG_ARGV[0]
+      ));
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+# Table -> issue type
+TABLES = {"error_logs": "error", "rejection_logs": "rejection"}
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(CREATE_TABLE)
+    cursor.execute(CREATE_REFRESH_FUNCTION)
+    cursor.execute(CREATE_INSERT_FUNCTION)
+    cursor.execute(CREATE_DELETE_FUNCTION)
+
+    for table, issue_type in TABLES.items():
+        prefix = table.removesuffix("_logs")
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_latest_insert ON {table}")
+        cursor.execute(
+            f"""
+            CREATE TRIGGER {prefix}_latest_insert
+              AFTER INSERT ON {table}
+              REFERENCING NEW TABLE AS new_rows
+              FOR EACH STATEMENT EXECUTE FUNCTION
+              latest_issues_after_insert('{issue_type}')
+            """
+        )
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_latest_delete ON {table}")
+        cursor.execute(
+            f"""
+            CREATE TRIGGER {prefix}_latest_delete
+              AFTER DELETE ON {table}
+              REFERENCING OLD TABLE AS old_rows
+              FOR EACH STATEMENT EXECUTE FUNCTION
+              latest_issues_after_delete('{issue_type}')
+            """
+        )
+
+    cursor.execute("SELECT refresh_latest_issues(ARRAY(SELECT id FROM projects))")
@@ -0,0 +1,40 @@
+"""Full-text search over errors and rejections.
+
+Adds a generated `search_vector` column to both log tables and indexes it with GIN.
+Adding a stored generated column rewrites each partition under an exclusive lock,
+so run this migration during a quiet period on large installations. The indexes
+are then built concurrently.
+"""
+
+from app.migrations import create_index_concurrently
+
+VERSION = 6
+NAME = "issue_search"
+TRANSACTIONAL = False
+
+# Table -> (index name, search document expression)
+SEARCH_VECTORS = {
+    "error_logs": (
+        "idx_error_log_search",
+        """
+        setweight(to_tsvector('simple', name), 'A') ||
+        setweight(to_tsvector('simple', left(message, 65536)), 'B') ||
+        setweight(to_tsvector('simple', left(COALESCE(stack_trace, ''), 65536)), 'C')
+        """,
+    ),
+    "rejection_logs": (
+        "idx_rejection_log_search",
+        "to_tsvector('simple', left(value, 65536))",
+    ),
+}
+
+
+def upgrade(cursor) -> None:
+    for table, (index, expression) in SEARCH_VECTORS.items():
+        cursor.execute(
+            f"""
+            ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({expression}) STORED
+            """
+        )
+        create_index_concurrently(cursor, index, table, "USING GIN (search_vector)")
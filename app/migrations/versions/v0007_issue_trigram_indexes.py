@@ -0,0 +1,29 @@
+"""Trigram indexes for substring and fuzzy issue filters.
+
+Enables `pg_trgm` and indexes the error filename, path and name and the rejection
+path with `gin_trgm_ops`, which serves both `ILIKE '%...%'` and the word similarity
+operator. The indexes are built concurrently.
+"""
+
+from app.migrations import create_index_concurrently
+
+VERSION = 7
+NAME = "issue_trigram_indexes"
+TRANSACTIONAL = False
+
+# Index name -> (table, column)
+TRIGRAM_INDEXES = {
+    "idx_error_log_filename_trgm": ("error_logs", "filename"),
+    "idx_error_log_path_trgm": ("error_logs", "path"),
+    "idx_error_log_name_trgm": ("error_logs", "name"),
+    "idx_rejection_log_path_trgm": ("rejection_logs", "path"),
+}
+
+
+def upgrade(cursor) -> None:
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for index, (table, column) in TRIGRAM_INDEXES.items():
+        create_index_concurrently(
+            cursor, index, table, f"USING GIN ({column} gin_trgm_ops)"
+        )
@@ -0,0 +1,20 @@
+"""Index error contexts for containment filters.
+
+Builds a `jsonb_path_ops` GIN index on `error_logs.contexts`, which serves the `@>`
+containment operator and is smaller than the default `jsonb_ops` index.
+"""
+
+from app.migrations import create_index_concurrently
+
+VERSION = 8
+NAME = "error_context_index"
+TRANSACTIONAL = False
+
+
+def upgrade(cursor) -> None:
+    create_index_concurrently(
+        cursor,
+        "idx_error_log_contexts",
+        "error_logs",
+        "USING GIN (contexts jsonb_path_ops)",
+    )
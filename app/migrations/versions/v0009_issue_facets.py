@@ -0,0 +1,109 @@
+"""Maintain hourly facet rollups for the issue breakdown endpoint.
+
+Statement-level triggers count browser, OS, runtime, path and method values into
+`issue_facets` as issues are inserted and deleted. Existing issues are backfilled in
+the same transaction; creating the triggers locks out writers to the log tables
+until it commits, so nothing is counted twice or missed.
+"""
+
+VERSION = 9
+NAME = "issue_facets"
+TRANSACTIONAL = True
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS issue_facets (
+      project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+      error_hash VARCHAR(64) NOT NULL,
+      facet VARCHAR(16) NOT NULL,
+      bucket TIMESTAMPTZ NOT NULL,
+      value TEXT NOT NULL,
+      issue_type VARCHAR(9) NOT NULL,
+      issue_count BIGINT NOT NULL DEFAULT 0,
+      PRIMARY KEY (project_id, error_hash, facet, bucket, value, issue_type)
+    );
+"""
+
+CREATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION issue_facets_after_change() RETURNS trigger AS $$
+    BEGIN
+      EXECUTE format(
+        $sql$
+        INSERT INTO issue_facets AS f (
+          project_id, error_hash, facet, bucket, value, issue_type, issue_count
+        )
+        SELECT c.project_id, h.error_hash, v.facet, hour_bucket(c.created_at),
+          v.value, %1$L, %2$s * COUNT(*)
+        FROM %3$I c
+        JOIN projects p ON p.id = c.project_id
+        CROSS JOIN LATERAL (
+          VALUES ('browser', c.browser), ('os', c.os), ('runtime', c.runtime),
+            ('path', left(c.path, 512)), ('method', c.method)
+        ) v(facet, value)
+        CROSS JOIN LATERAL (VALUES (''), (%4$s)) h(error_hash)
+        WHERE v.value IS NOT NULL AND h.error_hash IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ORDER BY 1, 2, 3, 4, 5
+        ON CONFLICT (project_id, error_hash, facet, bucket, value, issue_type)
+        DO UPDATE SET issue_count = f.issue_count + EXCLUDED.issue_count
+        $sql$,
+        TG_ARGV[0],
+        CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END,
+        CASE TG_OP WHEN 'INSERT' THEN 'new_rows' ELSE 'old_rows' END,
+        CASE TG_ARGV[0] WHEN 'error' THEN 'c.error_hash' ELSE 'NULL' END
+      );
+
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+# Table -> (issue type, error hash expression)
+TABLES = {
+    "error_logs": ("error", "c.error_hash"),
+    "rejection_logs": ("rejection", "NULL"),
+}
+
+BACKFILL = """
+    INSERT INTO issue_facets (
+      project_id, error_hash, facet, bucket, value, issue_type, issue_count
+    )
+    SELECT c.project_id, h.error_hash, v.facet, hour_bucket(c.created_at),
+      v.value, %s, COUNT(*)
+    FROM {table} c
+    JOIN projects p ON p.id = c.project_id
+    CROSS JOIN LATERAL (
+      VALUES ('browser', c.browser), ('os', c.os), ('runtime', c.runtime),
+        ('path', left(c.path, 512)), ('method', c.method)
+    ) v(facet, value)
+    CROSS JOIN LATERAL (VALUES (''), ({error_hash})) h(error_hash)
+    WHERE v.value IS NOT NULL AND h.error_hash IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(CREATE_TABLE)
+    cursor.execute(CREATE_FUNCTION)
+
+    for table, (issue_type, error_hash) in TABLES.items():
+        prefix = table.removesuffix("_logs")
+        for event, transition in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        ):
+            name = f"{prefix}_facets_{event.lower()}"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+            cursor.execute(
+                f"""
+                CREATE TRIGGER {name}
+                  AFTER {event} ON {table}
+                  REFERENCING {transition}
+                  FOR EACH STATEMENT EXECUTE FUNCTION
+                  issue_facets_after_change('{issue_type}')
+                """
+            )
+
+        cursor.execute("DELETE FROM issue_facets WHERE issue_type = %s", [issue_type])
+        cursor.execute(
+            BACKFILL.format(table=table, error_hash=error_hash), [issue_type]
+        )
@@ -0,0 +1,158 @@
+"""Store each distinct stack trace once.
+
+Stack traces move to the `stack_traces` table, keyed by their SHA-256 digest, and
+`error_logs` keeps only the digest. A row trigger does the move on every write, so
+writers are unchanged. The trigger also sets `search_vector`, which stops being a
+generated column because a generated column cannot read the trace back from
+`stack_traces`. Dropping the expression keeps existing values and does not rewrite
+the table.
+
+Existing rows are then backfilled in small batches, each in its own transaction, so
+the migration runs online. Old trace values are reclaimed by (auto)vacuum for reuse
+by the table; returning the space to the operating system still needs a rewrite
+such as `VACUUM FULL` or pg_repack. Rerunning the migration resumes the backfill.
+"""
+
+from app.migrations import create_index_concurrently
+
+VERSION = 10
+NAME = "stack_traces"
+TRANSACTIONAL = False
+
+BATCH_SIZE = 1000
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS stack_traces (
+      digest BYTEA PRIMARY KEY,
+      stack_trace TEXT NOT NULL
+    )
+"""
+
+CREATE_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION error_search_vector(
+      name text, message text, stack_trace text
+    ) RETURNS tsvector AS $$
+      SELECT
+        setweight(to_tsvector('simple', name), 'A') ||
+        setweight(to_tsvector('simple', left(message, 65536)), 'B') ||
+        setweight(to_tsvector('simple', left(COALESCE(stack_trace, ''), 65536)), 'C')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION store_stack_trace(trace text) RETURNS bytea AS $$
+    DECLARE
+      trace_digest bytea := sha256(convert_to(trace, 'UTF8'));
+    BEGIN
+      LOOP
+        INSERT INTO stack_traces (digest, stack_trace)
+        VALUES (trace_digest, trace)
+        ON CONFLICT (digest) DO NOTHING;
+        IF FOUND THEN
+          RETURN trace_digest;
+        END IF;
+
+        PERFORM 1 FROM stack_traces WHERE digest = trace_digest FOR KEY SHARE;
+        IF FOUND THEN
+          RETURN trace_digest;
+        END IF;
+      END LOOP;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION error_logs_before_write() RETURNS trigger AS $$
+    DECLARE
+      document_changed boolean := TG_OP = 'INSERT';
+    BEGIN
+      -- Moving a trace out of the row (as the backfill does) leaves the document as is
+      IF NOT document_changed THEN
+        document_changed := (NEW.name, NEW.message, NEW.stack_trace)
+          IS DISTINCT FROM (OLD.name, OLD.message, OLD.stack_trace);
+      END IF;
+
+      IF NEW.stack_trace IS NOT NULL THEN
+        NEW.stack_trace_digest := store_stack_trace(NEW.stack_trace);
+      END IF;
+
+      IF document_changed THEN
+        NEW.search_vector := error_search_vector(
+          NEW.name,
+          NEW.message,
+          COALESCE(
+            NEW.stack_trace,
+            (
+              SELECT s.stack_trace FROM stack_traces s
+              WHERE s.digest = NEW.stack_trace_digest
+            )
+          )
+        );
+      END IF;
+      NEW.stack_trace := NULL;
+
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+# Rewriting stack_trace to itself lets the trigger move it
+BACKFILL = """
+    WITH batch AS (
+      SELECT id, created_at
+      FROM error_logs
+      WHERE stack_trace IS NOT NULL AND id > %s
+      ORDER BY id
+      LIMIT %s
+    )
+    UPDATE error_logs e
+    SET stack_trace = e.stack_trace
+    FROM batch
+    WHERE e.id = batch.id AND e.created_at = batch.created_at
+    RETURNING e.id
+"""
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(CREATE_TABLE)
+    cursor.execute(
+        "ALTER TABLE error_logs ADD COLUMN IF NOT EXISTS stack_trace_digest BYTEA"
+    )
+    for function in CREATE_FUNCTIONS:
+        cursor.execute(function)
+
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute(
+            """
+            ALTER TABLE error_logs
+            ALTER COLUMN search_vector DROP EXPRESSION IF EXISTS
+            """
+        )
+        cursor.execute("DROP TRIGGER IF EXISTS error_logs_before_write ON error_logs")
+        cursor.execute(
+            """
+            CREATE TRIGGER error_logs_before_write
+              BEFORE INSERT OR UPDATE OF name, message, stack_trace ON error_logs
+              FOR EACH ROW EXECUTE FUNCTION error_logs_before_write()
+            """
+        )
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+    create_index_concurrently(
+        cursor,
+        "idx_error_log_stack_trace_digest",
+        "error_logs",
+        "(stack_trace_digest)",
+    )
+
+    last_id = 0
+    while True:
+        cursor.execute(BACKFILL, [last_id, BATCH_SIZE])
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+        last_id = max(ids)
@@ -3,24 +3,33 @@
 from .projects import (
     fetch_projects,
     add_project,
-    delete_project_by_id,
     update_project_name,
+    update_project_retention,
     get_project_name,
     get_topic_arn,
     get_all_sns_subscription_arns_for_project,
+    get_project_by_api_key,
 )
 from .project_issues import (
     fetch_issues_by_project,
-    delete_issues_by_project,
+    search_issues,
+    stream_issues_for_export,
+    fetch_error_groups,
+    fetch_issue_facets,
     fetch_error,
     fetch_rejection,
     update_error_resolved,
     update_rejection_resolved,
     delete_error_by_id,
     delete_rejection_by_id,
+    update_issue_batch_resolved,
+    delete_issue_batch,
+    insert_issue_batch,
     get_issue_summary,
     fetch_most_recent_log,
 )
+from .dashboard import fetch_dashboard
+from .purge_jobs import create_purge_job, fetch_purge_job, run_purge_job
 from .project_users import (
     fetch_project_users,
     add_user_to_project,
@@ -42,13 +51,17 @@ from .users import (
 __all__ = [
     "fetch_projects",
     "add_project",
-    "delete_project_by_id",
     "update_project_name",
+    "update_project_retention",
     "get_project_name",
     "get_all_sns_subscription_arns_for_project",
     "get_topic_arn",
+    "get_project_by_api_key",
     "fetch_issues_by_project",
-    "delete_issues_by_project",
+    "search_issues",
+    "stream_issues_for_export",
+    "fetch_error_groups",
+    "fetch_issue_facets",
     "get_issue_summary",
     "fetch_most_recent_log",
     "fetch_error",
@@ -57,6 +70,13 @@ __all__ = [
     "update_rejection_resolved",
     "delete_error_by_id",
     "delete_rejection_by_id",
+    "update_issue_batch_resolved",
+    "delete_issue_batch",
+    "insert_issue_batch",
+    "fetch_dashboard",
+    "create_purge_job",
+    "fetch_purge_job",
+    "run_purge_job",
     "fetch_project_users",
     "add_user_to_project",
     "remove_user_from_project",
@@ -0,0 +1,78 @@
+"""Dashboard models module.
+
+This module provides the data behind the dashboard: every project a user can see,
+with its issue counts, issue summary and most recent issue. Everything is fetched
+with a fixed number of queries grouped by project, however many projects there are.
+"""
+
+from typing import Dict, List, Union
+from db import db_read_connection
+from app.utils import fetch_latest_issues, summarize_issue_rollups
+
+
+@db_read_connection
+def fetch_dashboard(
+    user_uuid: str,
+    is_root: bool,
+    buckets: int = 7,
+    granularity: str = "day",
+    tz: str = "UTC",
+    **kwargs: dict,
+) -> List[Dict[str, Union[str, int, list, dict, None]]]:
+    """Retrieves dashboard data for every project the user can see.
+
+    Root users see every project; other users see the projects they are assigned
+    to. Issue counts are read from `project_issue_counters`, summaries from the
+    hourly rollups (see `summarize_issue_rollups`), and the most recent issue from
+    the `project_latest_issues` pointers.
+    """
+    cursor = kwargs["cursor"]
+
+    project_query = """
+    SELECT
+        p.uuid,
+        p.name,
+        p.platform,
+        COALESCE(SUM(c.issue_count) FILTER (WHERE c.issue_type = 'error'), 0)
+            ::bigint AS error_count,
+        COALESCE(SUM(c.issue_count) FILTER (WHERE c.issue_type = 'rejection'), 0)
+            ::bigint AS rejection_count,
+        COALESCE(SUM(c.issue_count) FILTER (WHERE NOT c.resolved), 0)
+            ::bigint AS unresolved_count
+    FROM projects p
+    LEFT JOIN project_issue_counters c ON c.project_id = p.id
+    WHERE %s OR p.id IN (
+        SELECT pu.project_id
+        FROM projects_users pu
+        JOIN users u ON u.id = pu.user_id
+        WHERE u.uuid = %s
+    )
+    GROUP BY p.id
+    ORDER BY p.name
+    """
+
+    cursor.execute(project_query, [is_root, user_uuid])
+    rows = cursor.fetchall()
+
+    if not rows:
+        return []
+
+    project_uuids = [row[0] for row in rows]
+    summaries = summarize_issue_rollups(
+        cursor, project_uuids, buckets, granularity, tz
+    )
+    latest_issues = fetch_latest_issues(cursor, project_uuids)
+
+    return [
+        {
+            "uuid": row[0],
+            "name": row[1],
+            "platform": row[2],
+            "error_count": row[3],
+            "rejection_count": row[4],
+            "unresolved_count": row[5],
+            "summary": summaries[row[0]],
+            "latest_issue": latest_issues.get(row[0]),
+        }
+        for row in rows
+    ]
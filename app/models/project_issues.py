@@ -6,13 +6,32 @@ resolution status, and deleting records. Each function is decorated to ensure pr
 database connection context for reading or writing.
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, List
-from db import db_read_connection, db_write_connection
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List, Tuple, Union
+from db import (
+    db_read_connection,
+    db_write_connection,
+    get_db_connection_from_pool,
+    return_db_connection_to_pool,
+)
 from app.utils import (
-    fetch_errors_by_project,
-    fetch_rejections_by_project,
+    build_batch_filters,
+    build_issue_filters,
+    fetch_issues_page,
+    fetch_error_stats,
     calculate_total_error_pages,
+    encode_cursor,
+    encode_rank_cursor,
+    EXPORT_COLUMNS,
+    EXPORT_SELECTS,
+    find_archived_issue,
+    iter_archived_issues,
+    hll_estimate,
+    hll_merge,
+    summarize_issue_rollups,
+    ERROR_INGEST_COLUMNS,
+    REJECTION_INGEST_COLUMNS,
+    copy_buffer,
 )
 
 
@@ -24,103 +43,503 @@ def fetch_issues_by_project(
     handled: Optional[bool],
     time: Optional[str],
     resolved: Optional[bool],
+    after: Optional[Tuple[datetime, str]] = None,
+    keyset: bool = False,
+    exact: bool = False,
+    count: Optional[str] = None,
+    column_filters: Optional[Dict[str, Union[str, Dict]]] = None,
+    fuzzy: bool = False,
     **kwargs: dict
 ) -> Dict[str, List[Dict[str, int]]]:
-    """Retrieves a paginated list of issues (errors and rejections) for a project."""
-    cursor = kwargs["cursor"]
+    """Retrieves a paginated list of issues (errors and rejections) for a project.
 
-    errors = fetch_errors_by_project(
-        cursor, project_uuid, page, limit, handled, time, resolved
-    )
-    rejections = fetch_rejections_by_project(
-        cursor, project_uuid, page, limit, handled, time, resolved
-    )
+    With `keyset` enabled the page starts after the `after` key (or at the newest
+    issue when it is None), and a `next_cursor` is returned instead of page counts.
+    Distinct users are estimated from sketches unless `exact` is set.
+
+    `column_filters` maps `filename`, `path` or `name` to a substring to look for,
+    or with `fuzzy` to a word it should resemble, and `contexts` to a JSON object
+    the error's contexts must contain.
+
+    `count` ("none", "estimate" or "exact") selects how `total_pages` is computed.
+    It defaults to "estimate" for numbered pages, while cursor pages are only
+    counted on request.
+    """
+    cursor = kwargs["cursor"]
 
-    combined_logs = sorted(
-        errors + rejections, key=lambda x: x["created_at"], reverse=True
+    if keyset:
+        # Read one extra row to learn whether another page follows
+        issues = fetch_issues_page(
+            cursor,
+            project_uuid,
+            limit + 1,
+            handled,
+            time,
+            resolved,
+            after=after,
+            exact=exact,
+            column_filters=column_filters,
+            fuzzy=fuzzy,
+        )
+        next_cursor = None
+        if len(issues) > limit:
+            issues = issues[:limit]
+            next_cursor = encode_cursor(issues[-1]["created_at"], issues[-1]["uuid"])
+
+        issue_data = {"issues": issues, "next_cursor": next_cursor}
+        if count not in (None, "none"):
+            issue_data["total_pages"] = calculate_total_error_pages(
+                cursor,
+                project_uuid,
+                limit,
+                handled,
+                time,
+                resolved,
+                count,
+                column_filters,
+                fuzzy,
+            )
+
+        return issue_data
+
+    issues = fetch_issues_page(
+        cursor,
+        project_uuid,
+        limit,
+        handled,
+        time,
+        resolved,
+        offset=(page - 1) * limit,
+        exact=exact,
+        column_filters=column_filters,
+        fuzzy=fuzzy,
     )
     total_pages = calculate_total_error_pages(
-        cursor, project_uuid, limit, handled, time, resolved
+        cursor,
+        project_uuid,
+        limit,
+        handled,
+        time,
+        resolved,
+        count or "estimate",
+        column_filters,
+        fuzzy,
     )
 
     return {
-        "issues": combined_logs[:limit],
+        "issues": issues,
         "total_pages": total_pages,
         "current_page": int(page),
     }
 
 
-@db_write_connection
-def delete_issues_by_project(project_uuid: str, **kwargs: dict) -> bool:
-    """Deletes all issues (errors and rejections) associated with a project."""
-    connection = kwargs["connection"]
+def stream_issues_for_export(
+    project_uuid: str,
+    handled: Optional[bool],
+    time: Optional[str],
+    resolved: Optional[bool],
+    itersize: int = 2000,
+    archive_dir: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Yields every matching error and rejection of a project, newest first.
+
+    Rows are read through a named (server-side) cursor, `itersize` rows per round
+    trip, so memory use does not depend on the number of issues. Both tables are
+    merged in index order, so the first rows arrive without sorting the result.
+    The generator holds a pooled connection until it is exhausted or closed.
+
+    With `archive_dir`, archived issues follow, read straight from their segments
+    without loading them back into the database.
+    """
+    filters, params = build_issue_filters("issues", handled, time, resolved)
+
+    query = f"""
+    SELECT {", ".join(EXPORT_COLUMNS)}
+    FROM (
+        SELECT {EXPORT_SELECTS["error_logs"]}, t.project_id
+        FROM error_logs t
+        UNION ALL
+        SELECT {EXPORT_SELECTS["rejection_logs"]}, t.project_id
+        FROM rejection_logs t
+    ) issues
+    WHERE issues.project_id = (SELECT id FROM projects WHERE uuid = %s)
+    {filters}
+    ORDER BY created_at DESC, uuid DESC
+    """
+
+    connection = get_db_connection_from_pool()
+    cursor = connection.cursor(name="issue_export")
+    cursor.itersize = itersize
+    try:
+        cursor.execute(query, [project_uuid, *params])
+        for row in cursor:
+            yield dict(zip(EXPORT_COLUMNS, row))
+    finally:
+        try:
+            cursor.close()
+        finally:
+            connection.rollback()
+            return_db_connection_to_pool(connection)
+
+    if archive_dir is not None:
+        yield from iter_archived_issues(
+            archive_dir, project_uuid, handled, time, resolved
+        )
+
+
+@db_read_connection
+def search_issues(
+    project_uuid: str,
+    query: str,
+    limit: int,
+    handled: Optional[bool],
+    time: Optional[str],
+    resolved: Optional[bool],
+    after: Optional[Tuple[float, datetime, str]] = None,
+    **kwargs: dict
+) -> Dict[str, List[Dict[str, int]]]:
+    """Searches a project's errors and rejections, best matches first.
+
+    `query` uses web search syntax (quoted phrases, `or`, `-word`) and is matched
+    against the generated `search_vector` columns through their GIN indexes.
+    Matches are ranked with `ts_rank`, where error names outweigh messages and
+    messages outweigh stack traces, and paginated by their
+    `(rank, created_at, uuid)` key: pass `after` to start past a previous page.
+    """
     cursor = kwargs["cursor"]
 
-    error_query = """
-    DELETE FROM error_logs
-    WHERE project_id IN (SELECT id FROM projects WHERE uuid = %s)
+    filters, params = build_issue_filters("issues", handled, time, resolved)
+    if after is not None:
+        filters += (
+            " AND (issues.rank, issues.created_at, issues.uuid) < (%s::real, %s, %s)"
+        )
+        params.extend(after)
+
+    search_query = f"""
+    WITH search AS (
+        SELECT
+            (SELECT id FROM projects WHERE uuid = %s) AS project_id,
+            websearch_to_tsquery('simple', %s) AS query
+    )
+    SELECT
+        page.uuid, page.created_at, page.rank, e.uuid IS NOT NULL AS is_error,
+        e.name, e.message, e.filename, e.line_number, e.col_number, e.error_hash,
+        r.value, COALESCE(e.handled, r.handled), COALESCE(e.resolved, r.resolved)
+    FROM (
+        SELECT uuid, created_at, rank
+        FROM (
+            SELECT
+                e.uuid, e.created_at, e.handled, e.resolved,
+                ts_rank(e.search_vector, s.query) AS rank
+            FROM error_logs e, search s
+            WHERE e.project_id = s.project_id AND e.search_vector @@ s.query
+            UNION ALL
+            SELECT
+                r.uuid, r.created_at, r.handled, r.resolved,
+                ts_rank(r.search_vector, s.query) AS rank
+            FROM rejection_logs r, search s
+            WHERE r.project_id = s.project_id AND r.search_vector @@ s.query
+        ) issues
+        WHERE TRUE {filters}
+        ORDER BY rank DESC, created_at DESC, uuid DESC
+        LIMIT %s
+    ) page
+    LEFT JOIN error_logs e
+        ON e.uuid = page.uuid AND e.created_at = page.created_at
+    LEFT JOIN rejection_logs r
+        ON r.uuid = page.uuid AND r.created_at = page.created_at
+    ORDER BY page.rank DESC, page.created_at DESC, page.uuid DESC
     """
 
-    cursor.execute(error_query, (project_uuid,))
-    error_rows_deleted = cursor.rowcount
+    # Read one extra row to learn whether another page follows
+    cursor.execute(search_query, [project_uuid, query, *params, limit + 1])
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_rank_cursor(rows[-1][2], rows[-1][1], rows[-1][0])
+
+    error_hashes = {row[9] for row in rows if row[3]}
+    stats_map = fetch_error_stats(cursor, project_uuid, error_hashes)
+
+    issues = []
+    for row in rows:
+        if row[3]:
+            stats = stats_map.get(row[9], {})
+            issues.append(
+                {
+                    "uuid": row[0],
+                    "name": row[4],
+                    "message": row[5],
+                    "created_at": row[1],
+                    "file": row[6],
+                    "line_number": row[7],
+                    "col_number": row[8],
+                    "project_uuid": project_uuid,
+                    "handled": row[11],
+                    "resolved": row[12],
+                    "rank": row[2],
+                    "total_occurrences": stats.get("total_occurrences", 0),
+                    "distinct_users": stats.get("distinct_users", 0),
+                }
+            )
+        else:
+            issues.append(
+                {
+                    "uuid": row[0],
+                    "value": row[10],
+                    "created_at": row[1],
+                    "project_uuid": project_uuid,
+                    "handled": row[11],
+                    "resolved": row[12],
+                    "rank": row[2],
+                }
+            )
+
+    return {"issues": issues, "next_cursor": next_cursor}
+
 
-    rejection_query = """
-    DELETE FROM rejection_logs
-    WHERE project_id IN (SELECT id FROM projects WHERE uuid = %s)
+@db_read_connection
+def fetch_error_groups(
+    project_uuid: str,
+    limit: int,
+    resolved: Optional[bool],
+    time: Optional[str],
+    after: Optional[Tuple[datetime, str]] = None,
+    exact: bool = False,
+    **kwargs: dict
+) -> Dict[str, List[Dict[str, int]]]:
+    """Retrieves a keyset-paginated list of a project's error groups.
+
+    Groups are read from the `error_groups` table, ordered by when they were last
+    seen, so the cost of a page does not depend on how many occurrences exist.
+    Distinct users are estimated from the group's sketch, or from the merged hourly
+    sketches when `time` is given, unless `exact` is set.
+    """
+    cursor = kwargs["cursor"]
+
+    filters = ""
+    params = [project_uuid]
+
+    if resolved is not None:
+        filters += " AND g.resolved = %s"
+        params.append(resolved)
+    if time is not None:
+        filters += " AND g.last_seen >= %s"
+        params.append(time)
+    if after is not None:
+        filters += " AND (g.last_seen, g.error_hash) < (%s, %s)"
+        params.extend(after)
+
+    # The page of groups is picked first, then each group's newest occurrence is
+    # read by its (uuid, created_at) key. One extra row tells whether another page
+    # follows.
+    query = f"""
+    SELECT
+        g.error_hash, g.first_seen, g.last_seen, g.occurrences, g.resolved,
+        e.uuid, e.name, e.message, e.filename, e.line_number, e.col_number,
+        e.handled, g.ip_sketch
+    FROM (
+        SELECT *
+        FROM error_groups g
+        WHERE g.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        {filters}
+        ORDER BY g.last_seen DESC, g.error_hash DESC
+        LIMIT %s
+    ) g
+    JOIN error_logs e
+        ON e.uuid = g.representative_uuid AND e.created_at = g.last_seen
+    ORDER BY g.last_seen DESC, g.error_hash DESC
     """
+    params.append(limit + 1)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    groups = [
+        {
+            "error_hash": row[0],
+            "first_seen": row[1],
+            "last_seen": row[2],
+            "total_occurrences": row[3],
+            "resolved": row[4],
+            "uuid": row[5],
+            "name": row[6],
+            "message": row[7],
+            "file": row[8],
+            "line_number": row[9],
+            "col_number": row[10],
+            "handled": row[11],
+            "project_uuid": project_uuid,
+            "distinct_users": hll_estimate(row[12]),
+        }
+        for row in rows[:limit]
+    ]
 
-    cursor.execute(rejection_query, (project_uuid,))
-    rejection_rows_deleted = cursor.rowcount
+    error_hashes = [group["error_hash"] for group in groups]
 
-    connection.commit()
+    if error_hashes and exact:
+        distinct_query = """
+        SELECT error_hash, COUNT(DISTINCT ip)
+        FROM error_logs
+        WHERE project_id = (SELECT id FROM projects WHERE uuid = %s)
+        AND error_hash = ANY(%s)
+        """
+        distinct_params = [project_uuid, error_hashes]
+        if time is not None:
+            distinct_query += " AND created_at >= %s"
+            distinct_params.append(time)
+        distinct_query += " GROUP BY error_hash"
+
+        cursor.execute(distinct_query, distinct_params)
+        distinct_users = dict(cursor.fetchall())
+    elif error_hashes and time is not None:
+        sketch_query = """
+        SELECT error_hash, ip_sketch
+        FROM error_group_hourly_sketches
+        WHERE project_id = (SELECT id FROM projects WHERE uuid = %s)
+        AND error_hash = ANY(%s)
+        AND bucket >= hour_bucket(%s)
+        """
 
-    return error_rows_deleted > 0 or rejection_rows_deleted > 0
+        cursor.execute(sketch_query, [project_uuid, error_hashes, time])
+        sketches = {}
+        for error_hash, sketch in cursor.fetchall():
+            sketches.setdefault(error_hash, []).append(sketch)
+        distinct_users = {
+            error_hash: hll_estimate(hll_merge(hash_sketches))
+            for error_hash, hash_sketches in sketches.items()
+        }
+    else:
+        distinct_users = None
+
+    if distinct_users is not None:
+        for group in groups:
+            group["distinct_users"] = distinct_users.get(group["error_hash"], 0)
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(groups[-1]["last_seen"], groups[-1]["error_hash"])
+
+    return {"groups": groups, "next_cursor": next_cursor}
 
 
 @db_read_connection
-def fetch_error(
-    project_uuid: str, error_uuid: str, **kwargs: dict
-) -> Optional[Dict[str, str]]:
-    """Retrieves a specific error log by its UUID."""
+def fetch_issue_facets(
+    project_uuid: str,
+    facets: List[str],
+    limit: int,
+    error_hash: Optional[str] = None,
+    time: Optional[str] = None,
+    until: Optional[str] = None,
+    **kwargs: dict
+) -> Dict[str, List[Dict[str, int]]]:
+    """Counts the most common values of each facet among a project's issues.
+
+    Counts are summed from the hourly `issue_facets` rollup, for the whole project
+    or for one error group when `error_hash` is given. `time` and `until` bound the
+    range to the hours containing them. Returns up to `limit` values per facet,
+    most common first.
+    """
     cursor = kwargs["cursor"]
 
-    query = """
-    SELECT
-        name, message, created_at, filename, line_number, col_number, stack_trace,
-        handled, resolved, contexts, method, path, ip, os, browser, runtime, error_hash
-    FROM error_logs
-    WHERE uuid = %s
+    filters = ""
+    params = [project_uuid, error_hash or "", facets]
+    if time is not None:
+        filters += " AND f.bucket >= hour_bucket(%s)"
+        params.append(time)
+    if until is not None:
+        filters += " AND f.bucket <= hour_bucket(%s)"
+        params.append(until)
+
+    query = f"""
+    SELECT facet, value, issue_count
+    FROM (
+        SELECT
+            f.facet,
+            f.value,
+            SUM(f.issue_count) AS issue_count,
+            ROW_NUMBER() OVER (
+                PARTITION BY f.facet ORDER BY SUM(f.issue_count) DESC, f.value
+            ) AS position
+        FROM issue_facets f
+        WHERE f.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        AND f.error_hash = %s
+        AND f.facet = ANY(%s)
+        {filters}
+        GROUP BY f.facet, f.value
+        HAVING SUM(f.issue_count) > 0
+    ) ranked
+    WHERE position <= %s
+    ORDER BY facet, position
     """
 
-    cursor.execute(query, [error_uuid])
-    error = cursor.fetchone()
+    cursor.execute(query, [*params, limit])
 
-    if not error:
-        return None
+    breakdown = {facet: [] for facet in facets}
+    for facet, value, issue_count in cursor.fetchall():
+        breakdown[facet].append({"value": value, "count": int(issue_count)})
 
-    error_hash = error[16]
+    return breakdown
 
-    occurrence_query = """
-    SELECT COUNT(*)
-    FROM error_logs
-    WHERE error_hash = %s AND project_id = (
-        SELECT id FROM projects WHERE uuid = %s
-    )
+
+@db_read_connection
+def fetch_error(
+    project_uuid: str,
+    error_uuid: str,
+    exact: bool = False,
+    archive_dir: Optional[str] = None,
+    **kwargs: dict
+) -> Optional[Dict[str, str]]:
+    """Retrieves a specific error log of a project by its UUID.
+
+    The error and its group statistics are read in one statement. Distinct users
+    are estimated from the error group's sketch unless `exact` is set, in which case
+    they are counted from `error_logs`. Errors missing from the database are looked
+    up in the archive under `archive_dir`, if given, and marked as archived.
     """
+    cursor = kwargs["cursor"]
 
-    cursor.execute(occurrence_query, [error_hash, project_uuid])
-    total_occurrences = cursor.fetchone()[0]
+    if exact:
+        distinct_users_column = """(
+            SELECT COUNT(DISTINCT x.ip)
+            FROM error_logs x
+            WHERE x.project_id = e.project_id AND x.error_hash = e.error_hash
+        )"""
+    else:
+        distinct_users_column = "g.ip_sketch"
 
-    user_count_query = """
-    SELECT COUNT(DISTINCT ip)
-    FROM error_logs
-    WHERE error_hash = %s AND project_id = (
-        SELECT id FROM projects WHERE uuid = %s
-    )
+    query = f"""
+    SELECT
+        e.name, e.message, e.created_at, e.filename, e.line_number, e.col_number,
+        COALESCE(e.stack_trace, st.stack_trace), e.handled, e.resolved, e.contexts,
+        e.method, e.path, e.os, e.browser, e.runtime, g.occurrences,
+        {distinct_users_column}
+    FROM projects p
+    JOIN error_logs e ON e.project_id = p.id
+    LEFT JOIN stack_traces st ON st.digest = e.stack_trace_digest
+    LEFT JOIN error_groups g
+        ON g.project_id = e.project_id AND g.error_hash = e.error_hash
+    WHERE p.uuid = %s AND e.uuid = %s
+    ORDER BY e.created_at DESC
+    LIMIT 1
     """
 
-    cursor.execute(user_count_query, [error_hash, project_uuid])
-    distinct_users = cursor.fetchone()[0]
+    cursor.execute(query, [project_uuid, error_uuid])
+    error = cursor.fetchone()
+
+    if not error:
+        if archive_dir is None:
+            return None
+        return _fetch_archived_error(
+            cursor, project_uuid, error_uuid, exact, archive_dir
+        )
+
+    if exact:
+        distinct_users = error[16]
+    else:
+        distinct_users = hll_estimate(error[16]) if error[16] is not None else 0
 
     return {
         "uuid": error_uuid,
@@ -137,28 +556,77 @@ def fetch_error(
         "contexts": error[9],
         "method": error[10],
         "path": error[11],
-        "os": error[13],
-        "browser": error[14],
-        "runtime": error[15],
-        "total_occurrences": total_occurrences,
+        "os": error[12],
+        "browser": error[13],
+        "runtime": error[14],
+        "total_occurrences": error[15] or 0,
         "distinct_users": distinct_users,
     }
 
 
+def _fetch_archived_error(
+    cursor, project_uuid: str, error_uuid: str, exact: bool, archive_dir: str
+) -> Optional[Dict[str, str]]:
+    """Reads an archived error, with the statistics of its group if it has any."""
+    row = find_archived_issue(archive_dir, project_uuid, "error", error_uuid)
+    if row is None:
+        return None
+
+    error_hashes = {row["error_hash"]} if row["error_hash"] else set()
+    stats = fetch_error_stats(cursor, project_uuid, error_hashes, exact).get(
+        row["error_hash"], {}
+    )
+
+    return {
+        "uuid": error_uuid,
+        "name": row["name"],
+        "message": row["message"],
+        "created_at": row["created_at"],
+        "file": row["file"],
+        "line_number": row["line_number"],
+        "col_number": row["col_number"],
+        "project_uuid": project_uuid,
+        "stack_trace": row["stack_trace"],
+        "handled": row["handled"],
+        "resolved": row["resolved"],
+        "contexts": row["contexts"],
+        "method": row["method"],
+        "path": row["path"],
+        "os": row["os"],
+        "browser": row["browser"],
+        "runtime": row["runtime"],
+        "total_occurrences": stats.get("total_occurrences", 0),
+        "distinct_users": stats.get("distinct_users", 0),
+        "archived": True,
+    }
+
+
 @db_read_connection
 def fetch_rejection(
-    project_uuid: str, rejection_uuid: int, **kwargs: dict
+    project_uuid: str,
+    rejection_uuid: int,
+    archive_dir: Optional[str] = None,
+    **kwargs: dict
 ) -> Optional[Dict[str, str]]:
-    """Retrieves a specific rejection log by its UUID."""
+    """Retrieves a specific rejection log of a project by its UUID.
+
+    Rejections missing from the database are looked up in the archive under
+    `archive_dir`, if given, and marked as archived.
+    """
     cursor = kwargs["cursor"]
 
     query = """
-    SELECT value, created_at, handled, resolved, method, path, os, browser, runtime
-    FROM rejection_logs
-    WHERE uuid = %s
+    SELECT
+        r.value, r.created_at, r.handled, r.resolved, r.method, r.path, r.os,
+        r.browser, r.runtime
+    FROM projects p
+    JOIN rejection_logs r ON r.project_id = p.id
+    WHERE p.uuid = %s AND r.uuid = %s
+    ORDER BY r.created_at DESC
+    LIMIT 1
     """
 
-    cursor.execute(query, [rejection_uuid])
+    cursor.execute(query, [project_uuid, rejection_uuid])
     rejection = cursor.fetchone()
 
     if rejection:
@@ -176,20 +644,45 @@ def fetch_rejection(
             "runtime": rejection[8],
         }
 
+    if archive_dir is not None:
+        row = find_archived_issue(
+            archive_dir, project_uuid, "rejection", rejection_uuid
+        )
+        if row is not None:
+            return {
+                "uuid": rejection_uuid,
+                "value": row["value"],
+                "created_at": row["created_at"],
+                "project_uuid": project_uuid,
+                "handled": row["handled"],
+                "resolved": row["resolved"],
+                "method": row["method"],
+                "path": row["path"],
+                "os": row["os"],
+                "browser": row["browser"],
+                "runtime": row["runtime"],
+                "archived": True,
+            }
+
     return None
 
 
 @db_write_connection
 def update_error_resolved(
-    error_uuid: str, new_resolved_state: bool, **kwargs: dict
+    project_uuid: str, error_uuid: str, new_resolved_state: bool, **kwargs: dict
 ) -> bool:
-    """Updates the resolved state of a specific error log."""
+    """Updates the resolved state of a specific error log of a project."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "UPDATE error_logs SET resolved = %s WHERE uuid = %s"
+    query = f"""
+    UPDATE error_logs e
+    SET resolved = %s
+    FROM ({_single_issue_target("error_logs")}) target
+    WHERE e.id = target.id AND e.created_at = target.created_at
+    """
 
-    cursor.execute(query, [new_resolved_state, error_uuid])
+    cursor.execute(query, [new_resolved_state, project_uuid, error_uuid])
     rows_updated = cursor.rowcount
     connection.commit()
 
@@ -198,15 +691,20 @@ def update_error_resolved(
 
 @db_write_connection
 def update_rejection_resolved(
-    rejection_uuid: int, new_resolved_state: bool, **kwargs: dict
+    project_uuid: str, rejection_uuid: int, new_resolved_state: bool, **kwargs: dict
 ) -> bool:
-    """Updates the resolved state of a specific rejection log."""
+    """Updates the resolved state of a specific rejection log of a project."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "UPDATE rejection_logs SET resolved = %s WHERE uuid = %s"
+    query = f"""
+    UPDATE rejection_logs r
+    SET resolved = %s
+    FROM ({_single_issue_target("rejection_logs")}) target
+    WHERE r.id = target.id AND r.created_at = target.created_at
+    """
 
-    cursor.execute(query, [new_resolved_state, rejection_uuid])
+    cursor.execute(query, [new_resolved_state, project_uuid, rejection_uuid])
     rows_updated = cursor.rowcount
     connection.commit()
 
@@ -214,14 +712,18 @@ def update_rejection_resolved(
 
 
 @db_write_connection
-def delete_error_by_id(error_uuid: str, **kwargs: dict) -> bool:
-    """Deletes a specific error log by its UUID."""
+def delete_error_by_id(project_uuid: str, error_uuid: str, **kwargs: dict) -> bool:
+    """Deletes a specific error log of a project by its UUID."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "DELETE FROM error_logs WHERE uuid = %s"
+    query = f"""
+    DELETE FROM error_logs e
+    USING ({_single_issue_target("error_logs")}) target
+    WHERE e.id = target.id AND e.created_at = target.created_at
+    """
 
-    cursor.execute(query, [error_uuid])
+    cursor.execute(query, [project_uuid, error_uuid])
     rows_deleted = cursor.rowcount
     connection.commit()
 
@@ -229,153 +731,263 @@ def delete_error_by_id(error_uuid: str, **kwargs: dict) -> bool:
 
 
 @db_write_connection
-def delete_rejection_by_id(rejection_uuid: str, **kwargs: dict) -> bool:
-    """Deletes a specific rejection log by its ID."""
+def delete_rejection_by_id(
+    project_uuid: str, rejection_uuid: str, **kwargs: dict
+) -> bool:
+    """Deletes a specific rejection log of a project by its UUID."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "DELETE FROM rejection_logs WHERE uuid = %s"
+    query = f"""
+    DELETE FROM rejection_logs r
+    USING ({_single_issue_target("rejection_logs")}) target
+    WHERE r.id = target.id AND r.created_at = target.created_at
+    """
 
-    cursor.execute(query, [rejection_uuid])
+    cursor.execute(query, [project_uuid, rejection_uuid])
     rows_deleted = cursor.rowcount
     connection.commit()
 
     return rows_deleted > 0
 
 
-@db_read_connection
-def get_issue_summary(project_uuid: str, **kwargs: dict) -> bool:
-    cursor = kwargs["cursor"]
+def _single_issue_target(table: str) -> str:
+    """Selects the primary key of a project's issue by UUID.
 
-    today = datetime.now(timezone.utc)
-    start_of_week = today - timedelta(days=7)
+    UUIDs are only unique together with `created_at` on the partitioned log tables,
+    so the newest matching row of the project is picked and the write then touches
+    exactly that row in its partition. Takes the project and issue UUIDs.
+    """
+    return f"""
+    SELECT x.id, x.created_at
+    FROM {table} x
+    WHERE x.project_id = (SELECT id FROM projects WHERE uuid = %s) AND x.uuid = %s
+    ORDER BY x.created_at DESC
+    LIMIT 1
+    """
 
-    query = """
-        SELECT DATE(created_at) AS day, COUNT(*) AS count
-        FROM error_logs
-        WHERE project_id IN (SELECT id FROM projects WHERE uuid = %s)
-        AND created_at >= %s
-        GROUP BY day
-        ORDER BY day
-        """
 
-    cursor.execute(
-        query,
-        (
-            project_uuid,
-            start_of_week,
-        ),
+def _batch_targets(
+    error_uuids: Optional[List[str]],
+    rejection_uuids: Optional[List[str]],
+    filters: Optional[Dict],
+) -> Iterator[Tuple[str, str, str, List]]:
+    """Yields (result key, table, WHERE fragment, params) for each table a batch
+    operation touches.
+
+    With UUID lists, only tables with UUIDs listed are touched. A filter applies to
+    both tables, except that an `error_hash` filter only matches errors.
+    """
+    targets = (
+        ("errors", "error_logs", error_uuids),
+        ("rejections", "rejection_logs", rejection_uuids),
     )
-    error_results = cursor.fetchall()
 
-    query = """
-        SELECT DATE(created_at) AS day, COUNT(*) AS count
-        FROM rejection_logs
-        WHERE project_id IN (SELECT id FROM projects WHERE uuid = %s)
-        AND created_at >= %s
-        GROUP BY day
-        ORDER BY day
+    for key, table, uuids in targets:
+        if filters is None and not uuids:
+            continue
+        if filters is not None and key == "rejections" and "error_hash" in filters:
+            continue
+
+        clauses, params = build_batch_filters(
+            "i", uuids if filters is None else None, filters
+        )
+        yield key, table, clauses, params
+
+
+@db_write_connection
+def update_issue_batch_resolved(
+    project_uuid: str,
+    new_resolved_state: bool,
+    error_uuids: Optional[List[str]] = None,
+    rejection_uuids: Optional[List[str]] = None,
+    filters: Optional[Dict] = None,
+    **kwargs: dict,
+) -> Dict[str, int]:
+    """Sets the resolved state of a batch of a project's errors and rejections.
+
+    Issues are selected by UUID lists or by `filters` (see `build_batch_filters`).
+    Each table is updated with one statement, in a single transaction, skipping
+    issues already in the requested state. Returns the number of issues updated
+    per table.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+    updated = {"errors": 0, "rejections": 0}
+
+    for key, table, clauses, params in _batch_targets(
+        error_uuids, rejection_uuids, filters
+    ):
+        query = f"""
+        UPDATE {table} i
+        SET resolved = %s
+        WHERE i.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        AND i.resolved <> %s
+        {clauses}
         """
 
-    cursor.execute(query, (project_uuid, start_of_week))
-    rejection_results = cursor.fetchall()
+        cursor.execute(
+            query, [new_resolved_state, project_uuid, new_resolved_state, *params]
+        )
+        updated[key] = cursor.rowcount
 
-    issue_counts = issue_counts = [0] * 7
+    connection.commit()
 
-    for day, count in error_results:
-        day_index = (today.date() - day).days
-        if 0 <= day_index < 7:
-            issue_counts[day_index] += count
+    return updated
 
-    for day, count in rejection_results:
-        day_index = (today.date() - day).days
-        if 0 <= day_index < 7:
-            issue_counts[day_index] += count
 
-    return issue_counts[::-1]
+@db_write_connection
+def delete_issue_batch(
+    project_uuid: str,
+    error_uuids: Optional[List[str]] = None,
+    rejection_uuids: Optional[List[str]] = None,
+    filters: Optional[Dict] = None,
+    **kwargs: dict,
+) -> Dict[str, int]:
+    """Deletes a batch of a project's errors and rejections.
+
+    Issues are selected by UUID lists or by `filters` (see `build_batch_filters`).
+    Each table is deleted from with one statement, in a single transaction. Returns
+    the number of issues deleted per table.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+    deleted = {"errors": 0, "rejections": 0}
+
+    for key, table, clauses, params in _batch_targets(
+        error_uuids, rejection_uuids, filters
+    ):
+        query = f"""
+        DELETE FROM {table} i
+        WHERE i.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        {clauses}
+        """
 
+        cursor.execute(query, [project_uuid, *params])
+        deleted[key] = cursor.rowcount
 
-@db_read_connection
-def fetch_most_recent_log(
-    project_uuid: str, **kwargs: dict
-) -> Optional[Dict[str, str]]:
-    """Fetches the most recent error or rejection log for a given project."""
+    connection.commit()
+
+    return deleted
+
+
+@db_write_connection
+def insert_issue_batch(
+    errors: List[Dict], rejections: List[Dict], **kwargs: dict
+) -> Dict[str, int]:
+    """Inserts a batch of ingested errors and rejections.
+
+    Rows come from `parse_error_event` and `parse_rejection_event`. Each table is
+    loaded with one `COPY`, in a single transaction, so the statement-level
+    aggregate triggers run once per batch. Returns the number of issues inserted
+    per table.
+    """
+    connection = kwargs["connection"]
     cursor = kwargs["cursor"]
+    inserted = {"errors": 0, "rejections": 0}
 
-    project_query = "SELECT id FROM projects WHERE uuid = %s"
+    for key, table, columns, rows in (
+        ("errors", "error_logs", ERROR_INGEST_COLUMNS, errors),
+        ("rejections", "rejection_logs", REJECTION_INGEST_COLUMNS, rejections),
+    ):
+        if not rows:
+            continue
 
-    cursor.execute(project_query, [project_uuid])
-    project = cursor.fetchone()
-    project_id = project[0]
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+            copy_buffer(rows, columns),
+        )
+        inserted[key] = cursor.rowcount
 
-    # Query to get the most recent error log
-    error_query = """
-    SELECT uuid, 'error' AS log_type, name, message, created_at, filename, line_number,
-           col_number, stack_trace, handled, resolved, contexts, method, path
-    FROM error_logs
-    WHERE project_id = %s
-    ORDER BY created_at DESC
-    LIMIT 1
+    connection.commit()
+
+    return inserted
+
+
+@db_read_connection
+def get_issue_summary(
+    project_uuid: str,
+    buckets: int = 7,
+    granularity: str = "day",
+    tz: str = "UTC",
+    **kwargs: dict,
+) -> List[int]:
+    """Counts a project's issues per day or hour, oldest bucket first.
+
+    See `summarize_issue_rollups` for how buckets are counted.
     """
+    cursor = kwargs["cursor"]
+
+    summaries = summarize_issue_rollups(
+        cursor, [project_uuid], buckets, granularity, tz
+    )
+
+    return summaries[project_uuid]
 
-    cursor.execute(error_query, [project_id])
-    error = cursor.fetchone()
 
-    # Query to get the most recent rejection log
-    rejection_query = """
+@db_read_connection
+def fetch_most_recent_log(
+    project_uuid: str, **kwargs: dict
+) -> Optional[Dict[str, str]]:
+    """Fetches the most recent error or rejection log for a given project.
+
+    The issue is found through the `project_latest_issues` pointer, which triggers
+    keep current, and read by its `(uuid, created_at)` key in the same statement.
+    """
+    cursor = kwargs["cursor"]
+
+    query = """
     SELECT
-        uuid, 'rejection' AS log_type, value, created_at, handled, resolved, method,
-        path
-    FROM rejection_logs
-    WHERE project_id = %s
-    ORDER BY created_at DESC
-    LIMIT 1
+        l.issue_uuid, l.issue_type, l.last_seen, e.name, e.message, e.filename,
+        e.line_number, e.col_number, COALESCE(e.stack_trace, st.stack_trace),
+        e.contexts, r.value,
+        COALESCE(e.handled, r.handled), COALESCE(e.resolved, r.resolved),
+        COALESCE(e.method, r.method), COALESCE(e.path, r.path)
+    FROM projects p
+    JOIN project_latest_issues l ON l.project_id = p.id
+    LEFT JOIN error_logs e
+        ON l.issue_type = 'error'
+        AND e.uuid = l.issue_uuid
+        AND e.created_at = l.last_seen
+    LEFT JOIN stack_traces st ON st.digest = e.stack_trace_digest
+    LEFT JOIN rejection_logs r
+        ON l.issue_type = 'rejection'
+        AND r.uuid = l.issue_uuid
+        AND r.created_at = l.last_seen
+    WHERE p.uuid = %s
     """
 
-    cursor.execute(rejection_query, [project_id])
-    rejection = cursor.fetchone()
+    cursor.execute(query, [project_uuid])
+    most_recent = cursor.fetchone()
 
-    # Compare the most recent error and rejection logs
-    most_recent = None
+    if not most_recent:
+        return None
 
-    if error and rejection:
-        if error[4] > rejection[3]:
-            most_recent = error
-        else:
-            most_recent = rejection
-    elif error:
-        most_recent = error
-    elif rejection:
-        most_recent = rejection
-
-    if most_recent:
-        if most_recent[1] == "error":
-            return {
-                "uuid": most_recent[0],
-                "name": most_recent[2],
-                "message": most_recent[3],
-                "created_at": most_recent[4].isoformat(),
-                "file": most_recent[5],
-                "line_number": most_recent[6],
-                "col_number": most_recent[7],
-                "project_uuid": project_uuid,
-                "stack_trace": most_recent[8],
-                "handled": most_recent[9],
-                "resolved": most_recent[10],
-                "contexts": most_recent[11],
-                "method": most_recent[12],
-                "path": most_recent[13],
-            }
-        elif most_recent[1] == "rejection":
-            return {
-                "uuid": most_recent[0],
-                "value": most_recent[2],
-                "created_at": most_recent[3].isoformat(),
-                "project_uuid": project_uuid,
-                "handled": most_recent[4],
-                "resolved": most_recent[5],
-                "method": most_recent[6],
-                "path": most_recent[7],
-            }
+    if most_recent[1] == "error":
+        return {
+            "uuid": most_recent[0],
+            "name": most_recent[3],
+            "message": most_recent[4],
+            "created_at": most_recent[2].isoformat(),
+            "file": most_recent[5],
+            "line_number": most_recent[6],
+            "col_number": most_recent[7],
+            "project_uuid": project_uuid,
+            "stack_trace": most_recent[8],
+            "handled": most_recent[11],
+            "resolved": most_recent[12],
+            "contexts": most_recent[9],
+            "method": most_recent[13],
+            "path": most_recent[14],
+        }
 
-    return None
+    return {
+        "uuid": most_recent[0],
+        "value": most_recent[10],
+        "created_at": most_recent[2].isoformat(),
+        "project_uuid": project_uuid,
+        "handled": most_recent[11],
+        "resolved": most_recent[12],
+        "method": most_recent[13],
+        "path": most_recent[14],
+    }
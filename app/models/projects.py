@@ -2,8 +2,9 @@
 
 This module provides functions for managing projects in the database, including
 fetching a paginated list of projects with associated issues, adding a new project,
-deleting a project, and updating a project's name. Each function is decorated to ensure
-the correct database connection context for reading or writing.
+and updating a project's name and retention. Projects are deleted by purge jobs (see
+`purge_jobs`). Each function is decorated to ensure the correct database connection
+context for reading or writing.
 """
 
 from flask import current_app
@@ -26,14 +27,11 @@ def fetch_projects(
         p.name,
         p.api_key,
         p.platform,
-        COUNT(DISTINCT e.id) AS error_count,
-        COUNT(DISTINCT r.id) AS rejection_count
+        COALESCE(SUM(c.issue_count), 0)::bigint AS issue_count
     FROM
         projects p
     LEFT JOIN
-        error_logs e ON e.project_id = p.id
-    LEFT JOIN
-        rejection_logs r ON r.project_id = p.id
+        project_issue_counters c ON c.project_id = p.id
     GROUP BY
         p.uuid, p.name, p.api_key, p.platform
     ORDER BY p.name
@@ -53,7 +51,7 @@ def fetch_projects(
             "name": row[1],
             "api_key": row[2],
             "platform": row[3],
-            "issue_count": row[4] + row[5],
+            "issue_count": row[4],
         }
         for row in rows
     ]
@@ -88,32 +86,31 @@ def add_project(
 
 
 @db_write_connection
-def delete_project_by_id(project_uuid: str, **kwargs) -> bool:
-    """Deletes a project by its unique project UUID, and returns the api_key"""
+def update_project_name(uuid: str, new_name: str, **kwargs) -> bool:
+    """Updates the name of a project by its unique project UUID."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "DELETE FROM projects WHERE uuid = %s RETURNING api_key"
+    query = "UPDATE projects SET name = %s WHERE uuid = %s"
 
-    cursor.execute(query, [project_uuid])
-    result = cursor.fetchone()[0]
+    cursor.execute(query, [new_name, uuid])
+    rows_updated = cursor.rowcount
     connection.commit()
 
-    if result:
-        return result[0]
-    else:
-        return None
+    return rows_updated > 0
 
 
 @db_write_connection
-def update_project_name(uuid: str, new_name: str, **kwargs) -> bool:
-    """Updates the name of a project by its unique project UUID."""
+def update_project_retention(
+    uuid: str, retention_days: Optional[int], **kwargs
+) -> bool:
+    """Sets how many days a project's issues are kept (None uses the global default)."""
     connection = kwargs["connection"]
     cursor = kwargs["cursor"]
 
-    query = "UPDATE projects SET name = %s WHERE uuid = %s"
+    query = "UPDATE projects SET retention_days = %s WHERE uuid = %s"
 
-    cursor.execute(query, [new_name, uuid])
+    cursor.execute(query, [retention_days, uuid])
     rows_updated = cursor.rowcount
     connection.commit()
 
@@ -167,3 +164,19 @@ def get_all_sns_subscription_arns_for_project(project_uuid: str, **kwargs) -> li
     rows = cursor.fetchall()
 
     return [row[0] for row in rows]
+
+
+@db_read_connection
+def get_project_by_api_key(api_key: str, **kwargs) -> Optional[Dict]:
+    """Gets the id and UUID of the project an API key belongs to."""
+    cursor = kwargs["cursor"]
+
+    query = "SELECT id, uuid FROM projects WHERE api_key = %s"
+
+    cursor.execute(query, [api_key])
+    result = cursor.fetchone()
+
+    if result:
+        return {"id": result[0], "uuid": result[1]}
+    else:
+        return None
@@ -0,0 +1,272 @@
+"""Purge jobs models module.
+
+This module provides functions for purging a project's issues, or the whole project,
+in the background. Rows are deleted in bounded batches, each in its own short
+transaction on a connection borrowed from the pool for that batch alone, and
+progress is recorded in the `purge_jobs` table so it can be polled while the job
+runs.
+
+Every batch also refreshes the job's `updated_at`. A running job that has not been
+updated for `stale_after` seconds is taken to belong to a worker that died, and can
+be claimed again; purging is idempotent, so the new worker simply carries on.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+from db import db_read_connection, db_write_connection
+from app.socketio import socketio
+from app.utils import delete_batch, delete_project_archive, generate_uuid
+
+PURGE_SCOPES = ("issues", "project")
+
+PURGED_TABLES = ("error_logs", "rejection_logs")
+
+# Seconds after which a running job without progress is considered abandoned
+DEFAULT_STALE_AFTER = 600
+
+# Matches jobs that a worker may claim. Takes the stale timeout in seconds.
+CLAIMABLE = """
+    (
+        status = 'pending'
+        OR (
+            status = 'running'
+            AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+        )
+    )
+"""
+
+
+@db_write_connection
+def create_purge_job(
+    project_uuid: str, scope: str, stale_after: float = DEFAULT_STALE_AFTER, **kwargs
+) -> Optional[str]:
+    """Queues a purge for a project and returns the job UUID.
+
+    A pending or running job with the same scope is reused rather than duplicated;
+    an abandoned running job (see the module docstring) is put back to pending so
+    it can be run again. Returns None if the project does not exist.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+
+    if scope not in PURGE_SCOPES:
+        raise ValueError(f"Unsupported purge scope: {scope}")
+
+    cursor.execute(
+        """
+        UPDATE purge_jobs
+        SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+        WHERE project_uuid = %s
+        AND scope = %s
+        AND status = 'running'
+        AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """,
+        [project_uuid, scope, stale_after],
+    )
+
+    query = """
+    INSERT INTO purge_jobs (uuid, project_uuid, scope)
+    SELECT %s, uuid, %s FROM projects WHERE uuid = %s
+    ON CONFLICT (project_uuid, scope) WHERE status IN ('pending', 'running')
+    DO NOTHING
+    RETURNING uuid
+    """
+
+    cursor.execute(query, [generate_uuid(), scope, project_uuid])
+    row = cursor.fetchone()
+
+    if row is None:
+        cursor.execute(
+            """
+            SELECT j.uuid
+            FROM purge_jobs j
+            JOIN projects p ON p.uuid = j.project_uuid
+            WHERE j.project_uuid = %s
+            AND j.scope = %s
+            AND j.status IN ('pending', 'running')
+            """,
+            [project_uuid, scope],
+        )
+        row = cursor.fetchone()
+
+    connection.commit()
+
+    return row[0] if row else None
+
+
+@db_read_connection
+def fetch_purge_job(
+    project_uuid: str, job_uuid: str, **kwargs
+) -> Optional[Dict[str, Union[str, int, None]]]:
+    """Retrieves a purge job's status and the number of rows removed so far."""
+    cursor = kwargs["cursor"]
+
+    query = """
+    SELECT
+        uuid, scope, status, rows_deleted, error, created_at, updated_at,
+        completed_at
+    FROM purge_jobs
+    WHERE uuid = %s AND project_uuid = %s
+    """
+
+    cursor.execute(query, [job_uuid, project_uuid])
+    row = cursor.fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "uuid": row[0],
+        "scope": row[1],
+        "status": row[2],
+        "rows_deleted": row[3],
+        "error": row[4],
+        "created_at": row[5],
+        "updated_at": row[6],
+        "completed_at": row[7],
+    }
+
+
+def run_purge_job(
+    job_uuid: str,
+    batch_size: int = 5000,
+    pause: float = 0.0,
+    archive_dir: Optional[str] = None,
+    stale_after: float = DEFAULT_STALE_AFTER,
+) -> Optional[str]:
+    """Runs a pending (or abandoned) purge job to completion.
+
+    Errors and rejections are deleted `batch_size` rows at a time, sleeping `pause`
+    seconds between batches so other work can run. No database connection is held
+    between batches. A project-scope job finally deletes the project itself, whose
+    remaining rows cascade, and returns its API key so it can be removed from AWS.
+    Returns None otherwise, including when the job cannot be claimed (for example,
+    another worker is running it). Archived issues under `archive_dir` are removed
+    along with the rest.
+    """
+    claimed = _claim_purge_job(job_uuid, stale_after)
+    if claimed is None:
+        return None
+
+    project_uuid, scope, project_id = claimed
+
+    try:
+        if project_id is not None:
+            for table in PURGED_TABLES:
+                while _delete_purge_batch(job_uuid, table, project_id, batch_size):
+                    if pause:
+                        socketio.sleep(pause)
+
+        if archive_dir is not None:
+            delete_project_archive(archive_dir, project_uuid)
+
+        return _complete_purge_job(job_uuid, project_id, scope)
+    except Exception as e:
+        _fail_purge_job(job_uuid, str(e))
+        raise
+
+
+@db_write_connection
+def _claim_purge_job(
+    job_uuid: str, stale_after: float, **kwargs
+) -> Optional[Tuple[str, str, Optional[int]]]:
+    """Marks a claimable job as running.
+
+    Returns its project UUID, scope and project id (None once the project is gone),
+    or None if the job cannot be claimed.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+
+    cursor.execute(
+        f"""
+        UPDATE purge_jobs j
+        SET status = 'running', updated_at = CURRENT_TIMESTAMP
+        WHERE j.uuid = %s AND {CLAIMABLE}
+        RETURNING
+            j.project_uuid,
+            j.scope,
+            (SELECT id FROM projects WHERE uuid = j.project_uuid)
+        """,
+        [job_uuid, stale_after],
+    )
+    row = cursor.fetchone()
+    connection.commit()
+
+    return row
+
+
+@db_write_connection
+def _delete_purge_batch(
+    job_uuid: str, table: str, project_id: int, batch_size: int, **kwargs
+) -> bool:
+    """Deletes one batch of a project's rows and records it on the job.
+
+    Returns whether the table may still hold rows of the project.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+
+    batch = delete_batch(cursor, table, "project_id = %s", [project_id], batch_size)
+    cursor.execute(
+        """
+        UPDATE purge_jobs
+        SET rows_deleted = rows_deleted + %s, updated_at = CURRENT_TIMESTAMP
+        WHERE uuid = %s
+        """,
+        [batch, job_uuid],
+    )
+    connection.commit()
+
+    return batch == batch_size
+
+
+@db_write_connection
+def _complete_purge_job(
+    job_uuid: str, project_id: Optional[int], scope: str, **kwargs
+) -> Optional[str]:
+    """Marks a job completed, first deleting the project for project-scope jobs.
+
+    Returns the deleted project's API key, if any.
+    """
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+    api_key = None
+
+    if scope == "project" and project_id is not None:
+        cursor.execute(
+            "DELETE FROM projects WHERE id = %s RETURNING api_key", [project_id]
+        )
+        deleted = cursor.fetchone()
+        api_key = deleted[0] if deleted else None
+
+    cursor.execute(
+        """
+        UPDATE purge_jobs
+        SET
+            status = 'completed',
+            updated_at = CURRENT_TIMESTAMP,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE uuid = %s
+        """,
+        [job_uuid],
+    )
+    connection.commit()
+
+    return api_key
+
+
+@db_write_connection
+def _fail_purge_job(job_uuid: str, error: str, **kwargs) -> None:
+    """Marks a job failed with the error that stopped it."""
+    connection = kwargs["connection"]
+    cursor = kwargs["cursor"]
+
+    cursor.execute(
+        """
+        UPDATE purge_jobs
+        SET status = 'failed', error = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE uuid = %s
+        """,
+        [error, job_uuid],
+    )
+    connection.commit()
@@ -156,8 +156,7 @@ def fetch_projects_for_user(user_uuid, page: int, limit: int, **kwargs) -> dict:
         p.name,
         p.api_key,
         p.platform,
-        COUNT(DISTINCT e.id) AS error_count,
-        COUNT(DISTINCT r.id) AS rejection_count
+        COALESCE(SUM(c.issue_count), 0)::bigint AS issue_count
     FROM
         projects p
     JOIN
@@ -165,9 +164,7 @@ def fetch_projects_for_user(user_uuid, page: int, limit: int, **kwargs) -> dict:
     JOIN
         users u ON pu.user_id = u.id
     LEFT JOIN
-        error_logs e ON e.project_id = p.id
-    LEFT JOIN
-        rejection_logs r ON r.project_id = p.id
+        project_issue_counters c ON c.project_id = p.id
     WHERE
         u.uuid = %s
     GROUP BY
@@ -185,7 +182,7 @@ def fetch_projects_for_user(user_uuid, page: int, limit: int, **kwargs) -> dict:
             "name": project[1],
             "api_key": project[2],
             "platform": project[3],
-            "issue_count": project[4] + project[5],
+            "issue_count": project[4],
         }
         for project in rows
     ]
@@ -10,6 +10,8 @@ Attributes:
     users_bp (Blueprint): Blueprint for user-related routes.
     auth_bp (Blueprint): Blueprint for authentication-related routes.
     notifications_bp (Blueprint): Blueprint for receiving and sending notifications.
+    dashboard_bp (Blueprint): Blueprint for the multi-project dashboard route.
+    ingest_bp (Blueprint): Blueprint for the SDK issue ingestion route.
 """
 
 from app.routes.projects import bp as projects_bp
@@ -18,3 +20,5 @@ from app.routes.project_users import bp as project_users_bp
 from app.routes.users import bp as users_bp
 from app.routes.auth import bp as auth_bp
 from app.routes.notifications import bp as notifications_bp
+from app.routes.dashboard import bp as dashboard_bp
+from app.routes.ingest import bp as ingest_bp
@@ -0,0 +1,55 @@
+"""Dashboard routes module.
+
+This module provides a single route that returns everything the dashboard shows
+for the current user's projects, so the dashboard does not have to request each
+project's summary and latest issue separately.
+"""
+
+from flask import jsonify, request, Response, current_app, g
+from flask import Blueprint
+from app.models import fetch_dashboard
+from app.utils import parse_summary_params
+from app.utils.auth import TokenManager, AuthManager
+
+token_manager = TokenManager()
+auth_manager = AuthManager(token_manager)
+
+bp = Blueprint("dashboard", __name__)
+
+
+@bp.route("", methods=["GET"])
+@auth_manager.authenticate
+def get_dashboard() -> Response:
+    """Gets issue counts, a summary and the latest issue for each visible project.
+
+    Takes the same `range`, `granularity` and `tz` parameters as the issue summary.
+    """
+    user_uuid = g.user_payload.get("user_uuid")
+    is_root = bool(g.user_payload.get("is_root"))
+    summary_range = request.args.get("range", "7d")
+    granularity = request.args.get("granularity", "day")
+    tz = request.args.get("tz", "UTC")
+
+    current_app.logger.debug(f"Fetching dashboard for user UUID={user_uuid}.")
+
+    try:
+        buckets = parse_summary_params(summary_range, granularity, tz)
+    except ValueError as e:
+        current_app.logger.error(
+            f"Invalid summary parameters range={summary_range}, "
+            f"granularity={granularity}, tz={tz}: {e}"
+        )
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        projects = fetch_dashboard(user_uuid, is_root, buckets, granularity, tz)
+        current_app.logger.info(
+            f"Fetched dashboard with {len(projects)} projects for user "
+            f"UUID={user_uuid}."
+        )
+        return jsonify({"payload": {"projects": projects}}), 200
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to fetch dashboard for user UUID={user_uuid}: {e}", exc_info=True
+        )
+        return jsonify({"message": "Failed to fetch dashboard."}), 500
@@ -0,0 +1,105 @@
+"""Ingestion routes module.
+
+This module provides the route SDKs send issues to. Requests are authenticated by
+the project's API key and carry a batch of errors and rejections, which are written
+with one `COPY` per table. Notifications go out once per batch, in the background.
+"""
+
+from flask import jsonify, request, Response, current_app, g
+from flask import Blueprint
+from psycopg2.errors import UniqueViolation
+from app.models import insert_issue_batch
+from app.routes.notifications import send_notification_to_frontend
+from app.utils import (
+    find_duplicate_uuid,
+    parse_error_event,
+    parse_rejection_event,
+    send_sns_notification,
+    start_background_job,
+)
+from app.utils.auth import TokenManager, AuthManager
+
+token_manager = TokenManager()
+auth_manager = AuthManager(token_manager)
+
+bp = Blueprint("ingest", __name__)
+
+
+def notify_new_issues(project_uuid: str) -> None:
+    """Sends the SNS and frontend notifications for a batch of new issues."""
+    send_sns_notification(project_uuid)
+    send_notification_to_frontend(project_uuid)
+
+
+@bp.route("", methods=["POST"])
+@auth_manager.authenticate_api_key
+def ingest_issues() -> Response:
+    """Stores a batch of errors and rejections sent by an SDK.
+
+    The body is `{"errors": [...], "rejections": [...]}`. The whole batch is
+    validated before anything is written, and written in one transaction.
+    """
+    project_uuid = g.project["uuid"]
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict):
+        current_app.logger.error("Invalid ingest request: No JSON payload.")
+        return jsonify({"message": "Invalid request"}), 400
+
+    error_events = data.get("errors") or []
+    rejection_events = data.get("rejections") or []
+    if not isinstance(error_events, list) or not isinstance(rejection_events, list):
+        return jsonify({"message": "'errors' and 'rejections' must be arrays."}), 400
+
+    batch_size = len(error_events) + len(rejection_events)
+    max_batch = current_app.config["INGEST_MAX_BATCH"]
+    if batch_size > max_batch:
+        current_app.logger.info(
+            f"Rejected batch of {batch_size} issues for project UUID={project_uuid}."
+        )
+        return (
+            jsonify({"message": f"Batches are limited to {max_batch} issues."}),
+            413,
+        )
+
+    project_id = g.project["id"]
+    try:
+        errors = [parse_error_event(e, project_id) for e in error_events]
+        rejections = [parse_rejection_event(r, project_id) for r in rejection_events]
+    except ValueError as e:
+        current_app.logger.info(
+            f"Invalid issue in batch for project UUID={project_uuid}: {e}"
+        )
+        return jsonify({"message": str(e)}), 400
+
+    if not errors and not rejections:
+        return jsonify({"payload": {"errors": 0, "rejections": 0}}), 200
+
+    duplicate = find_duplicate_uuid(errors + rejections)
+    if duplicate is not None:
+        current_app.logger.info(
+            f"Issue UUID={duplicate} repeated in batch for project UUID={project_uuid}."
+        )
+        return jsonify({"message": "Batch repeats an issue UUID."}), 409
+
+    try:
+        inserted = insert_issue_batch(errors, rejections)
+    except UniqueViolation:
+        current_app.logger.info(
+            f"Duplicate issue UUID in batch for project UUID={project_uuid}."
+        )
+        return jsonify({"message": "Batch contains an existing issue UUID."}), 409
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to ingest issues for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to ingest issues."}), 500
+
+    current_app.logger.info(
+        f"Ingested {inserted['errors']} errors and {inserted['rejections']} "
+        f"rejections for project UUID={project_uuid}."
+    )
+    start_background_job(notify_new_issues, project_uuid)
+
+    return jsonify({"payload": inserted}), 201
@@ -6,18 +6,39 @@ authorization enforced via JWT. Each route performs specific operations on error
 rejections, such as resolving or deleting individual items.
 """
 
-from flask import jsonify, request, Response, current_app
+import json
+from flask import jsonify, request, Response, current_app, stream_with_context
 from flask import Blueprint
 from app.models import (
     fetch_issues_by_project,
-    delete_issues_by_project,
+    search_issues,
+    stream_issues_for_export,
+    fetch_error_groups,
+    fetch_issue_facets,
     fetch_error,
     fetch_rejection,
     update_error_resolved,
     update_rejection_resolved,
     delete_error_by_id,
     delete_rejection_by_id,
+    update_issue_batch_resolved,
+    delete_issue_batch,
     get_issue_summary,
+    fetch_most_recent_log,
+    create_purge_job,
+    run_purge_job,
+)
+from app.utils import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    chunked,
+    csv_lines,
+    decode_cursor,
+    decode_rank_cursor,
+    gzip_chunks,
+    ndjson_lines,
+    parse_summary_params,
+    start_background_job,
 )
 from app.utils.auth import TokenManager, AuthManager
 
@@ -26,6 +47,19 @@ auth_manager = AuthManager(token_manager)
 
 bp = Blueprint("project_issues", __name__)
 
+# Largest number of UUIDs accepted by one batch request
+MAX_BATCH_UUIDS = 1000
+
+BATCH_FILTER_KEYS = ("handled", "time", "resolved", "error_hash")
+
+# Issue list parameters matched against text, and the shortest value accepted for
+# them: trigram indexes cannot narrow down anything shorter
+TEXT_FILTER_KEYS = ("filename", "path", "name")
+MIN_TEXT_FILTER_LENGTH = 3
+
+ISSUE_FACETS = ("browser", "os", "runtime", "path", "method")
+MAX_FACET_VALUES = 100
+
 
 @bp.route("", methods=["GET"])
 @auth_manager.authenticate
@@ -37,11 +71,19 @@ def get_issues(project_uuid: str) -> Response:
     handled = request.args.get("handled", None)
     time = request.args.get("time", None)
     resolved = request.args.get("resolved", None)
+    cursor_token = request.args.get("cursor", None)
+    exact = request.args.get("exact", "false").lower() == "true"
+    count = request.args.get("count", None)
+    fuzzy = request.args.get("fuzzy", "false").lower() == "true"
+    context = request.args.get("context", None)
+    column_filters = {
+        key: request.args[key] for key in TEXT_FILTER_KEYS if request.args.get(key)
+    }
 
     current_app.logger.debug(
         (
             f"Fetching issues for project UUID={project_uuid} with page={page}, "
-            f"limit={limit}"
+            f"limit={limit}, cursor={cursor_token}, count={count}"
         )
     )
 
@@ -58,9 +100,55 @@ def get_issues(project_uuid: str) -> Response:
         current_app.logger.error("Project identifier is required but missing.")
         return jsonify({"message": "Project identifier is required."}), 400
 
+    if count not in (None, "none", "estimate", "exact"):
+        current_app.logger.error(f"Invalid count mode: {count}")
+        return jsonify({"message": "Invalid count mode."}), 400
+
+    if any(len(value) < MIN_TEXT_FILTER_LENGTH for value in column_filters.values()):
+        current_app.logger.error(f"Text filter too short: {column_filters}")
+        return (
+            jsonify(
+                {
+                    "message": (
+                        f"Text filters need at least {MIN_TEXT_FILTER_LENGTH} "
+                        "characters."
+                    )
+                }
+            ),
+            400,
+        )
+
+    if context:
+        try:
+            column_filters["contexts"] = json.loads(context)
+        except ValueError:
+            column_filters["contexts"] = None
+        if not isinstance(column_filters["contexts"], dict):
+            current_app.logger.error(f"Invalid context filter: {context}")
+            return jsonify({"message": "Invalid context filter."}), 400
+
+    after = None
+    if cursor_token:
+        try:
+            after = decode_cursor(cursor_token)
+        except ValueError:
+            current_app.logger.error(f"Invalid pagination cursor: {cursor_token}")
+            return jsonify({"message": "Invalid cursor."}), 400
+
     try:
         issue_data = fetch_issues_by_project(
-            project_uuid, page, limit, handled, time, resolved
+            project_uuid,
+            page,
+            limit,
+            handled,
+            time,
+            resolved,
+            after=after,
+            keyset=cursor_token is not None,
+            exact=exact,
+            count=count,
+            column_filters=column_filters,
+            fuzzy=fuzzy,
         )
         current_app.logger.info(
             (
@@ -77,11 +165,212 @@ def get_issues(project_uuid: str) -> Response:
         return jsonify({"message": "Failed to fetch issues."}), 500
 
 
+@bp.route("/groups", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def get_error_groups(project_uuid: str) -> Response:
+    """Fetches a cursor-paginated list of error groups for a specified project."""
+    limit = request.args.get("limit", 10, type=int)
+    resolved = request.args.get("resolved", None)
+    time = request.args.get("time", None)
+    cursor_token = request.args.get("cursor", None)
+    exact = request.args.get("exact", "false").lower() == "true"
+
+    current_app.logger.debug(
+        (
+            f"Fetching error groups for project UUID={project_uuid} with "
+            f"limit={limit}, cursor={cursor_token}"
+        )
+    )
+
+    if limit < 1:
+        current_app.logger.error(f"Invalid pagination parameters: limit={limit}")
+        return jsonify({"message": "Invalid pagination parameters."}), 400
+
+    after = None
+    if cursor_token:
+        try:
+            after = decode_cursor(cursor_token)
+        except ValueError:
+            current_app.logger.error(f"Invalid pagination cursor: {cursor_token}")
+            return jsonify({"message": "Invalid cursor."}), 400
+
+    try:
+        group_data = fetch_error_groups(
+            project_uuid, limit, resolved, time, after, exact=exact
+        )
+        current_app.logger.info(
+            (
+                f"Fetched {len(group_data['groups'])} error groups for project "
+                f"UUID={project_uuid}."
+            )
+        )
+        return jsonify({"payload": group_data}), 200
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to fetch error groups for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to fetch error groups."}), 500
+
+
+@bp.route("/export", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def export_issues(project_uuid: str) -> Response:
+    """Streams all of a project's issues as NDJSON or CSV, optionally gzipped.
+
+    With `archived=true`, archived issues follow the ones still in the database.
+    """
+    export_format = request.args.get("format", "ndjson")
+    compress = request.args.get("gzip", "false").lower() == "true"
+    archived = request.args.get("archived", "false").lower() == "true"
+    handled = request.args.get("handled", None)
+    time = request.args.get("time", None)
+    resolved = request.args.get("resolved", None)
+
+    current_app.logger.debug(
+        (
+            f"Exporting issues for project UUID={project_uuid} as "
+            f"{export_format}, gzip={compress}"
+        )
+    )
+
+    if export_format not in EXPORT_FORMATS:
+        current_app.logger.error(f"Invalid export format: {export_format}")
+        return jsonify({"message": "Invalid export format."}), 400
+
+    rows = stream_issues_for_export(
+        project_uuid,
+        handled,
+        time,
+        resolved,
+        itersize=current_app.config.get("EXPORT_ITERSIZE", 2000),
+        archive_dir=current_app.config.get("ARCHIVE_DIR") if archived else None,
+    )
+    if export_format == "csv":
+        body = chunked(csv_lines(rows, EXPORT_COLUMNS))
+    else:
+        body = chunked(ndjson_lines(rows))
+
+    filename = f"issues-{project_uuid}.{export_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers=headers,
+    )
+
+
+@bp.route("/facets", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def get_issue_facets(project_uuid: str) -> Response:
+    """Fetches the most common browsers, OSes, runtimes, paths and methods."""
+    limit = request.args.get("limit", 10, type=int)
+    error_hash = request.args.get("error_hash", None)
+    time = request.args.get("time", None)
+    until = request.args.get("until", None)
+    facets = request.args.get("facets", ",".join(ISSUE_FACETS)).split(",")
+
+    current_app.logger.debug(
+        (
+            f"Fetching issue facets for project UUID={project_uuid} with "
+            f"facets={facets}, error_hash={error_hash}, limit={limit}"
+        )
+    )
+
+    if limit < 1 or limit > MAX_FACET_VALUES:
+        current_app.logger.error(f"Invalid facet limit: {limit}")
+        return jsonify({"message": "Invalid limit."}), 400
+
+    if not set(facets) <= set(ISSUE_FACETS):
+        current_app.logger.error(f"Invalid facets: {facets}")
+        return jsonify({"message": "Invalid facets."}), 400
+
+    try:
+        facet_data = fetch_issue_facets(
+            project_uuid, facets, limit, error_hash, time, until
+        )
+        current_app.logger.info(
+            f"Fetched issue facets for project UUID={project_uuid}."
+        )
+        return jsonify({"payload": facet_data}), 200
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to fetch issue facets for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to fetch issue facets."}), 500
+
+
+@bp.route("/search", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def search_project_issues(project_uuid: str) -> Response:
+    """Searches a project's issues by text, ranked and cursor-paginated."""
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", 10, type=int)
+    handled = request.args.get("handled", None)
+    time = request.args.get("time", None)
+    resolved = request.args.get("resolved", None)
+    cursor_token = request.args.get("cursor", None)
+
+    current_app.logger.debug(
+        (
+            f"Searching issues for project UUID={project_uuid} with "
+            f"limit={limit}, cursor={cursor_token}"
+        )
+    )
+
+    if not query:
+        current_app.logger.error("Search query is required but missing.")
+        return jsonify({"message": "Search query is required."}), 400
+
+    if limit < 1:
+        current_app.logger.error(f"Invalid pagination parameters: limit={limit}")
+        return jsonify({"message": "Invalid pagination parameters."}), 400
+
+    after = None
+    if cursor_token:
+        try:
+            after = decode_rank_cursor(cursor_token)
+        except ValueError:
+            current_app.logger.error(f"Invalid pagination cursor: {cursor_token}")
+            return jsonify({"message": "Invalid cursor."}), 400
+
+    try:
+        search_data = search_issues(
+            project_uuid, query, limit, handled, time, resolved, after
+        )
+        current_app.logger.info(
+            (
+                f"Found {len(search_data['issues'])} matching issues for project "
+                f"UUID={project_uuid}."
+            )
+        )
+        return jsonify({"payload": search_data}), 200
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to search issues for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to search issues."}), 500
+
+
 @bp.route("", methods=["DELETE"])
 @auth_manager.authenticate
 @auth_manager.authorize_project_access
 def delete_issues(project_uuid: str) -> Response:
-    """Deletes all issues for a specified project."""
+    """Starts a background purge of all issues for a specified project.
+
+    Returns 202 with the purge job UUID; progress is reported by
+    `GET /api/projects/<project_uuid>/purges/<job_uuid>`.
+    """
     current_app.logger.debug(f"Deleting all issues for project UUID={project_uuid}.")
 
     if not project_uuid:
@@ -89,23 +378,147 @@ def delete_issues(project_uuid: str) -> Response:
         return jsonify({"message": "Project identifier required."}), 400
 
     try:
-        success = delete_issues_by_project(project_uuid)
-        if success:
+        stale_after = current_app.config.get("PURGE_STALE_SECONDS", 600)
+        job_uuid = create_purge_job(project_uuid, "issues", stale_after)
+        if job_uuid:
+            start_background_job(
+                run_purge_job,
+                job_uuid,
+                current_app.config.get("PURGE_BATCH_SIZE", 5000),
+                current_app.config.get("PURGE_PAUSE_SECONDS", 0.1),
+                current_app.config.get("ARCHIVE_DIR"),
+                stale_after,
+            )
             current_app.logger.info(
-                f"Deleted all issues for project UUID={project_uuid}."
+                f"Started purge job UUID={job_uuid} for issues of project "
+                f"UUID={project_uuid}."
             )
-            return "", 204
+            return jsonify({"payload": {"job_uuid": job_uuid}}), 202
         else:
-            current_app.logger.warning(
-                f"No issues found for project UUID={project_uuid}."
+            current_app.logger.warning(f"Project not found: {project_uuid}")
+            return jsonify({"message": "Project not found."}), 404
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to delete issues for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to delete issues."}), 500
+
+
+def parse_batch_selection(data: dict) -> tuple:
+    """Reads the issues a batch request applies to from its JSON payload.
+
+    Returns `(error_uuids, rejection_uuids, filters)`. Raises ValueError with a
+    client-facing message when the selection is missing or malformed.
+    """
+    error_uuids = data.get("errors")
+    rejection_uuids = data.get("rejections")
+    filters = data.get("filter")
+
+    uuid_lists = [
+        uuids for uuids in (error_uuids, rejection_uuids) if uuids is not None
+    ]
+    for uuids in uuid_lists:
+        if not isinstance(uuids, list) or not all(
+            isinstance(uuid, str) for uuid in uuids
+        ):
+            raise ValueError("Issue UUIDs must be lists of strings.")
+
+    if filters is not None:
+        if uuid_lists:
+            raise ValueError("Provide either issue UUIDs or a filter, not both.")
+        if (
+            not isinstance(filters, dict)
+            or not filters
+            or any(key not in BATCH_FILTER_KEYS for key in filters)
+        ):
+            raise ValueError("Invalid filter.")
+    elif not any(uuid_lists):
+        raise ValueError("Issue UUIDs or a filter required.")
+    elif sum(len(uuids) for uuids in uuid_lists) > MAX_BATCH_UUIDS:
+        raise ValueError(f"At most {MAX_BATCH_UUIDS} issues per batch.")
+
+    return error_uuids, rejection_uuids, filters
+
+
+@bp.route("/batch", methods=["PATCH"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def toggle_issue_batch(project_uuid: str) -> Response:
+    """Sets the resolved state of a batch of errors and rejections."""
+    current_app.logger.debug(
+        f"Updating resolved state of an issue batch for project UUID={project_uuid}."
+    )
+
+    data = request.get_json(silent=True)
+    if not data:
+        current_app.logger.error("Invalid request: No JSON payload.")
+        return jsonify({"message": "Invalid request."}), 400
+
+    new_resolved_state = data.get("resolved")
+    if not isinstance(new_resolved_state, bool):
+        current_app.logger.error("New resolved state is required but missing.")
+        return jsonify({"message": "Missing resolved state."}), 400
+
+    try:
+        error_uuids, rejection_uuids, filters = parse_batch_selection(data)
+    except ValueError as e:
+        current_app.logger.error(f"Invalid issue batch: {e}")
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        updated = update_issue_batch_resolved(
+            project_uuid, new_resolved_state, error_uuids, rejection_uuids, filters
+        )
+        current_app.logger.info(
+            (
+                f"Updated {updated['errors']} errors and {updated['rejections']} "
+                f"rejections in project UUID={project_uuid}."
             )
-            return (
-                jsonify({"message": "No issues found for this project."}),
-                404,
+        )
+        return jsonify({"payload": updated}), 200
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to update issue batch for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to update issues."}), 500
+
+
+@bp.route("/batch", methods=["DELETE"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def remove_issue_batch(project_uuid: str) -> Response:
+    """Deletes a batch of errors and rejections."""
+    current_app.logger.debug(
+        f"Deleting an issue batch from project UUID={project_uuid}."
+    )
+
+    data = request.get_json(silent=True)
+    if not data:
+        current_app.logger.error("Invalid request: No JSON payload.")
+        return jsonify({"message": "Invalid request."}), 400
+
+    try:
+        error_uuids, rejection_uuids, filters = parse_batch_selection(data)
+    except ValueError as e:
+        current_app.logger.error(f"Invalid issue batch: {e}")
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        deleted = delete_issue_batch(
+            project_uuid, error_uuids, rejection_uuids, filters
+        )
+        current_app.logger.info(
+            (
+                f"Deleted {deleted['errors']} errors and {deleted['rejections']} "
+                f"rejections from project UUID={project_uuid}."
             )
+        )
+        return jsonify({"payload": deleted}), 200
     except Exception as e:
         current_app.logger.error(
-            f"Failed to delete issues for project UUID={project_uuid}: {e}",
+            f"Failed to delete issue batch for project UUID={project_uuid}: {e}",
             exc_info=True,
         )
         return jsonify({"message": "Failed to delete issues."}), 500
@@ -116,6 +529,8 @@ def delete_issues(project_uuid: str) -> Response:
 @auth_manager.authorize_project_access
 def get_error(project_uuid: str, error_uuid: str) -> Response:
     """Retrieves a specific error by its ID."""
+    exact = request.args.get("exact", "false").lower() == "true"
+
     current_app.logger.debug(
         f"Fetching error UUID={error_uuid} for project UUID={project_uuid}."
     )
@@ -129,7 +544,12 @@ def get_error(project_uuid: str, error_uuid: str) -> Response:
         return jsonify({"message": "Error identifier required."}), 400
 
     try:
-        error = fetch_error(project_uuid, error_uuid)
+        error = fetch_error(
+            project_uuid,
+            error_uuid,
+            exact=exact,
+            archive_dir=current_app.config.get("ARCHIVE_DIR"),
+        )
         if error:
             current_app.logger.info(
                 f"Error UUID={error_uuid} fetched for project UUID={project_uuid}."
@@ -169,7 +589,11 @@ def get_rejection(project_uuid: str, rejection_uuid: str) -> Response:
         return jsonify({"message": "Rejection identifier required."}), 400
 
     try:
-        rejection = fetch_rejection(project_uuid, rejection_uuid)
+        rejection = fetch_rejection(
+            project_uuid,
+            rejection_uuid,
+            archive_dir=current_app.config.get("ARCHIVE_DIR"),
+        )
         if rejection:
             current_app.logger.info(
                 (
@@ -230,7 +654,9 @@ def toggle_error(project_uuid: str, error_uuid: str) -> Response:
         return jsonify({"message": "Missing resolved state."}), 400
 
     try:
-        success = update_error_resolved(error_uuid, new_resolved_state)
+        success = update_error_resolved(
+            project_uuid, error_uuid, new_resolved_state
+        )
         if success:
             current_app.logger.info(
                 (
@@ -287,7 +713,9 @@ def toggle_rejection(project_uuid: str, rejection_uuid: str) -> Response:
         return jsonify({"message": "Missing resolved state."}), 400
 
     try:
-        success = update_rejection_resolved(rejection_uuid, new_resolved_state)
+        success = update_rejection_resolved(
+            project_uuid, rejection_uuid, new_resolved_state
+        )
         if success:
             current_app.logger.info(
                 (
@@ -333,7 +761,7 @@ def delete_error(project_uuid: str, error_uuid: str) -> Response:
         return jsonify({"message": "Error identifier required."}), 400
 
     try:
-        success = delete_error_by_id(error_uuid)
+        success = delete_error_by_id(project_uuid, error_uuid)
         if success:
             current_app.logger.info(
                 f"Error UUID={error_uuid} deleted from project UUID={project_uuid}."
@@ -373,7 +801,7 @@ def delete_rejection(project_uuid: str, rejection_uuid: str) -> Response:
         return jsonify({"message": "Rejection identifier required."}), 400
 
     try:
-        success = delete_rejection_by_id(rejection_uuid)
+        success = delete_rejection_by_id(project_uuid, rejection_uuid)
         if success:
             current_app.logger.info(
                 (
@@ -405,22 +833,70 @@ def delete_rejection(project_uuid: str, rejection_uuid: str) -> Response:
 @auth_manager.authenticate
 @auth_manager.authorize_project_access
 def get_summary(project_uuid: str) -> Response:
-    """Gets issue count per day for the last 7 days for this project."""
-    current_app.logger.debug(f"Fetching issue summary for project UUID={project_uuid}.")
+    """Gets issue counts per day or hour for this project, oldest first.
+
+    Defaults to the last 7 days in UTC.
+    """
+    summary_range = request.args.get("range", "7d")
+    granularity = request.args.get("granularity", "day")
+    tz = request.args.get("tz", "UTC")
+
+    current_app.logger.debug(
+        (
+            f"Fetching issue summary for project UUID={project_uuid} with "
+            f"range={summary_range}, granularity={granularity}, tz={tz}."
+        )
+    )
 
     if not project_uuid:
         current_app.logger.error("Project identifier is required but missing.")
         return jsonify({"message": "Project identifier required."}), 400
 
     try:
-        daily_counts = get_issue_summary(project_uuid)
+        buckets = parse_summary_params(summary_range, granularity, tz)
+    except ValueError as e:
+        current_app.logger.error(
+            f"Invalid summary parameters range={summary_range}, "
+            f"granularity={granularity}, tz={tz}: {e}"
+        )
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        counts = get_issue_summary(project_uuid, buckets, granularity, tz)
         current_app.logger.info(
             f"Fetched issue summary for project UUID={project_uuid}."
         )
-        return jsonify({"payload": daily_counts}), 200
+        return jsonify({"payload": counts}), 200
     except Exception as e:
         current_app.logger.error(
             f"Failed to fetch issue summary for project UUID={project_uuid}: {e}",
             exc_info=True,
         )
         return jsonify({"message": "Failed to fetch issue summary."}), 500
+
+
+@bp.route("/latest", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def get_latest_issue(project_uuid: str) -> Response:
+    """Gets the most recent error or rejection for this project."""
+    current_app.logger.debug(f"Fetching latest issue for project UUID={project_uuid}.")
+
+    try:
+        latest_issue = fetch_most_recent_log(project_uuid)
+        if latest_issue:
+            current_app.logger.info(
+                f"Fetched latest issue for project UUID={project_uuid}."
+            )
+            return jsonify({"payload": latest_issue}), 200
+        else:
+            current_app.logger.warning(
+                f"No issues found for project UUID={project_uuid}."
+            )
+            return jsonify({"message": "No issues found for this project."}), 404
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to fetch latest issue for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to fetch latest issue."}), 500
@@ -4,13 +4,17 @@ This module provides routes for managing projects, including creating, fetching,
 updating, and deleting project records. Each route enforces root access authorization.
 """
 
+from typing import Optional
 from flask import jsonify, request, Response, current_app
 from flask import Blueprint
 from app.models import (
     fetch_projects,
     add_project,
-    delete_project_by_id,
     update_project_name,
+    update_project_retention,
+    create_purge_job,
+    fetch_purge_job,
+    run_purge_job,
 )
 from app.utils.auth import TokenManager, AuthManager
 from app.utils import (
@@ -19,6 +23,7 @@ from app.utils import (
     delete_api_key_from_aws,
     create_sns_topic,
     delete_sns_topic_from_aws,
+    start_background_job,
 )
 
 token_manager = TokenManager()
@@ -116,7 +121,11 @@ def create_project() -> Response:
 @auth_manager.authenticate
 @auth_manager.authorize_root
 def delete_project(project_uuid: str) -> Response:
-    """Deletes a specified project by its project UUID."""
+    """Starts a background purge of a project and its issues.
+
+    Returns 202 with the purge job UUID; progress is reported by
+    `GET /api/projects/<project_uuid>/purges/<job_uuid>`.
+    """
     current_app.logger.debug(f"Received request to delete project: {project_uuid}")
 
     if not project_uuid:
@@ -124,16 +133,27 @@ def delete_project(project_uuid: str) -> Response:
         return jsonify({"message": "Project identifier required."}), 400
 
     try:
-        delete_sns_topic_from_aws(project_uuid)
-        api_key = delete_project_by_id(project_uuid)
+        stale_after = current_app.config.get("PURGE_STALE_SECONDS", 600)
+        job_uuid = create_purge_job(project_uuid, "project", stale_after)
 
-        if api_key:
-            delete_api_key_from_aws(api_key)
-            current_app.logger.info(f"Deleted project: {project_uuid}")
-            return "", 204
-        else:
+        if not job_uuid:
             current_app.logger.warning(f"Project not found: {project_uuid}")
             return jsonify({"message": "Project not found."}), 404
+
+        delete_sns_topic_from_aws(project_uuid)
+        start_background_job(
+            purge_project,
+            job_uuid,
+            current_app.config.get("PURGE_BATCH_SIZE", 5000),
+            current_app.config.get("PURGE_PAUSE_SECONDS", 0.1),
+            current_app.config.get("ARCHIVE_DIR"),
+            stale_after,
+        )
+
+        current_app.logger.info(
+            f"Started purge job UUID={job_uuid} for project: {project_uuid}"
+        )
+        return jsonify({"payload": {"job_uuid": job_uuid}}), 202
     except Exception as e:
         current_app.logger.error(
             f"Failed to delete project UUID={project_uuid}: {e}", exc_info=True
@@ -141,6 +161,45 @@ def delete_project(project_uuid: str) -> Response:
         return jsonify({"message": "Failed to delete project."}), 500
 
 
+def purge_project(
+    job_uuid: str,
+    batch_size: int,
+    pause: float,
+    archive_dir: Optional[str],
+    stale_after: float,
+) -> None:
+    """Runs a project purge job, then removes the project's API key from AWS."""
+    api_key = run_purge_job(job_uuid, batch_size, pause, archive_dir, stale_after)
+
+    if api_key:
+        delete_api_key_from_aws(api_key)
+        current_app.logger.info(f"Purge job UUID={job_uuid} deleted its project.")
+
+
+@bp.route("/<project_uuid>/purges/<job_uuid>", methods=["GET"])
+@auth_manager.authenticate
+@auth_manager.authorize_project_access
+def get_purge_job(project_uuid: str, job_uuid: str) -> Response:
+    """Reports the status of a purge job and how many rows it has removed."""
+    current_app.logger.debug(
+        f"Fetching purge job UUID={job_uuid} for project UUID={project_uuid}."
+    )
+
+    try:
+        job = fetch_purge_job(project_uuid, job_uuid)
+
+        if job:
+            return jsonify({"payload": job}), 200
+        else:
+            current_app.logger.warning(f"Purge job not found: {job_uuid}")
+            return jsonify({"message": "Purge job not found."}), 404
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to fetch purge job UUID={job_uuid}: {e}", exc_info=True
+        )
+        return jsonify({"message": "Failed to fetch purge job."}), 500
+
+
 @bp.route("/<project_uuid>", methods=["PATCH"])
 @auth_manager.authenticate
 @auth_manager.authorize_root
@@ -179,3 +238,44 @@ def update_project(project_uuid: str) -> Response:
             f"Failed to update project UUID={project_uuid}: {e}", exc_info=True
         )
         return jsonify({"message": "Failed to update project."}), 500
+
+
+@bp.route("/<project_uuid>/retention", methods=["PUT"])
+@auth_manager.authenticate
+@auth_manager.authorize_root
+def update_retention(project_uuid: str) -> Response:
+    """Sets how long a project's issues are kept before they expire."""
+    current_app.logger.debug(
+        f"Received request to update retention for project: {project_uuid}"
+    )
+
+    data = request.get_json()
+
+    if not data or "retention_days" not in data:
+        current_app.logger.error("Invalid request: retention_days is missing.")
+        return jsonify({"message": "Retention days required."}), 400
+
+    retention_days = data.get("retention_days")
+
+    if retention_days is not None and (
+        type(retention_days) is not int or retention_days < 1
+    ):
+        current_app.logger.error(f"Invalid retention days: {retention_days}")
+        return jsonify({"message": "Invalid retention days."}), 400
+
+    try:
+        success = update_project_retention(project_uuid, retention_days)
+        if success:
+            current_app.logger.info(
+                f"Updated project {project_uuid} retention to {retention_days} days"
+            )
+            return "", 204
+        else:
+            current_app.logger.warning(f"Project not found for update: {project_uuid}")
+            return jsonify({"message": "Project not found."}), 404
+    except Exception as e:
+        current_app.logger.error(
+            f"Failed to update retention for project UUID={project_uuid}: {e}",
+            exc_info=True,
+        )
+        return jsonify({"message": "Failed to update project."}), 500
@@ -2,13 +2,51 @@
 
 from .db_helpers import (
     calculate_total_project_pages,
-    fetch_errors_by_project,
-    fetch_rejections_by_project,
+    build_issue_filters,
+    build_batch_filters,
+    summarize_issue_rollups,
+    fetch_latest_issues,
+    fetch_issues_page,
+    fetch_error_stats,
     calculate_total_error_pages,
     calculate_total_user_project_pages,
+    delete_batch,
+    delete_in_batches,
+)
+from .archive import (
+    find_archived_issue,
+    iter_archived_issues,
+    delete_project_archive,
+)
+from .background import start_background_job
+from .export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    EXPORT_SELECTS,
+    ndjson_lines,
+    csv_lines,
+    chunked,
+    gzip_chunks,
+)
+from .hll import hll_estimate, hll_merge
+from .ingest import (
+    ERROR_INGEST_COLUMNS,
+    REJECTION_INGEST_COLUMNS,
+    compute_error_hash,
+    parse_error_event,
+    parse_rejection_event,
+    find_duplicate_uuid,
+    copy_row,
+    copy_buffer,
+)
+from .pagination import (
+    encode_cursor,
+    decode_cursor,
+    encode_rank_cursor,
+    decode_rank_cursor,
 )
 from .uuid_generator import generate_uuid
-from .validation import is_valid_email
+from .validation import is_valid_email, parse_summary_params
 from .aws_helpers import (
     create_aws_client,
     get_secret,
@@ -23,12 +61,44 @@ from .aws_helpers import (
 
 __all__ = [
     "calculate_total_project_pages",
-    "fetch_errors_by_project",
-    "fetch_rejections_by_project",
+    "build_issue_filters",
+    "build_batch_filters",
+    "summarize_issue_rollups",
+    "fetch_latest_issues",
+    "fetch_issues_page",
+    "fetch_error_stats",
     "calculate_total_error_pages",
+    "find_archived_issue",
+    "iter_archived_issues",
+    "delete_project_archive",
+    "start_background_job",
+    "EXPORT_COLUMNS",
+    "EXPORT_FORMATS",
+    "EXPORT_SELECTS",
+    "ndjson_lines",
+    "csv_lines",
+    "chunked",
+    "gzip_chunks",
+    "hll_estimate",
+    "hll_merge",
+    "ERROR_INGEST_COLUMNS",
+    "REJECTION_INGEST_COLUMNS",
+    "compute_error_hash",
+    "parse_error_event",
+    "parse_rejection_event",
+    "find_duplicate_uuid",
+    "copy_row",
+    "copy_buffer",
+    "encode_cursor",
+    "decode_cursor",
+    "encode_rank_cursor",
+    "decode_rank_cursor",
     "generate_uuid",
     "is_valid_email",
+    "parse_summary_params",
     "calculate_total_user_project_pages",
+    "delete_batch",
+    "delete_in_batches",
     "create_aws_client",
     "get_secret",
     "associate_api_key_with_usage_plan",
@@ -0,0 +1,511 @@
+"""Cold storage for old issues.
+
+Issues older than the archive age are moved out of Postgres into append-only segment
+files on local disk, one directory per project:
+
+    <archive_dir>/<project_uuid>/<issue_type>-<sequence>.seg
+    <archive_dir>/<project_uuid>/<issue_type>-<sequence>.idx
+
+A segment is a series of zlib-compressed blocks, each holding up to `BLOCK_ROWS`
+issues as NDJSON lines, newest first. Its index holds one fixed-width record per
+issue (UUID, block offset and block length) sorted by UUID, so looking an issue up
+is a binary search over the memory-mapped index plus one block read. Both files are
+written under temporary names and renamed into place, index last, so readers never
+see a partial segment.
+
+Segments are never modified. Each archive batch writes a small segment per project,
+so after it a project's newest segments are merged into one for as long as the next
+older segment holds no more rows than those merged so far. This keeps the number of
+segments logarithmic in the number of archived issues, and each issue is rewritten
+only as often. The merged segment is renamed into place before its inputs are
+removed, and readers that find a listed segment gone list the segments again. A
+new segment claims its sequence by creating its temporary file exclusively, so
+concurrent writers never pick the same file name.
+"""
+
+import bisect
+import heapq
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from psycopg2.extensions import connection as Connection
+from .export import EXPORT_COLUMNS, EXPORT_SELECTS, ndjson_lines
+
+BLOCK_ROWS = 500
+
+# UUID (NUL padded), block offset, block length
+_INDEX_RECORD = struct.Struct(">36sQI")
+
+_PROJECT_PATTERN = re.compile(r"^[A-Za-z0-9-]+$")
+_SEGMENT_PATTERN = re.compile(r"^(error|rejection)-(\d+)\.idx$")
+
+# Arbitrary key for the advisory lock that keeps concurrent archive runs apart
+ARCHIVE_LOCK_KEY = 74_616_002
+
+# Log table -> issue type
+ARCHIVED_TABLES = {"error_logs": "error", "rejection_logs": "rejection"}
+
+
+class _IndexKeys:
+    """Sequence view of the UUIDs in a memory-mapped index, for bisect."""
+
+    def __init__(self, index: mmap.mmap) -> None:
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index) // _INDEX_RECORD.size
+
+    def __getitem__(self, position: int) -> bytes:
+        start = position * _INDEX_RECORD.size
+        return self.index[start : start + 36]
+
+
+def project_archive_dir(archive_dir: str, project_uuid: str) -> Optional[str]:
+    """Returns a project's archive directory, or None for unsafe identifiers."""
+    if not _PROJECT_PATTERN.match(project_uuid):
+        return None
+    return os.path.join(archive_dir, project_uuid)
+
+
+def list_segments(
+    archive_dir: str, project_uuid: str, issue_type: Optional[str] = None
+) -> List[Tuple[str, int]]:
+    """Lists a project's complete segments as (issue type, sequence), newest first."""
+    directory = project_archive_dir(archive_dir, project_uuid)
+    if directory is None or not os.path.isdir(directory):
+        return []
+
+    segments = []
+    for filename in os.listdir(directory):
+        match = _SEGMENT_PATTERN.match(filename)
+        if match and issue_type in (None, match.group(1)):
+            segments.append((match.group(1), int(match.group(2))))
+
+    return sorted(segments, key=lambda segment: segment[1], reverse=True)
+
+
+def _segment_path(directory: str, issue_type: str, sequence: int, ext: str) -> str:
+    return os.path.join(directory, f"{issue_type}-{sequence:08d}.{ext}")
+
+
+def _decode_row(line: bytes) -> Dict:
+    row = json.loads(line)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _row_key(row: Dict) -> Tuple[datetime, str]:
+    return (row["created_at"], row["uuid"])
+
+
+def _reserve_segment(
+    archive_dir: str, project_uuid: str, issue_type: str
+) -> Tuple[int, BinaryIO]:
+    """Claims the next free sequence of a project for a new segment.
+
+    The segment's temporary file is created exclusively, so concurrent writers that
+    list the same segments still end up with distinct sequences; a sequence whose
+    segment was renamed into place in the meantime is skipped. Returns the sequence
+    and the open temporary file.
+    """
+    directory = project_archive_dir(archive_dir, project_uuid)
+    sequence = max((s for _, s in list_segments(archive_dir, project_uuid)), default=0)
+
+    while True:
+        sequence += 1
+        segment_path = _segment_path(directory, issue_type, sequence, "seg")
+        try:
+            fd = os.open(segment_path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            continue
+        if os.path.exists(segment_path) or os.path.exists(
+            _segment_path(directory, issue_type, sequence, "idx")
+        ):
+            os.close(fd)
+            os.remove(segment_path + ".tmp")
+            continue
+        return sequence, os.fdopen(fd, "wb")
+
+
+def _write_segment_files(
+    archive_dir: str, project_uuid: str, issue_type: str, rows: Iterable[Dict]
+) -> List[str]:
+    """Writes rows, newest first, to a new segment and returns the written paths."""
+    directory = project_archive_dir(archive_dir, project_uuid)
+    sequence, segment = _reserve_segment(archive_dir, project_uuid, issue_type)
+    segment_path = _segment_path(directory, issue_type, sequence, "seg")
+    index_path = _segment_path(directory, issue_type, sequence, "idx")
+    rows = iter(rows)
+    entries = []
+
+    try:
+        with segment:
+            while True:
+                block_rows = list(islice(rows, BLOCK_ROWS))
+                if not block_rows:
+                    break
+                text = "".join(ndjson_lines(block_rows))
+                block = zlib.compress(text.encode("utf-8"))
+                offset = segment.tell()
+                segment.write(block)
+                entries.extend(
+                    (row["uuid"].encode("utf-8"), offset, len(block))
+                    for row in block_rows
+                )
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        with open(index_path + ".tmp", "wb") as index:
+            for entry in sorted(entries):
+                index.write(_INDEX_RECORD.pack(*entry))
+            index.flush()
+            os.fsync(index.fileno())
+    except BaseException:
+        for path in (segment_path + ".tmp", index_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    os.replace(segment_path + ".tmp", segment_path)
+    os.replace(index_path + ".tmp", index_path)
+
+    return [index_path, segment_path]
+
+
+def write_segment(
+    archive_dir: str, project_uuid: str, issue_type: str, rows: List[Dict]
+) -> List[str]:
+    """Writes rows of one issue type to a new segment of a project.
+
+    Returns the paths of the written files, so that a failed archive run can remove
+    them again.
+    """
+    directory = project_archive_dir(archive_dir, project_uuid)
+    if directory is None:
+        raise ValueError(f"Invalid project identifier: {project_uuid}")
+    os.makedirs(directory, exist_ok=True)
+
+    return _write_segment_files(
+        archive_dir,
+        project_uuid,
+        issue_type,
+        sorted(rows, key=_row_key, reverse=True),
+    )
+
+
+def _read_block(segment_path: str, offset: int, length: int) -> List[bytes]:
+    with open(segment_path, "rb") as segment:
+        segment.seek(offset)
+        return zlib.decompress(segment.read(length)).splitlines()
+
+
+def _find_in_segments(
+    directory: str,
+    issue_type: str,
+    sequences: List[int],
+    issue_uuid: str,
+) -> Optional[Dict]:
+    key = issue_uuid.encode("utf-8").ljust(36, b"\0")
+
+    for sequence in sequences:
+        index_path = _segment_path(directory, issue_type, sequence, "idx")
+        if os.path.getsize(index_path) == 0:
+            continue
+
+        with open(index_path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as index:
+            keys = _IndexKeys(index)
+            position = bisect.bisect_left(keys, key)
+            if position == len(keys) or keys[position] != key:
+                continue
+            _, offset, length = _INDEX_RECORD.unpack_from(
+                index, position * _INDEX_RECORD.size
+            )
+
+        segment_path = _segment_path(directory, issue_type, sequence, "seg")
+        for line in _read_block(segment_path, offset, length):
+            row = _decode_row(line)
+            if row["uuid"] == issue_uuid:
+                return row
+
+    return None
+
+
+def find_archived_issue(
+    archive_dir: str, project_uuid: str, issue_type: str, issue_uuid: str
+) -> Optional[Dict]:
+    """Looks an archived issue up by UUID, returning it as exported or None."""
+    directory = project_archive_dir(archive_dir, project_uuid)
+
+    while True:
+        segments = list_segments(archive_dir, project_uuid, issue_type)
+        try:
+            return _find_in_segments(
+                directory, issue_type, [s for _, s in segments], issue_uuid
+            )
+        except FileNotFoundError:
+            # A compaction replaced the listed segments with a merged one
+            continue
+
+
+def _open_segments(directory: str, segments: List[Tuple[str, int]]) -> List[BinaryIO]:
+    """Opens the segment files, so that a compaction cannot remove them mid-read."""
+    files: List[BinaryIO] = []
+    try:
+        for issue_type, sequence in segments:
+            segment_path = _segment_path(directory, issue_type, sequence, "seg")
+            files.append(open(segment_path, "rb"))
+    except BaseException:
+        for file in files:
+            file.close()
+        raise
+    return files
+
+
+def _iter_segment(segment: BinaryIO) -> Iterator[Dict]:
+    with segment:
+        data = segment.read(1 << 16)
+        decompressor = zlib.decompressobj()
+        pending = b""
+        while data:
+            pending += decompressor.decompress(data)
+            # Blocks are concatenated zlib streams
+            while decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj()
+                pending += decompressor.decompress(data)
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield _decode_row(line)
+            data = segment.read(1 << 16)
+
+
+def _merge_segments(files: List[BinaryIO]) -> Iterator[Dict]:
+    return heapq.merge(
+        *(_iter_segment(file) for file in files), key=_row_key, reverse=True
+    )
+
+
+def _as_bool(value: Union[bool, str]) -> bool:
+    if isinstance(value, bool):
+        return value
+    return value.lower() in ("true", "t", "yes", "on", "1")
+
+
+def _as_datetime(value: Union[datetime, str]) -> datetime:
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def iter_archived_issues(
+    archive_dir: str,
+    project_uuid: str,
+    handled: Optional[Union[bool, str]] = None,
+    time: Optional[Union[datetime, str]] = None,
+    resolved: Optional[Union[bool, str]] = None,
+) -> Iterator[Dict]:
+    """Yields a project's archived errors and rejections, newest first.
+
+    Segments are read block by block and merged on `(created_at, uuid)`, and the
+    filters mirror `build_issue_filters`. Since rows arrive newest first, reading
+    stops at the first row older than `time`.
+    """
+    directory = project_archive_dir(archive_dir, project_uuid)
+    while True:
+        try:
+            files = _open_segments(directory, list_segments(archive_dir, project_uuid))
+            break
+        except FileNotFoundError:
+            # A compaction replaced the listed segments with a merged one
+            continue
+    rows = _merge_segments(files)
+
+    handled = None if handled is None else _as_bool(handled)
+    resolved = None if resolved is None else _as_bool(resolved)
+    since = None if time is None else _as_datetime(time)
+
+    for row in rows:
+        if since is not None and row["created_at"] < since:
+            return
+        if handled is not None and row["handled"] != handled:
+            continue
+        if resolved is not None and row["resolved"] != resolved:
+            continue
+        yield row
+
+
+def _segment_rows(directory: str, issue_type: str, sequence: int) -> int:
+    index_path = _segment_path(directory, issue_type, sequence, "idx")
+    return os.path.getsize(index_path) // _INDEX_RECORD.size
+
+
+def _unique_rows(rows: Iterable[Dict]) -> Iterator[Dict]:
+    # A compaction interrupted before removing its inputs leaves rows in two
+    # segments; the next one merges the copies back into one
+    previous = None
+    for row in rows:
+        key = _row_key(row)
+        if key != previous:
+            yield row
+        previous = key
+
+
+def compact_segments(archive_dir: str, project_uuid: str, issue_type: str) -> int:
+    """Merges a project's newest segments of one issue type into one segment.
+
+    Segments are taken newest first for as long as the next one holds no more rows
+    than those taken so far, like carries in a binary counter. Returns the number
+    of segments merged, 0 if there was nothing to merge.
+    """
+    directory = project_archive_dir(archive_dir, project_uuid)
+    if directory is None:
+        return 0
+
+    segments = list_segments(archive_dir, project_uuid, issue_type)
+    merged = segments[:1]
+    total = sum(_segment_rows(directory, *segment) for segment in merged)
+    for segment in segments[1:]:
+        rows = _segment_rows(directory, *segment)
+        if rows > total:
+            break
+        merged.append(segment)
+        total += rows
+
+    if len(merged) < 2:
+        return 0
+
+    files = _open_segments(directory, merged)
+    try:
+        _write_segment_files(
+            archive_dir,
+            project_uuid,
+            issue_type,
+            _unique_rows(_merge_segments(files)),
+        )
+    finally:
+        for file in files:
+            file.close()
+
+    for _, sequence in merged:
+        os.remove(_segment_path(directory, issue_type, sequence, "idx"))
+        os.remove(_segment_path(directory, issue_type, sequence, "seg"))
+
+    return len(merged)
+
+
+def delete_project_archive(archive_dir: str, project_uuid: str) -> None:
+    """Removes every archived issue of a project."""
+    directory = project_archive_dir(archive_dir, project_uuid)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def archive_issues(
+    connection: Connection,
+    archive_dir: str,
+    older_than_days: int,
+    batch_size: int = 5000,
+    now: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Moves issues created more than `older_than_days` ago into the archive.
+
+    Each batch of up to `batch_size` issues is written to new segments, one per
+    project, and deleted from Postgres in the same transaction; if the transaction
+    fails, the batch's segments are removed again. Once the batch is committed,
+    each of its projects has its segments compacted. The delete triggers keep the
+    aggregates in step, as with retention. A session-level advisory lock makes
+    overlapping runs wait for each other, so compactions never race. Returns the
+    number of archived issues per issue type.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)
+    summary = {issue_type: 0 for issue_type in ARCHIVED_TABLES.values()}
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [ARCHIVE_LOCK_KEY])
+        connection.commit()
+        try:
+            for table, issue_type in ARCHIVED_TABLES.items():
+                while True:
+                    cursor.execute(
+                        f"""
+                        SELECT p.uuid, {EXPORT_SELECTS[table]}
+                        FROM {table} t
+                        JOIN projects p ON p.id = t.project_id
+                        WHERE t.created_at < %s
+                        ORDER BY t.created_at, t.uuid
+                        LIMIT %s
+                        FOR UPDATE OF t
+                        """,
+                        [cutoff, batch_size],
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        connection.commit()
+                        break
+
+                    batches: Dict[str, List[Dict]] = {}
+                    for project_uuid, *values in rows:
+                        batches.setdefault(project_uuid, []).append(
+                            dict(zip(EXPORT_COLUMNS, values))
+                        )
+
+                    written = []
+                    try:
+                        for project_uuid, project_rows in batches.items():
+                            written += write_segment(
+                                archive_dir, project_uuid, issue_type, project_rows
+                            )
+
+                        cursor.execute(
+                            f"""
+                            DELETE FROM {table}
+                            WHERE (uuid, created_at) IN (
+                              SELECT * FROM unnest(%s::varchar[], %s::timestamptz[])
+                            )
+                            """,
+                            [[row[2] for row in rows], [row[3] for row in rows]],
+                        )
+                        connection.commit()
+                    except Exception:
+                        connection.rollback()
+                        for path in written:
+                            if os.path.exists(path):
+                                os.remove(path)
+                        raise
+
+                    for project_uuid in batches:
+                        compact_segments(archive_dir, project_uuid, issue_type)
+
+                    summary[issue_type] += len(rows)
+                    log(f"Archived {len(rows)} {issue_type}(s)")
+        finally:
+            connection.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [ARCHIVE_LOCK_KEY])
+            connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return summary
@@ -2,7 +2,7 @@ import jwt
 from flask import request, g, jsonify, current_app
 from functools import wraps
 from .token_manager import TokenManager
-from app.models import fetch_project_users
+from app.models import fetch_project_users, get_project_by_api_key
 
 
 class AuthManager:
@@ -44,6 +44,33 @@ class AuthManager:
 
         return decorated_function
 
+    # SDK authentication decorator
+    def authenticate_api_key(self, f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            api_key = request.headers.get("X-API-Key")
+            if not api_key:
+                current_app.logger.info("API key authentication failed: Missing key.")
+                return jsonify({"message": "API key required."}), 401
+
+            try:
+                project = get_project_by_api_key(api_key)
+            except Exception as e:
+                current_app.logger.error(
+                    f"Unexpected error during API key authentication: {e}",
+                    exc_info=True,
+                )
+                return jsonify({"message": "Internal server error."}), 500
+
+            if not project:
+                current_app.logger.info("API key authentication failed: Unknown key.")
+                return jsonify({"message": "Invalid API key."}), 401
+
+            g.project = project
+            return f(*args, **kwargs)
+
+        return decorated_function
+
     # Root authorization decorator
     def authorize_root(self, f):
         @wraps(f)
@@ -0,0 +1,29 @@
+"""Background task helpers.
+
+Tasks run on the Socket.IO server's async backend (greenlets under the gevent
+worker), so they need no separate worker process. Long-running tasks should yield
+regularly with `socketio.sleep`.
+"""
+
+from typing import Any, Callable
+from flask import current_app
+from app.socketio import socketio
+
+
+def start_background_job(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs `func(*args, **kwargs)` in the background inside the app context.
+
+    Exceptions are logged, since there is no request left to report them to.
+    """
+    app = current_app._get_current_object()
+
+    def run() -> None:
+        with app.app_context():
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                app.logger.error(
+                    f"Background job {func.__name__} failed: {e}", exc_info=True
+                )
+
+    return socketio.start_background_task(run)
@@ -1,8 +1,18 @@
 """Database helper functions for projects and logs."""
 
 import math
-from typing import Optional, List, Dict
-from psycopg2.extensions import cursor as Cursor
+import re
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from typing import Callable, Optional, List, Dict, Set, Tuple, Union
+from psycopg2.extensions import connection as Connection, cursor as Cursor
+from psycopg2.extras import Json
+from .hll import hll_estimate
+
+# Log columns the issue list can be filtered on. Text columns are matched by
+# substring or similarity and `contexts` by JSONB containment.
+ERROR_FILTER_COLUMNS = ("filename", "path", "name", "contexts")
+REJECTION_FILTER_COLUMNS = ("path",)
 
 
 def calculate_total_project_pages(cursor: Cursor, limit: int) -> int:
@@ -40,203 +50,533 @@ def calculate_total_user_project_pages(
     return total_pages
 
 
-def fetch_errors_by_project(
-    cursor: Cursor,
-    project_uuid: str,
-    page: int,
-    limit: int,
+def build_issue_filters(
+    alias: str,
     handled: Optional[bool],
     time: Optional[str],
     resolved: Optional[bool],
-) -> List[Dict[str, int]]:
-    """Retrieves error logs for a specific project, with optional filters and
-    pagination."""
+    after: Optional[Tuple[datetime, str]] = None,
+) -> Tuple[str, List]:
+    """Builds the optional WHERE clauses shared by the error and rejection queries.
 
-    # Base query
-    query = """
-    SELECT
-        e.uuid, e.name, e.message, e.created_at, e.filename, e.line_number,
-        e.col_number, e.handled, e.resolved, e.error_hash
-    FROM error_logs e
-    JOIN projects p ON e.project_id = p.id
-    WHERE p.uuid = %s
+    Returns a SQL fragment (each clause prefixed with AND) and its parameters.
     """
+    clauses = ""
+    params = []
 
-    params = [project_uuid]
-
-    # Add optional filters to query
     if handled is not None:
-        query += " AND e.handled = %s"
+        clauses += f" AND {alias}.handled = %s"
         params.append(handled)
     if resolved is not None:
-        query += " AND e.resolved = %s"
+        clauses += f" AND {alias}.resolved = %s"
         params.append(resolved)
     if time is not None:
-        query += " AND e.created_at >= %s"
+        clauses += f" AND {alias}.created_at >= %s"
         params.append(time)
+    if after is not None:
+        clauses += f" AND ({alias}.created_at, {alias}.uuid) < (%s, %s)"
+        params.extend(after)
+
+    return clauses, params
+
+
+def build_column_filters(
+    alias: str,
+    column_filters: Optional[Dict[str, Union[str, Dict]]],
+    fuzzy: bool = False,
+    columns: Tuple[str, ...] = ERROR_FILTER_COLUMNS,
+) -> Tuple[str, List]:
+    """Builds the WHERE clauses matching issue columns against filter values.
+
+    Text values are matched as case-insensitive substrings (`ILIKE`), or with
+    `fuzzy` by trigram word similarity, so that small typos still match. Both are
+    served by the `pg_trgm` GIN indexes on the log tables. A `contexts` value is a
+    JSON object that the contexts, or one of the context objects they list, must
+    contain; it is served by the `jsonb_path_ops` GIN index. Filters on a column the
+    table lacks (rejections only have a `path`) match nothing. Returns a SQL fragment
+    (each clause prefixed with AND) and its parameters.
+    """
+    clauses = ""
+    params = []
+
+    for column, value in (column_filters or {}).items():
+        if column not in columns:
+            clauses += " AND FALSE"
+        elif column == "contexts":
+            clauses += f" AND ({alias}.contexts @> %s OR {alias}.contexts @> %s)"
+            params.extend([Json(value), Json([value])])
+        elif fuzzy:
+            clauses += f" AND {alias}.{column} %%> %s"
+            params.append(value)
+        else:
+            escaped = re.sub(r"([\\%_])", r"\\\1", value)
+            clauses += f" AND {alias}.{column} ILIKE %s"
+            params.append(f"%{escaped}%")
+
+    return clauses, params
+
+
+def build_batch_filters(
+    alias: str, uuids: Optional[List[str]], filters: Optional[Dict]
+) -> Tuple[str, List]:
+    """Builds the WHERE clauses selecting the issues a batch operation applies to.
+
+    Issues are selected either by UUID or by a filter with the issue list's
+    `handled`, `time` and `resolved` keys plus `error_hash`. Returns a SQL fragment
+    (each clause prefixed with AND) and its parameters.
+    """
+    if uuids is not None:
+        return f" AND {alias}.uuid = ANY(%s)", [list(uuids)]
 
-    # Add sorting and pagination
-    offset = (page - 1) * limit
-    query += " ORDER BY e.created_at DESC LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
-
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-
-    error_hashes = [row[9] for row in rows]
-
-    if error_hashes:
-        stats_query = """
-        SELECT
-            e.error_hash,
-            COUNT(*) AS total_occurrences,
-            COUNT(DISTINCT e.ip) AS distinct_users
-        FROM error_logs e
-        JOIN projects p ON e.project_id = p.id
-        WHERE p.uuid = %s AND e.error_hash IN %s
-        GROUP BY e.error_hash
-        """
-
-        cursor.execute(stats_query, [project_uuid, tuple(error_hashes)])
-        stats = cursor.fetchall()
-        stats_map = {
-            stat[0]: {"total_occurrences": stat[1], "distinct_users": stat[2]}
-            for stat in stats
-        }
-    else:
-        stats_map = {}
-
-    errors = [
-        {
-            "uuid": row[0],
-            "name": row[1],
-            "message": row[2],
-            "created_at": row[3],
-            "file": row[4],
-            "line_number": row[5],
-            "col_number": row[6],
-            "project_uuid": project_uuid,
-            "handled": row[7],
-            "resolved": row[8],
-            "total_occurrences": stats_map.get(row[9], {}).get("total_occurrences", 0),
-            "distinct_users": stats_map.get(row[9], {}).get("distinct_users", 0),
-        }
-        for row in rows
-    ]
+    clauses, params = build_issue_filters(
+        alias, filters.get("handled"), filters.get("time"), filters.get("resolved")
+    )
+    if filters.get("error_hash") is not None:
+        clauses += f" AND {alias}.error_hash = %s"
+        params.append(filters["error_hash"])
 
-    return errors
+    return clauses, params
 
 
-def fetch_rejections_by_project(
+def fetch_issues_page(
     cursor: Cursor,
     project_uuid: str,
-    page: int,
     limit: int,
     handled: Optional[bool],
     time: Optional[str],
     resolved: Optional[bool],
+    after: Optional[Tuple[datetime, str]] = None,
+    offset: int = 0,
+    exact: bool = False,
+    column_filters: Optional[Dict[str, Union[str, Dict]]] = None,
+    fuzzy: bool = False,
 ) -> List[Dict[str, int]]:
-    """Retrieves rejection logs for a specific project, with optional filters and
-    pagination."""
-
-    # Base query
-    query = """
+    """Retrieves one page of a project's errors and rejections, newest first.
+
+    Both tables are merged in a single `UNION ALL ... ORDER BY created_at DESC`
+    statement. The union only carries the sort and filter columns so that Postgres
+    can stream it as a merge of two index scans and stop once the page is full; the
+    page's rows are then joined back to their tables by UUID. Pass `after` for
+    keyset pagination or `offset` for page-number pagination, and `exact` to count
+    distinct users exactly instead of from sketches. `column_filters` and `fuzzy` are
+    passed to `build_column_filters`; rejections have no filename, name or contexts,
+    so filters on those columns leave the rejection branch out of the plan.
+    """
+    filters, params = build_issue_filters("issues", handled, time, resolved, after)
+    column_clauses, column_params = build_column_filters(
+        "issues", column_filters, fuzzy
+    )
+    filters += column_clauses
+    params.extend(column_params)
+
+    query = f"""
     SELECT
-        r.uuid, r.value, r.created_at, r.handled, r.resolved
-    FROM rejection_logs r
-    JOIN projects p ON r.project_id = p.id
-    WHERE p.uuid = %s
+        page.uuid, page.created_at, e.uuid IS NOT NULL AS is_error, e.name,
+        e.message, e.filename, e.line_number, e.col_number, e.error_hash, r.value,
+        COALESCE(e.handled, r.handled), COALESCE(e.resolved, r.resolved)
+    FROM (
+        SELECT uuid, created_at
+        FROM (
+            SELECT
+                e.uuid, e.created_at, e.project_id, e.handled, e.resolved,
+                e.filename, e.path, e.name, e.contexts
+            FROM error_logs e
+            UNION ALL
+            SELECT
+                r.uuid, r.created_at, r.project_id, r.handled, r.resolved,
+                NULL, r.path, NULL, NULL
+            FROM rejection_logs r
+        ) issues
+        WHERE issues.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        {filters}
+        ORDER BY created_at DESC, uuid DESC
+        LIMIT %s OFFSET %s
+    ) page
+    LEFT JOIN error_logs e
+        ON e.uuid = page.uuid AND e.created_at = page.created_at
+    LEFT JOIN rejection_logs r
+        ON r.uuid = page.uuid AND r.created_at = page.created_at
+    ORDER BY page.created_at DESC, page.uuid DESC
     """
 
-    params = [project_uuid]
+    cursor.execute(query, [project_uuid, *params, limit, offset])
+    rows = cursor.fetchall()
 
-    # Add optional filters to query
-    if handled is not None:
-        query += " AND r.handled = %s"
-        params.append(handled)
-    if resolved is not None:
-        query += " AND r.resolved = %s"
-        params.append(resolved)
-    if time is not None:
-        query += " AND r.created_at >= %s"
-        params.append(time)
+    error_hashes = {row[8] for row in rows if row[2]}
+    stats_map = fetch_error_stats(cursor, project_uuid, error_hashes, exact)
+
+    issues = []
+    for row in rows:
+        if row[2]:
+            stats = stats_map.get(row[8], {})
+            issues.append(
+                {
+                    "uuid": row[0],
+                    "name": row[3],
+                    "message": row[4],
+                    "created_at": row[1],
+                    "file": row[5],
+                    "line_number": row[6],
+                    "col_number": row[7],
+                    "project_uuid": project_uuid,
+                    "handled": row[10],
+                    "resolved": row[11],
+                    "total_occurrences": stats.get("total_occurrences", 0),
+                    "distinct_users": stats.get("distinct_users", 0),
+                }
+            )
+        else:
+            issues.append(
+                {
+                    "uuid": row[0],
+                    "value": row[9],
+                    "created_at": row[1],
+                    "project_uuid": project_uuid,
+                    "handled": row[10],
+                    "resolved": row[11],
+                }
+            )
+
+    return issues
+
+
+def fetch_error_stats(
+    cursor: Cursor, project_uuid: str, error_hashes: Set[str], exact: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """Retrieves occurrence and distinct user counts for a set of error hashes.
+
+    Both are read from the incrementally maintained `error_groups` table, with
+    distinct users estimated from its HyperLogLog sketch. With `exact` set,
+    distinct users are counted from `error_logs` instead.
+    """
+    if not error_hashes:
+        return {}
+
+    if exact:
+        distinct_users_column = """(
+            SELECT COUNT(DISTINCT e.ip)
+            FROM error_logs e
+            WHERE e.project_id = g.project_id AND e.error_hash = g.error_hash
+        )"""
+    else:
+        distinct_users_column = "g.ip_sketch"
 
-    # Add sorting and pagination
-    offset = (page - 1) * limit
-    query += " ORDER BY r.created_at DESC LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
+    stats_query = f"""
+    SELECT g.error_hash, g.occurrences, {distinct_users_column}
+    FROM error_groups g
+    WHERE g.project_id = (SELECT id FROM projects WHERE uuid = %s)
+    AND g.error_hash = ANY(%s)
+    """
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    rejections = [
-        {
-            "uuid": row[0],
-            "value": row[1],
-            "created_at": row[2],
-            "project_uuid": project_uuid,
-            "handled": row[3],
-            "resolved": row[4],
-        }
-        for row in rows
-    ]
+    cursor.execute(stats_query, [project_uuid, list(error_hashes)])
+    stats = cursor.fetchall()
 
-    return rejections
+    return {
+        stat[0]: {
+            "total_occurrences": stat[1],
+            "distinct_users": stat[2] if exact else hll_estimate(stat[2]),
+        }
+        for stat in stats
+    }
 
 
-def calculate_total_error_pages(
+def count_issues_exact(
     cursor: Cursor,
     project_uuid: str,
-    limit: int,
     handled: Optional[bool],
     time: Optional[str],
     resolved: Optional[bool],
+    column_filters: Optional[Dict[str, Union[str, Dict]]] = None,
+    fuzzy: bool = False,
 ) -> int:
-    """Calculates the total pages for combined error & rejection logs for a project."""
-    error_count_query = """
+    """Counts a project's matching errors and rejections by scanning the logs."""
+    error_filters, error_params = build_issue_filters("e", handled, time, resolved)
+    rejection_filters, rejection_params = build_issue_filters(
+        "r", handled, time, resolved
+    )
+
+    clauses, params = build_column_filters("e", column_filters, fuzzy)
+    error_filters += clauses
+    error_params.extend(params)
+    clauses, params = build_column_filters(
+        "r", column_filters, fuzzy, REJECTION_FILTER_COLUMNS
+    )
+    rejection_filters += clauses
+    rejection_params.extend(params)
+
+    error_count_query = f"""
     SELECT COUNT(*) FROM error_logs e
     JOIN projects p ON e.project_id = p.id
     WHERE p.uuid = %s
+    {error_filters}
     """
 
-    params = [project_uuid]
-
-    if handled is not None:
-        error_count_query += " AND e.handled = %s"
-        params.append(handled)
-    if resolved is not None:
-        error_count_query += " AND e.resolved = %s"
-        params.append(resolved)
-    if time is not None:
-        error_count_query += " AND e.created_at >= %s"
-        params.append(time)
-
-    cursor.execute(error_count_query, params)
+    cursor.execute(error_count_query, [project_uuid, *error_params])
     error_count = cursor.fetchone()[0]
 
-    rejection_count_query = """
+    rejection_count_query = f"""
     SELECT COUNT(*)
     FROM rejection_logs r
     JOIN projects p ON r.project_id = p.id
     WHERE p.uuid = %s
+    {rejection_filters}
     """
 
-    params = [project_uuid]
+    cursor.execute(rejection_count_query, [project_uuid, *rejection_params])
+    rejection_count = cursor.fetchone()[0]
 
-    # Add filters to the rejection count query
-    if handled is not None:
-        rejection_count_query += " AND r.handled = %s"
-        params.append(handled)
-    if resolved is not None:
-        rejection_count_query += " AND r.resolved = %s"
-        params.append(resolved)
-    if time is not None:
-        rejection_count_query += " AND r.created_at >= %s"
-        params.append(time)
+    return error_count + rejection_count
 
-    cursor.execute(rejection_count_query, params)
-    rejection_count = cursor.fetchone()[0]
 
-    total_count = error_count + rejection_count
+def count_issues_estimate(
+    cursor: Cursor,
+    project_uuid: str,
+    handled: Optional[bool],
+    time: Optional[str],
+    resolved: Optional[bool],
+) -> int:
+    """Counts a project's matching errors and rejections from the counter tables.
+
+    Without a time filter the count is read from `project_issue_counters`. With one,
+    whole hours are summed from `issue_rollups` and only the partial first hour is
+    counted from the logs.
+    """
+    filters, params = build_issue_filters("c", handled, None, resolved)
+
+    if time is None:
+        query = f"""
+        SELECT COALESCE(SUM(c.issue_count), 0)
+        FROM project_issue_counters c
+        WHERE c.project_id = (SELECT id FROM projects WHERE uuid = %s)
+        {filters}
+        """
+
+        cursor.execute(query, [project_uuid, *params])
+        return cursor.fetchone()[0]
+
+    error_filters, error_params = build_issue_filters("e", handled, time, resolved)
+    rejection_filters, rejection_params = build_issue_filters(
+        "r", handled, time, resolved
+    )
+
+    query = f"""
+    WITH project AS (SELECT id FROM projects WHERE uuid = %s)
+    SELECT
+        (
+            SELECT COALESCE(SUM(c.issue_count), 0)
+            FROM issue_rollups c
+            WHERE c.project_id = (SELECT id FROM project)
+            AND c.bucket >= hour_bucket(%s) + INTERVAL '1 hour'
+            {filters}
+        ) + (
+            SELECT COUNT(*)
+            FROM error_logs e
+            WHERE e.project_id = (SELECT id FROM project)
+            AND e.created_at < hour_bucket(%s) + INTERVAL '1 hour'
+            {error_filters}
+        ) + (
+            SELECT COUNT(*)
+            FROM rejection_logs r
+            WHERE r.project_id = (SELECT id FROM project)
+            AND r.created_at < hour_bucket(%s) + INTERVAL '1 hour'
+            {rejection_filters}
+        )
+    """
+
+    cursor.execute(
+        query,
+        [
+            project_uuid,
+            time,
+            *params,
+            time,
+            *error_params,
+            time,
+            *rejection_params,
+        ],
+    )
+    return cursor.fetchone()[0]
+
+
+def calculate_total_error_pages(
+    cursor: Cursor,
+    project_uuid: str,
+    limit: int,
+    handled: Optional[bool],
+    time: Optional[str],
+    resolved: Optional[bool],
+    count: str = "estimate",
+    column_filters: Optional[Dict[str, Union[str, Dict]]] = None,
+    fuzzy: bool = False,
+) -> Optional[int]:
+    """Calculates the total pages for combined error & rejection logs for a project.
+
+    `count` selects how issues are counted: "estimate" reads the counter tables,
+    "exact" scans the logs and "none" skips counting and returns None. The counter
+    tables know nothing of log columns, so column filters are always counted
+    exactly.
+    """
+    if count == "none":
+        return None
+
+    if count == "exact" or column_filters:
+        total_count = count_issues_exact(
+            cursor, project_uuid, handled, time, resolved, column_filters, fuzzy
+        )
+    else:
+        total_count = count_issues_estimate(
+            cursor, project_uuid, handled, time, resolved
+        )
+
     total_pages = math.ceil(total_count / limit)
 
     return total_pages
+
+
+def delete_batch(
+    cursor: Cursor, table: str, condition: str, params: list, batch_size: int
+) -> int:
+    """Deletes up to `batch_size` matching rows and returns how many were deleted.
+
+    Rows are deleted through the parent table so the aggregate triggers fire. The
+    caller commits.
+    """
+    cursor.execute(
+        f"""
+        DELETE FROM {table}
+        WHERE (id, created_at) IN (
+          SELECT id, created_at FROM {table}
+          WHERE {condition}
+          LIMIT %s
+        )
+        """,
+        [*params, batch_size],
+    )
+    return cursor.rowcount
+
+
+def delete_in_batches(
+    connection: Connection,
+    table: str,
+    condition: str,
+    params: list,
+    batch_size: int,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Deletes matching rows in bounded batches, committing after each batch.
+
+    Each batch (see `delete_batch`) is a short transaction, so locks are held
+    briefly and vacuum can reclaim space as the deletion progresses. `on_batch` is
+    called with the size of each committed batch, for progress reporting or pausing
+    between batches.
+
+    Returns the number of rows deleted.
+    """
+    cursor = connection.cursor()
+    deleted = 0
+
+    try:
+        while True:
+            batch = delete_batch(cursor, table, condition, params, batch_size)
+            connection.commit()
+
+            deleted += batch
+            if on_batch is not None and batch:
+                on_batch(batch)
+            if batch < batch_size:
+                return deleted
+    finally:
+        cursor.close()
+
+
+def summarize_issue_rollups(
+    cursor: Cursor,
+    project_uuids: List[str],
+    buckets: int,
+    granularity: str,
+    tz: str,
+) -> Dict[str, List[int]]:
+    """Counts issues per day or hour for several projects, oldest bucket first.
+
+    The last bucket is the current day (in time zone `tz`) or the current UTC hour.
+    Counts are summed from the hourly `issue_rollups` table in one query, so the
+    cost depends on the number of buckets rather than the number of issues. In time
+    zones with a sub-hour offset, each hour is counted towards the day it starts in.
+    """
+    now = datetime.now(timezone.utc)
+
+    if granularity == "hour":
+        current = now.replace(minute=0, second=0, microsecond=0)
+        start = current - timedelta(hours=buckets - 1)
+        bucket_expression = "r.bucket"
+        params = []
+    else:
+        zone = ZoneInfo(tz)
+        current = now.astimezone(zone).date()
+        start = datetime.combine(
+            current - timedelta(days=buckets - 1), datetime.min.time(), zone
+        )
+        bucket_expression = "(r.bucket AT TIME ZONE %s)::date"
+        params = [tz]
+
+    query = f"""
+    SELECT p.uuid, {bucket_expression} AS bucket_start, SUM(r.issue_count)::bigint
+    FROM issue_rollups r
+    JOIN projects p ON p.id = r.project_id
+    WHERE p.uuid = ANY(%s)
+    AND r.bucket >= %s
+    GROUP BY p.uuid, bucket_start
+    """
+
+    cursor.execute(query, [*params, list(project_uuids), start])
+
+    summaries = {project_uuid: [0] * buckets for project_uuid in project_uuids}
+    for project_uuid, bucket_start, count in cursor.fetchall():
+        if granularity == "hour":
+            index = buckets - 1 - int((current - bucket_start) / timedelta(hours=1))
+        else:
+            index = buckets - 1 - (current - bucket_start).days
+        if 0 <= index < buckets:
+            summaries[project_uuid][index] += count
+
+    return summaries
+
+
+def fetch_latest_issues(
+    cursor: Cursor, project_uuids: List[str]
+) -> Dict[str, Optional[Dict[str, Union[str, bool]]]]:
+    """Fetches the most recent error or rejection of each project in one query.
+
+    Issues are found through the `project_latest_issues` pointers.
+    """
+    query = """
+    SELECT
+        p.uuid, l.issue_uuid, l.issue_type, e.name, COALESCE(e.message, r.value),
+        l.last_seen, COALESCE(e.handled, r.handled), COALESCE(e.resolved, r.resolved)
+    FROM projects p
+    JOIN project_latest_issues l ON l.project_id = p.id
+    LEFT JOIN error_logs e
+        ON l.issue_type = 'error'
+        AND e.uuid = l.issue_uuid
+        AND e.created_at = l.last_seen
+    LEFT JOIN rejection_logs r
+        ON l.issue_type = 'rejection'
+        AND r.uuid = l.issue_uuid
+        AND r.created_at = l.last_seen
+    WHERE p.uuid = ANY(%s)
+    """
+
+    cursor.execute(query, [list(project_uuids)])
+
+    latest_issues = {}
+    for row in cursor.fetchall():
+        if row[2] == "error":
+            issue = {"uuid": row[1], "name": row[3], "message": row[4]}
+        else:
+            issue = {"uuid": row[1], "value": row[4]}
+        issue.update(
+            {"created_at": row[5].isoformat(), "handled": row[6], "resolved": row[7]}
+        )
+        latest_issues[row[0]] = issue
+
+    return latest_issues
@@ -0,0 +1,151 @@
+"""Serialization of issue exports.
+
+Exports are streamed: rows are serialized as they arrive from the database and
+grouped into chunks of roughly `chunk_size` bytes, so memory use stays flat however
+many rows are exported. The first line goes out on its own and a partial chunk is
+sent once `flush_interval` seconds pass, so small or sparse exports do not wait for
+the query to finish before the client sees any bytes.
+"""
+
+import csv
+import io
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Fields of an exported issue; errors leave `value` empty and rejections the
+# error-only fields
+EXPORT_COLUMNS = [
+    "issue_type",
+    "uuid",
+    "created_at",
+    "name",
+    "message",
+    "value",
+    "file",
+    "line_number",
+    "col_number",
+    "stack_trace",
+    "contexts",
+    "error_hash",
+    "handled",
+    "resolved",
+    "method",
+    "path",
+    "os",
+    "browser",
+    "runtime",
+]
+
+# Log table -> select list producing EXPORT_COLUMNS from the table aliased `t`
+EXPORT_SELECTS = {
+    "error_logs": """
+        'error' AS issue_type, t.uuid, t.created_at, t.name, t.message,
+        NULL AS value, t.filename AS file, t.line_number, t.col_number,
+        COALESCE(
+          t.stack_trace,
+          (
+            SELECT s.stack_trace FROM stack_traces s
+            WHERE s.digest = t.stack_trace_digest
+          )
+        ) AS stack_trace,
+        t.contexts, t.error_hash, t.handled, t.resolved, t.method, t.path, t.os,
+        t.browser, t.runtime
+    """,
+    "rejection_logs": """
+        'rejection' AS issue_type, t.uuid, t.created_at, NULL AS name,
+        NULL AS message, t.value, NULL AS file, NULL AS line_number,
+        NULL AS col_number, NULL AS stack_trace, NULL AS contexts,
+        NULL AS error_hash, t.handled, t.resolved, t.method, t.path, t.os,
+        t.browser, t.runtime
+    """,
+}
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Serializes each row as one line of JSON."""
+    for row in rows:
+        yield json.dumps(row, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def csv_lines(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Serializes rows as CSV with a header line. Nested values are JSON-encoded."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values: List[Any]) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(columns)
+    for row in rows:
+        yield line([_csv_value(row[column]) for column in columns])
+
+
+def chunked(
+    lines: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[bytes]:
+    """Joins lines into encoded chunks of at least `chunk_size` bytes.
+
+    The first line is yielded at once, and a smaller chunk is yielded when a line
+    arrives `flush_interval` seconds or more after the previous chunk.
+    """
+    chunk = []
+    size = 0
+    flushed_at = None
+    for text in lines:
+        data = text.encode("utf-8")
+        chunk.append(data)
+        size += len(data)
+        now = clock()
+        if (
+            flushed_at is None
+            or size >= chunk_size
+            or now - flushed_at >= flush_interval
+        ):
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+            flushed_at = now
+
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresses a stream of chunks into a single gzip stream.
+
+    Each chunk is flushed through the compressor, so it reaches the client as soon
+    as `chunked` yields it rather than when zlib's buffer fills.
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
@@ -0,0 +1,56 @@
+"""HyperLogLog sketch utilities.
+
+Distinct-user sketches are built in Postgres at ingest time (see the `hll_*`
+functions in `schema.sql`) and stored as BYTEA values with one byte per register.
+This module uses the same hashing, so sketches can be built, merged across time
+ranges and estimated in Python.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Union
+
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+_RANK_BITS = 64 - HLL_PRECISION
+
+Sketch = Union[bytes, bytearray, memoryview]
+
+
+def hll_empty() -> bytes:
+    """Returns a sketch with every register unset."""
+    return bytes(HLL_REGISTERS)
+
+
+def hll_add(sketch: Sketch, value: str) -> bytes:
+    """Returns a copy of the sketch with a value added."""
+    digest = int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
+    register = digest >> _RANK_BITS
+    rank = _RANK_BITS - (digest & ((1 << _RANK_BITS) - 1)).bit_length() + 1
+
+    registers = bytearray(sketch)
+    registers[register] = max(registers[register], rank)
+    return bytes(registers)
+
+
+def hll_merge(sketches: Iterable[Sketch]) -> bytes:
+    """Merges sketches into one that counts the union of their values."""
+    merged = bytearray(HLL_REGISTERS)
+    for sketch in sketches:
+        merged = bytearray(map(max, merged, bytes(sketch)))
+    return bytes(merged)
+
+
+def hll_estimate(sketch: Sketch) -> int:
+    """Estimates the number of distinct values added to a sketch."""
+    registers = bytes(sketch)
+    alpha = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+    raw = alpha * HLL_REGISTERS**2 / sum(2.0**-rank for rank in registers)
+
+    # Linear counting is more accurate while many registers are still empty
+    empty = registers.count(0)
+    if raw <= 2.5 * HLL_REGISTERS and empty:
+        return round(HLL_REGISTERS * math.log(HLL_REGISTERS / empty))
+
+    return round(raw)
@@ -0,0 +1,242 @@
+"""Validation and serialization of ingested issues.
+
+SDKs post batches of errors and rejections. Each event is validated and normalized
+here, errors get their `error_hash`, and the batch is serialized in PostgreSQL's
+COPY text format so it can be written with one `COPY` per table.
+"""
+
+import hashlib
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from .uuid_generator import generate_uuid
+
+ERROR_INGEST_COLUMNS = [
+    "uuid",
+    "name",
+    "message",
+    "created_at",
+    "filename",
+    "line_number",
+    "col_number",
+    "project_id",
+    "stack_trace",
+    "handled",
+    "contexts",
+    "method",
+    "path",
+    "ip",
+    "os",
+    "browser",
+    "runtime",
+    "error_hash",
+]
+
+REJECTION_INGEST_COLUMNS = [
+    "uuid",
+    "value",
+    "created_at",
+    "project_id",
+    "handled",
+    "method",
+    "path",
+    "ip",
+    "os",
+    "browser",
+    "runtime",
+]
+
+# Optional text fields -> maximum length; longer values are truncated
+_TEXT_FIELDS = {
+    "filename": 255,
+    "method": 10,
+    "path": None,
+    "ip": 64,
+    "os": 255,
+    "browser": 255,
+    "runtime": 255,
+}
+
+_STACK_FRAME_PREFIXES = ("at ", "File ")
+_PYTHON_TRACEBACK = "Traceback (most recent call last):"
+
+
+def compute_error_hash(
+    name: str,
+    message: str,
+    stack_trace: Optional[str],
+    filename: Optional[str],
+    line_number: Optional[int],
+    col_number: Optional[int],
+) -> str:
+    """Groups errors by name, message and the place they were thrown.
+
+    The place is the innermost frame of the stack trace, or the error's file
+    position when the trace has none. That is the first line starting with `at ` or
+    `File `, except in Python tracebacks, which print the innermost frame last and
+    so use their last `File ` line.
+    """
+    location = f"{filename}:{line_number}:{col_number}"
+    lines = [line.strip() for line in (stack_trace or "").splitlines()]
+    lines = [line for line in lines if line]
+    if lines and lines[0] == _PYTHON_TRACEBACK:
+        frames = [line for line in lines if line.startswith("File ")][-1:]
+    else:
+        frames = [line for line in lines if line.startswith(_STACK_FRAME_PREFIXES)]
+    if frames:
+        location = frames[0]
+
+    return hashlib.md5(
+        "\n".join([name, message, location]).encode("utf-8")
+    ).hexdigest()
+
+
+def _required_text(event: Dict[str, Any], field: str) -> str:
+    value = event.get(field)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"'{field}' is required.")
+    return value
+
+
+def _optional_int(event: Dict[str, Any], field: str) -> Optional[int]:
+    value = event.get(field)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+        raise ValueError(f"'{field}' must be an integer.")
+    return value
+
+
+def _common_fields(event: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(event, dict):
+        raise ValueError("Events must be objects.")
+
+    handled = event.get("handled")
+    if not isinstance(handled, bool):
+        raise ValueError("'handled' must be a boolean.")
+
+    # An issue is identified by (uuid, created_at), so a client-chosen UUID only
+    # makes a resent issue recognizable if its timestamp is sent along with it.
+    issue_uuid = event.get("uuid")
+    created_at = event.get("created_at")
+    if issue_uuid is None:
+        issue_uuid = generate_uuid()
+    else:
+        try:
+            issue_uuid = str(uuid.UUID(issue_uuid))
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError("'uuid' must be a UUID.")
+        if created_at is None:
+            raise ValueError("'created_at' is required when 'uuid' is given.")
+
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
+    else:
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise ValueError("'created_at' must be an ISO 8601 timestamp.")
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+    fields = {"uuid": issue_uuid, "handled": handled, "created_at": created_at}
+    for field, limit in _TEXT_FIELDS.items():
+        value = event.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"'{field}' must be a string.")
+        fields[field] = value[:limit] if value and limit else value
+
+    return fields
+
+
+def parse_error_event(event: Dict[str, Any], project_id: int) -> Dict[str, Any]:
+    """Validates an ingested error and fills in its server-side fields.
+
+    Raises ValueError with a client-facing message for invalid events.
+    """
+    error = _common_fields(event)
+    error["project_id"] = project_id
+    error["name"] = _required_text(event, "name")[:255]
+    error["message"] = _required_text(event, "message")
+    error["line_number"] = _optional_int(event, "line_number")
+    error["col_number"] = _optional_int(event, "col_number")
+
+    stack_trace = event.get("stack_trace")
+    if stack_trace is not None and not isinstance(stack_trace, str):
+        raise ValueError("'stack_trace' must be a string.")
+    error["stack_trace"] = stack_trace
+
+    contexts = event.get("contexts")
+    if contexts is not None and not isinstance(contexts, (dict, list)):
+        raise ValueError("'contexts' must be an object or an array.")
+    error["contexts"] = contexts
+
+    error["error_hash"] = compute_error_hash(
+        error["name"],
+        error["message"],
+        stack_trace,
+        error["filename"],
+        error["line_number"],
+        error["col_number"],
+    )
+
+    return error
+
+
+def parse_rejection_event(event: Dict[str, Any], project_id: int) -> Dict[str, Any]:
+    """Validates an ingested rejection.
+
+    Raises ValueError with a client-facing message for invalid events.
+    """
+    rejection = _common_fields(event)
+    rejection["project_id"] = project_id
+    rejection["value"] = _required_text(event, "value")
+
+    return rejection
+
+
+def find_duplicate_uuid(issues: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Returns a UUID that appears more than once among parsed issues, if any."""
+    seen = set()
+    for issue in issues:
+        if issue["uuid"] in seen:
+            return issue["uuid"]
+        seen.add(issue["uuid"])
+
+    return None
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+        .replace("\x00", "")
+    )
+
+
+def copy_row(values: Iterable[Any]) -> str:
+    """Formats one row in COPY text format, line break included."""
+    return "\t".join(_copy_value(value) for value in values) + "\n"
+
+
+def copy_buffer(rows: Iterable[Dict[str, Any]], columns: List[str]) -> io.StringIO:
+    """Serializes rows in COPY text format, for `cursor.copy_expert`."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(copy_row(row[column] for column in columns))
+
+    buffer.seek(0)
+    return buffer
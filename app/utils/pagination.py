@@ -0,0 +1,59 @@
+"""Keyset pagination utilities.
+
+Cursors are opaque, URL-safe tokens that encode the sort key of the last row on a
+page. The next page is fetched with a `(created_at, uuid) < (...)` predicate instead
+of an OFFSET, so every page costs the same regardless of how deep it is. Ranked
+search results are ordered by `(rank, created_at, uuid)` and use rank cursors.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Tuple
+
+
+def _encode(key: List) -> str:
+    raw = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(token: str) -> List:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, uuid: str) -> str:
+    """Encodes the sort key of a row into an opaque cursor token."""
+    return _encode([created_at.isoformat(), uuid])
+
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    """Decodes a cursor token into a `(created_at, uuid)` tuple.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        created_at, uuid = _decode(token)
+        return datetime.fromisoformat(created_at), str(uuid)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+
+def encode_rank_cursor(rank: float, created_at: datetime, uuid: str) -> str:
+    """Encodes the sort key of a ranked search result into a cursor token."""
+    return _encode([rank, created_at.isoformat(), uuid])
+
+
+def decode_rank_cursor(token: str) -> Tuple[float, datetime, str]:
+    """Decodes a search cursor token into a `(rank, created_at, uuid)` tuple.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        rank, created_at, uuid = _decode(token)
+        return float(rank), datetime.fromisoformat(created_at), str(uuid)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
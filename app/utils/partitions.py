@@ -0,0 +1,415 @@
+"""Partition management for the time-partitioned log tables.
+
+`error_logs` and `rejection_logs` are range partitioned by `created_at` into monthly
+or weekly partitions named `<table>_p<YYYYMMDD>` after their lower bound, plus a
+default partition that catches rows outside every range.
+
+The manager pre-creates partitions ahead of time and enforces retention. A project's
+retention is its `retention_days`, falling back to the global setting (None keeps
+issues forever). Partitions that every project is done with are dropped whole;
+projects with a shorter retention than the rest, and expired rows that landed in
+the default partition, are deleted in bounded batches instead. Stack traces that no
+error references any more are deleted last.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+from psycopg2.extensions import connection as Connection, cursor as Cursor
+from .db_helpers import delete_in_batches
+
+# Log table -> issue type used by the counter and rollup tables
+PARTITIONED_TABLES = {"error_logs": "error", "rejection_logs": "rejection"}
+
+PARTITION_INTERVALS = ("month", "week")
+
+_BOUND_PATTERN = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    lower: Optional[datetime]  # None for MINVALUE
+    upper: Optional[datetime]  # None for MAXVALUE
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Returns the UTC start of the month or ISO week containing `moment`."""
+    moment = moment.astimezone(timezone.utc)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period_start(moment: datetime, interval: str) -> datetime:
+    """Returns the start of the period following the one containing `moment`."""
+    start = period_start(moment, interval)
+
+    if interval == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(table: str, lower: datetime) -> str:
+    return f"{table}_p{lower:%Y%m%d}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def list_partitions(cursor: Cursor, table: str) -> List[Partition]:
+    """Lists a table's range partitions ordered by lower bound."""
+    cursor.execute("SET LOCAL TimeZone = 'UTC'")
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [table],
+    )
+
+    partitions = []
+    for name, bound in cursor.fetchall():
+        match = _BOUND_PATTERN.search(bound)
+        if match:
+            lower, upper = (_parse_bound(value) for value in match.groups())
+            partitions.append(Partition(name, lower, upper))
+
+    return sorted(
+        partitions,
+        key=lambda p: p.lower or datetime.min.replace(tzinfo=timezone.utc),
+    )
+
+
+def _insertable_columns(cursor: Cursor, table: str) -> str:
+    cursor.execute(
+        """
+        SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+        FROM pg_attribute
+        WHERE attrelid = to_regclass(%s)
+        AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        """,
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+def create_partition(
+    cursor: Cursor, table: str, lower: datetime, upper: datetime
+) -> str:
+    """Creates the partition for `[lower, upper)` and returns its name.
+
+    Rows already in the default partition for that range are moved into the new
+    partition before it is attached. Moving rows between partitions does not fire
+    the statement triggers on the parent table, so aggregates are unaffected.
+    """
+    name = partition_name(table, lower)
+    columns = _insertable_columns(cursor, table)
+
+    cursor.execute(
+        f"""
+        CREATE TABLE {name} (
+          LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS
+        )
+        """
+    )
+    cursor.execute(
+        f"""
+        WITH moved AS (
+          DELETE FROM {table}_default
+          WHERE created_at >= %s AND created_at < %s
+          RETURNING {columns}
+        )
+        INSERT INTO {name} ({columns}) SELECT {columns} FROM moved
+        """,
+        [lower, upper],
+    )
+    cursor.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+        [lower, upper],
+    )
+
+    return name
+
+
+def ensure_future_partitions(
+    cursor: Cursor, table: str, interval: str, premake: int, now: datetime
+) -> List[str]:
+    """Creates partitions up to `premake` periods past the current one.
+
+    New partitions continue from the newest existing one; a table without range
+    partitions starts at the current period.
+    """
+    partitions = list_partitions(cursor, table)
+    uppers = [p.upper for p in partitions if p.upper is not None]
+
+    lower = max(uppers) if uppers else period_start(now, interval)
+    horizon = next_period_start(now, interval)
+    for _ in range(premake):
+        horizon = next_period_start(horizon, interval)
+
+    created = []
+    while lower < horizon:
+        upper = next_period_start(lower, interval)
+        created.append(create_partition(cursor, table, lower, upper))
+        lower = upper
+
+    return created
+
+
+def fetch_retention_policy(
+    cursor: Cursor, default_days: Optional[int]
+) -> Dict[int, Optional[int]]:
+    """Maps each project id to its effective retention in days (None = forever)."""
+    cursor.execute("SELECT id, retention_days FROM projects")
+    return {
+        project_id: days if days is not None else default_days
+        for project_id, days in cursor.fetchall()
+    }
+
+
+def drop_partition(cursor: Cursor, table: str, partition: Partition) -> None:
+    """Detaches and drops a partition, subtracting its rows from the aggregates.
+
+    The partition is detached first so its rows stop changing while their counts
+    are subtracted. Must run in its own transaction.
+    """
+    issue_type = PARTITIONED_TABLES[table]
+    name = partition.name
+
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+
+    cursor.execute(
+        f"""
+        UPDATE project_issue_counters c
+        SET issue_count = c.issue_count - d.issue_count
+        FROM (
+          SELECT project_id, handled, resolved, COUNT(*) AS issue_count
+          FROM {name}
+          GROUP BY project_id, handled, resolved
+        ) d
+        WHERE c.project_id = d.project_id
+          AND c.issue_type = %s
+          AND c.handled = d.handled
+          AND c.resolved = d.resolved
+        """,
+        [issue_type],
+    )
+
+    bucket_range = "bucket < %s"
+    bucket_params = [partition.upper]
+    if partition.lower is not None:
+        bucket_range += " AND bucket >= %s"
+        bucket_params.append(partition.lower)
+
+    for rollup in ("issue_rollups", "issue_facets"):
+        cursor.execute(
+            f"DELETE FROM {rollup} WHERE issue_type = %s AND {bucket_range}",
+            [issue_type, *bucket_params],
+        )
+
+    if table == "error_logs":
+        cursor.execute(
+            f"""
+            UPDATE error_groups g
+            SET
+              occurrences = g.occurrences - d.occurrences,
+              unresolved_occurrences =
+                g.unresolved_occurrences - d.unresolved_occurrences
+            FROM (
+              SELECT
+                project_id,
+                error_hash,
+                COUNT(*) AS occurrences,
+                COUNT(*) FILTER (WHERE NOT resolved) AS unresolved_occurrences
+              FROM {name}
+              WHERE project_id IS NOT NULL AND error_hash IS NOT NULL
+              GROUP BY project_id, error_hash
+            ) d
+            WHERE g.project_id = d.project_id AND g.error_hash = d.error_hash
+            """
+        )
+        cursor.execute("DELETE FROM error_groups WHERE occurrences <= 0")
+        cursor.execute(
+            f"DELETE FROM error_group_hourly_sketches WHERE {bucket_range}",
+            bucket_params,
+        )
+
+    cursor.execute(f"DROP TABLE {name}")
+
+    # Re-point projects whose latest issue was in the dropped partition
+    cursor.execute(
+        """
+        SELECT refresh_latest_issues(ARRAY(
+          SELECT project_id
+          FROM project_latest_issues
+          WHERE issue_type = %s AND last_seen < %s
+        ))
+        """,
+        [issue_type, partition.upper],
+    )
+
+    if table == "error_logs":
+        # Groups that keep occurrences only lose their oldest ones
+        cursor.execute(
+            """
+            UPDATE error_groups g
+            SET first_seen = COALESCE(
+              (
+                SELECT e.created_at
+                FROM error_logs e
+                WHERE e.project_id = g.project_id AND e.error_hash = g.error_hash
+                ORDER BY e.created_at
+                LIMIT 1
+              ),
+              g.first_seen
+            )
+            WHERE g.first_seen < %s
+            """,
+            [partition.upper],
+        )
+
+
+def delete_unreferenced_stack_traces(connection: Connection, batch_size: int) -> int:
+    """Deletes stored stack traces that no error references, in bounded batches.
+
+    Candidates are locked with SKIP LOCKED, skipping traces that an uncommitted
+    insert has just reused, and checked again once locked, so a trace is never
+    deleted from under an error that references it. Returns the number deleted.
+    """
+    cursor = connection.cursor()
+    deleted = 0
+
+    try:
+        while True:
+            cursor.execute(
+                """
+                SELECT s.digest
+                FROM stack_traces s
+                WHERE NOT EXISTS (
+                  SELECT 1 FROM error_logs e WHERE e.stack_trace_digest = s.digest
+                )
+                LIMIT %s
+                FOR UPDATE OF s SKIP LOCKED
+                """,
+                [batch_size],
+            )
+            digests = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                """
+                DELETE FROM stack_traces s
+                WHERE s.digest = ANY(%s)
+                AND NOT EXISTS (
+                  SELECT 1 FROM error_logs e WHERE e.stack_trace_digest = s.digest
+                )
+                """,
+                [digests],
+            )
+            deleted += cursor.rowcount
+            connection.commit()
+
+            if len(digests) < batch_size:
+                return deleted
+    finally:
+        cursor.close()
+
+
+def maintain_partitions(
+    connection: Connection,
+    interval: str = "month",
+    premake: int = 3,
+    retention_days: Optional[int] = None,
+    batch_size: int = 5000,
+    now: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Pre-creates future partitions and enforces retention for both log tables.
+
+    Returns counts of created and dropped partitions and of deleted rows.
+    """
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(f"Unsupported partition interval: {interval}")
+
+    now = now or datetime.now(timezone.utc)
+    summary = {"created": 0, "dropped": 0, "deleted": 0}
+    cursor = connection.cursor()
+
+    try:
+        policy = fetch_retention_policy(cursor, retention_days)
+        connection.commit()
+
+        # Partitions are dropped once every project is past them
+        if policy:
+            horizon_days = (
+                None if None in policy.values() else max(policy.values())
+            )
+        else:
+            horizon_days = retention_days
+        horizon = (
+            now - timedelta(days=horizon_days) if horizon_days is not None else None
+        )
+
+        for table in PARTITIONED_TABLES:
+            for name in ensure_future_partitions(
+                cursor, table, interval, premake, now
+            ):
+                log(f"Created partition {name}")
+                summary["created"] += 1
+            connection.commit()
+
+            if horizon is None:
+                expired = []
+            else:
+                expired = [
+                    p
+                    for p in list_partitions(cursor, table)
+                    if p.upper is not None and p.upper <= horizon
+                ]
+            connection.commit()
+
+            for partition in expired:
+                drop_partition(cursor, table, partition)
+                connection.commit()
+                log(f"Dropped partition {partition.name}")
+                summary["dropped"] += 1
+
+            # Projects that keep issues for less time than the partitions live
+            for project_id, days in policy.items():
+                if days is None or (
+                    horizon_days is not None and days >= horizon_days
+                ):
+                    continue
+                summary["deleted"] += delete_in_batches(
+                    connection,
+                    table,
+                    "project_id = %s AND created_at < %s",
+                    [project_id, now - timedelta(days=days)],
+                    batch_size,
+                )
+
+            # Expired rows below the oldest range partition sit in the default one
+            if horizon is not None:
+                lowers = [p.lower for p in list_partitions(cursor, table)]
+                connection.commit()
+                if None not in lowers:
+                    cutoff = min([horizon, *lowers])
+                    summary["deleted"] += delete_in_batches(
+                        connection, table, "created_at < %s", [cutoff], batch_size
+                    )
+
+        traces = delete_unreferenced_stack_traces(connection, batch_size)
+        if traces:
+            log(f"Deleted {traces} unreferenced stack trace(s)")
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return summary
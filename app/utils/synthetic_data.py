@@ -0,0 +1,775 @@
+"""Synthetic issue data for reproducing production-scale performance problems.
+
+`seed_synthetic_data` adds projects, users, memberships, errors and rejections
+shaped like real traffic:
+
+* error groups follow a power law, so a few errors dominate each project while a
+  long tail occurs only a handful of times;
+* timestamps follow a daily cycle, with bursts in which a single error spikes, as
+  after a bad deploy;
+* users, browsers, operating systems and paths are drawn from skewed
+  distributions, and every group has its own stack trace, some of them very large.
+
+Rows are streamed to Postgres with `COPY`, in one transaction. The
+`error_logs_before_write` row trigger is disabled for the duration of the load:
+each group's stack trace is stored and its search document computed once, and
+errors are copied to a staging table and joined to their group's columns on the
+server. When the load is at least as large as the existing data, the secondary
+indexes of the log tables are also dropped and rebuilt in bulk at the end. The
+statement-level triggers stay enabled, so the aggregate tables are maintained as
+for any other write. The load locks the log tables, so it is meant for
+development and benchmark databases.
+"""
+
+import bisect
+import itertools
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import bcrypt
+from psycopg2.extensions import connection as Connection, cursor as Cursor
+from .ingest import compute_error_hash, copy_row
+from .partitions import (
+    create_partition,
+    list_partitions,
+    next_period_start,
+    period_start,
+)
+
+DEFAULT_PASSWORD = "password123"
+
+# Zipf exponents: the weight of the item ranked r is 1 / r**s
+GROUP_SKEW = 1.1
+PROJECT_SKEW = 0.8
+USER_SKEW = 1.0
+PATH_SKEW = 1.2
+
+# Share of issues that belong to a burst of a single error group
+BURST_SHARE = 0.3
+
+# Stack trace length in frames: log-normal, median e**3.4 (about 30 frames)
+TRACE_FRAMES_MU = 3.4
+TRACE_FRAMES_SIGMA = 0.9
+MAX_TRACE_FRAMES = 1000
+
+# Platform -> stack trace style
+PLATFORMS = {
+    "React": "browser",
+    "Vue": "browser",
+    "JavaScript": "browser",
+    "Express": "node",
+    "Flask": "python",
+}
+
+LOG_TABLES = ("error_logs", "rejection_logs")
+
+# Bytes handed to COPY per read; psycopg2's default of 8 KiB is a few rows
+COPY_CHUNK_SIZE = 1 << 20
+
+# Columns of error_logs that vary per row and that are shared by a group
+ERROR_ROW_COLUMNS = [
+    "uuid",
+    "created_at",
+    "contexts",
+    "method",
+    "path",
+    "ip",
+    "os",
+    "browser",
+    "runtime",
+]
+
+ERROR_GROUP_COLUMNS = [
+    "project_id",
+    "handled",
+    "resolved",
+    "name",
+    "message",
+    "filename",
+    "line_number",
+    "col_number",
+    "error_hash",
+    "stack_trace_digest",
+    "search_vector",
+]
+
+REJECTION_COLUMNS = [
+    "uuid",
+    "created_at",
+    "project_id",
+    "value",
+    "handled",
+    "resolved",
+    "method",
+    "path",
+    "ip",
+    "os",
+    "browser",
+    "runtime",
+]
+
+ERROR_TEMPLATES = {
+    "browser": [
+        ("TypeError", "Cannot read properties of undefined (reading '{prop}')"),
+        ("TypeError", "{obj}.{prop} is not a function"),
+        ("TypeError", "Cannot destructure property '{prop}' of '{obj}' as it is null."),
+        ("ReferenceError", "{obj} is not defined"),
+        ("RangeError", "Maximum call stack size exceeded"),
+        ("SyntaxError", "Unexpected token '<', \"<!DOCTYPE \"... is not valid JSON"),
+        ("ChunkLoadError", "Loading chunk {number} failed."),
+        ("Error", "Minified React error #{number}"),
+        ("AbortError", "The operation was aborted."),
+    ],
+    "node": [
+        ("TypeError", "Cannot read properties of null (reading '{prop}')"),
+        ("Error", "connect ECONNREFUSED 10.0.{number}.12:5432"),
+        ("Error", "Request failed with status code {status}"),
+        (
+            "SequelizeUniqueConstraintError",
+            "Validation error: {obj}.{prop} must be unique",
+        ),
+        ("RangeError", "Invalid time value"),
+        ("Error", "ENOENT: no such file or directory, open '/app/{obj}.json'"),
+    ],
+    "python": [
+        ("KeyError", "'{prop}'"),
+        ("AttributeError", "'NoneType' object has no attribute '{prop}'"),
+        ("ValueError", "invalid literal for int() with base 10: '{prop}'"),
+        ("ZeroDivisionError", "division by zero"),
+        (
+            "UniqueViolation",
+            'duplicate key value violates unique constraint "{obj}_pkey"',
+        ),
+        ("OperationalError", "server closed the connection unexpectedly"),
+    ],
+}
+
+REJECTION_TEMPLATES = [
+    "Request failed with status code {status}",
+    "timeout of {number}ms exceeded",
+    "Network Error",
+    "Failed to fetch",
+    "AbortError: The user aborted a request.",
+    "ChunkLoadError: Loading chunk {number} failed.",
+    "{obj} could not be saved",
+]
+
+PROPS = ["id", "name", "map", "length", "data", "user", "items", "price", "token"]
+OBJECTS = ["user", "order", "cart", "response", "props", "store", "session", "item"]
+STATUSES = [500, 502, 503, 504, 404, 401, 403, 429]
+
+ROUTES = [
+    "/",
+    "/dashboard",
+    "/login",
+    "/projects/{id}",
+    "/projects/{id}/issues",
+    "/products/{id}",
+    "/cart",
+    "/checkout",
+    "/orders/{id}",
+    "/search",
+    "/settings/profile",
+    "/api/orders/{id}",
+    "/api/users/{id}",
+    "/api/products/{id}/reviews",
+    "/reports/{id}/export",
+    "/admin/users",
+    "/invite/{id}",
+    "/help",
+]
+
+METHODS = [("GET", 70), ("POST", 20), ("PUT", 5), ("DELETE", 3), ("PATCH", 2)]
+
+# (os, browser, runtime) with weights, per platform style
+CLIENTS = {
+    "browser": [
+        (("Windows 11", "Chrome 131", None), 30),
+        (("Windows 10", "Chrome 131", None), 15),
+        (("macOS 14.6", "Chrome 131", None), 12),
+        (("iOS 18.1", "Safari 18.1", None), 14),
+        (("macOS 14.6", "Safari 18.1", None), 6),
+        (("Android 14", "Chrome 131", None), 8),
+        (("Android 14", "Samsung Internet 26", None), 4),
+        (("Windows 11", "Edge 131", None), 6),
+        (("Windows 10", "Firefox 133", None), 3),
+        (("Linux", "Firefox 133", None), 2),
+    ],
+    "node": [
+        (("Linux", None, "Node.js 20.11.1"), 70),
+        (("Linux", None, "Node.js 18.19.0"), 20),
+        (("Linux", None, "Node.js 22.12.0"), 10),
+    ],
+    "python": [
+        (("Linux", None, "Python 3.12.7"), 75),
+        (("Linux", None, "Python 3.11.10"), 25),
+    ],
+}
+
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Edsger", "Barbara", "Ken", "Radia", "Linus"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Thompson"]
+
+
+def zipf_cum_weights(count: int, skew: float) -> List[float]:
+    """Cumulative weights of a Zipf distribution over `count` ranks."""
+    return list(itertools.accumulate(1 / rank**skew for rank in range(1, count + 1)))
+
+
+def _cum_weights(weights: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        prop=rng.choice(PROPS),
+        obj=rng.choice(OBJECTS),
+        number=rng.randint(1, 999),
+        status=rng.choice(STATUSES),
+    )
+
+
+def _stack_trace(
+    rng: random.Random, style: str, name: str, message: str
+) -> Tuple[str, str, int, int]:
+    """Builds a stack trace and returns it with its top frame's position."""
+    frames = min(
+        MAX_TRACE_FRAMES,
+        max(1, int(rng.lognormvariate(TRACE_FRAMES_MU, TRACE_FRAMES_SIGMA))),
+    )
+    positions = []
+    lines = []
+    for depth in range(frames):
+        module = f"{rng.choice(OBJECTS)}{rng.choice(['', 'Service', 'View', 'Store'])}"
+        function = f"{rng.choice(['handle', 'render', 'load', 'update'])}{module}"
+        line, col = rng.randint(1, 4000), rng.randint(1, 120)
+        if style == "browser":
+            filename = f"https://app.example.com/static/js/{module}.{depth:04x}.js"
+            lines.append(f"    at {function} ({filename}:{line}:{col})")
+        elif style == "node":
+            filename = f"/app/src/{module}.js"
+            lines.append(f"    at {function} ({filename}:{line}:{col})")
+        else:
+            filename = f"/app/{module}.py"
+            lines.append(f'  File "{filename}", line {line}, in {function}')
+            lines.append(f"    result = {function}({rng.choice(PROPS)})")
+        positions.append((filename, line, col))
+
+    if style == "python":
+        # Python prints the innermost frame last
+        trace = "\n".join(
+            ["Traceback (most recent call last):", *lines, f"{name}: {message}"]
+        )
+        return (trace, *positions[-1])
+
+    return ("\n".join([f"{name}: {message}", *lines]), *positions[0])
+
+
+def _client_fields(style: str) -> Tuple[List[str], List[float]]:
+    """COPY-rendered (os, browser, runtime) columns and their cumulative weights."""
+    clients = CLIENTS[style]
+    weights = _cum_weights([weight for _, weight in clients])
+    return [copy_row(client)[:-1] for client, _ in clients], weights
+
+
+class _ProjectTraffic:
+    """The distributions issues of one project are drawn from."""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        project_id: int,
+        style: str,
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        self.rng = rng
+        self.project_id = project_id
+        self.style = style
+        self.start = start.timestamp()
+        self.span = (end - start).total_seconds()
+
+        self.users = rng.randint(500, 50_000)
+        self.user_weights = zipf_cum_weights(self.users, USER_SKEW)
+        self.releases = [f"1.{minor}.{rng.randint(0, 9)}" for minor in range(8, 20)]
+        self.release_weights = zipf_cum_weights(len(self.releases), 1.5)
+        self.paths = [rng.choice(ROUTES) for _ in range(200)]
+        self.path_weights = zipf_cum_weights(len(self.paths), PATH_SKEW)
+        self.methods = [method for method, _ in METHODS]
+        self.method_weights = _cum_weights([weight for _, weight in METHODS])
+        self.clients, self.client_weights = _client_fields(style)
+
+        # Busier in the (UTC) afternoon than at night
+        self.hour_weights = _cum_weights(
+            [1 + 3 * max(0.0, 1 - abs(hour - 15) / 9) for hour in range(24)]
+        )
+
+    def timestamp(self) -> float:
+        rng = self.rng
+        day = int(rng.random() * self.span // 86400) * 86400
+        hour = bisect.bisect(self.hour_weights, rng.random() * self.hour_weights[-1])
+        moment = self.start + day + hour * 3600 + rng.random() * 3600
+        return min(moment, self.start + self.span - 1)
+
+    def bursts(self, groups: int) -> List[Tuple[float, float, int]]:
+        """Windows (start, mean length, group) in which one group spikes."""
+        rng = self.rng
+        count = max(1, int(self.span // (3 * 86400)))
+        return [
+            (
+                self.start + rng.random() * self.span,
+                rng.uniform(600, 7200),
+                rng.randrange(groups),
+            )
+            for _ in range(count)
+        ]
+
+    def request_fields(self, contexts: bool = True) -> str:
+        """Contexts, method, path, IP and client columns of one issue."""
+        rng = self.rng
+        user = bisect.bisect(self.user_weights, rng.random() * self.user_weights[-1])
+        release = self.releases[
+            bisect.bisect(self.release_weights, rng.random() * self.release_weights[-1])
+        ]
+        path = self.paths[
+            bisect.bisect(self.path_weights, rng.random() * self.path_weights[-1])
+        ].replace("{id}", str(rng.randint(1, 1_000_000)))
+        method = self.methods[
+            bisect.bisect(self.method_weights, rng.random() * self.method_weights[-1])
+        ]
+        client = self.clients[
+            bisect.bisect(self.client_weights, rng.random() * self.client_weights[-1])
+        ]
+        ip = f"10.{self.project_id % 256}.{user >> 8 & 255}.{user & 255}"
+        fields = f"{method}\t{path}\t{ip}\t{client}"
+        if not contexts:
+            return fields
+        return f'{{"user": {{"id": {user}}}, "release": "{release}"}}\t{fields}'
+
+
+def _iso(moment: float) -> str:
+    return datetime.fromtimestamp(moment, timezone.utc).isoformat()
+
+
+def _make_error_groups(
+    cursor: Cursor, traffic: _ProjectTraffic, first_id: int, groups: int
+) -> None:
+    """Creates a project's error groups, numbered from `first_id`.
+
+    Stack traces are stored and search documents computed here, once per group,
+    in place of the row trigger.
+    """
+    rng = traffic.rng
+    templates = ERROR_TEMPLATES[traffic.style]
+    columns = [[] for _ in range(9)]
+    for _ in range(groups):
+        name, template = rng.choice(templates)
+        message = _fill(template, rng)
+        trace, filename, line, col = _stack_trace(rng, traffic.style, name, message)
+        error_hash = compute_error_hash(name, message, trace, filename, line, col)
+        handled = rng.random() < 0.3
+        resolved = rng.random() < 0.15
+        row = (name, message, trace, filename, line, col, error_hash, handled, resolved)
+        for values, value in zip(columns, row):
+            values.append(value)
+
+    cursor.execute(
+        """
+        WITH g AS (
+          SELECT * FROM unnest(
+            %s::text[], %s::text[], %s::text[], %s::text[], %s::int[], %s::int[],
+            %s::text[], %s::boolean[], %s::boolean[]
+          ) WITH ORDINALITY AS g(
+            name, message, trace, filename, line_number, col_number, error_hash,
+            handled, resolved, i
+          )
+        ), stored AS (
+          INSERT INTO stack_traces (digest, stack_trace)
+          SELECT sha256(convert_to(trace, 'UTF8')), trace FROM g
+          ON CONFLICT (digest) DO NOTHING
+        )
+        INSERT INTO synthetic_error_groups
+        SELECT %s + i - 1, %s, handled, resolved, name, message, filename,
+          line_number, col_number, error_hash, sha256(convert_to(trace, 'UTF8')),
+          error_search_vector(name, message, trace)
+        FROM g
+        """,
+        [*columns, first_id, traffic.project_id],
+    )
+
+
+def _error_lines(
+    traffic: _ProjectTraffic, first_id: int, groups: int, count: int
+) -> Iterator[str]:
+    rng = traffic.rng
+    weights = zipf_cum_weights(groups, GROUP_SKEW)
+    bursts = traffic.bursts(groups)
+    end = traffic.start + traffic.span - 1
+
+    for _ in range(count):
+        if rng.random() < BURST_SHARE:
+            burst_start, length, group = rng.choice(bursts)
+            moment = min(burst_start + rng.expovariate(1 / length), end)
+        else:
+            group = bisect.bisect(weights, rng.random() * weights[-1])
+            moment = traffic.timestamp()
+        yield (
+            f"{_uuid(rng)}\t{_iso(moment)}\t{first_id + group}\t"
+            f"{traffic.request_fields()}\n"
+        )
+
+
+def _rejection_lines(traffic: _ProjectTraffic, count: int) -> Iterator[str]:
+    rng = traffic.rng
+    values = [
+        copy_row([traffic.project_id, _fill(template, rng), rng.random() < 0.5, False])
+        for template in REJECTION_TEMPLATES
+        for _ in range(5)
+    ]
+    rng.shuffle(values)
+    values = [value[:-1] for value in values]
+    weights = zipf_cum_weights(len(values), GROUP_SKEW)
+
+    for _ in range(count):
+        value = values[bisect.bisect(weights, rng.random() * weights[-1])]
+        yield (
+            f"{_uuid(rng)}\t{_iso(traffic.timestamp())}\t{value}\t"
+            f"{traffic.request_fields(contexts=False)}\n"
+        )
+
+
+class _LineReader:
+    """File-like view of an iterator of lines, for `cursor.copy_expert`."""
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self.lines = lines
+        self.pending = ""
+
+    def read(self, size: int = -1) -> str:
+        chunks = [self.pending]
+        length = len(self.pending)
+        for line in self.lines:
+            chunks.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = "".join(chunks)
+        if size < 0:
+            self.pending = ""
+            return data
+        self.pending = data[size:]
+        return data[:size]
+
+    readline = read
+
+
+def _copy_lines(
+    cursor: Cursor,
+    table: str,
+    columns: List[str],
+    lines: Iterator[str],
+    count: int,
+    batch_size: int,
+) -> None:
+    """Copies `count` lines in statements of up to `batch_size` rows."""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    for batch_start in range(0, count, batch_size):
+        batch = itertools.islice(lines, min(batch_size, count - batch_start))
+        cursor.copy_expert(statement, _LineReader(batch), size=COPY_CHUNK_SIZE)
+
+
+def _create_staging_tables(cursor: Cursor) -> None:
+    """Creates the temporary tables errors are assembled in.
+
+    Errors are copied with their group's id only and joined to the group's
+    columns on the server, so the large search documents are neither sent nor
+    parsed once per row.
+    """
+    cursor.execute(
+        """
+        CREATE TEMPORARY TABLE synthetic_error_groups (
+          group_id INT PRIMARY KEY,
+          project_id INT,
+          handled BOOLEAN,
+          resolved BOOLEAN,
+          name TEXT,
+          message TEXT,
+          filename TEXT,
+          line_number INT,
+          col_number INT,
+          error_hash TEXT,
+          stack_trace_digest BYTEA,
+          search_vector TSVECTOR
+        ) ON COMMIT DROP;
+
+        CREATE TEMPORARY TABLE synthetic_errors (
+          uuid TEXT,
+          created_at TIMESTAMPTZ,
+          group_id INT,
+          contexts JSONB,
+          method TEXT,
+          path TEXT,
+          ip TEXT,
+          os TEXT,
+          browser TEXT,
+          runtime TEXT
+        ) ON COMMIT DROP;
+        """
+    )
+
+
+def _copy_errors(
+    cursor: Cursor, lines: Iterator[str], count: int, batch_size: int
+) -> None:
+    """Stages errors in batches of `batch_size` and moves them to error_logs."""
+    columns = ", ".join(ERROR_ROW_COLUMNS + ERROR_GROUP_COLUMNS)
+    for batch_start in range(0, count, batch_size):
+        batch = itertools.islice(lines, min(batch_size, count - batch_start))
+        cursor.copy_expert(
+            "COPY synthetic_errors FROM STDIN",
+            _LineReader(batch),
+            size=COPY_CHUNK_SIZE,
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO error_logs ({columns})
+            SELECT {columns}
+            FROM synthetic_errors JOIN synthetic_error_groups USING (group_id)
+            """
+        )
+        cursor.execute("TRUNCATE synthetic_errors")
+
+
+def _ensure_partitions(
+    cursor: Cursor, start: datetime, end: datetime, interval: str
+) -> None:
+    """Creates the missing partitions covering `[start, end]` for both log tables."""
+    for table in LOG_TABLES:
+        existing = [
+            (p.lower, p.upper) for p in list_partitions(cursor, table) if p.lower
+        ]
+        lower = period_start(start, interval)
+        while lower <= end:
+            upper = next_period_start(lower, interval)
+            if not any(low < upper and high > lower for low, high in existing):
+                create_partition(cursor, table, lower, upper)
+            lower = upper
+
+
+def _estimated_log_rows(cursor: Cursor) -> int:
+    """Planner estimate of the number of rows in the log tables."""
+    cursor.execute(
+        """
+        SELECT COALESCE(sum(GREATEST(c.reltuples, 0)), 0)::bigint
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = ANY(%s::regclass[])
+        """,
+        [list(LOG_TABLES)],
+    )
+    return cursor.fetchone()[0]
+
+
+def _drop_log_indexes(cursor: Cursor) -> List[str]:
+    """Drops the log tables' secondary indexes and returns their definitions."""
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = ANY(%s::regclass[])
+        AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.oid)
+        """,
+        [list(LOG_TABLES)],
+    )
+    definitions = []
+    for name, definition in cursor.fetchall():
+        cursor.execute(f"DROP INDEX {name}")
+        definitions.append(definition.replace(" ON ONLY ", " ON ", 1))
+    return definitions
+
+
+def _set_row_trigger(cursor: Cursor, enabled: bool) -> None:
+    """Enables or disables `error_logs_before_write` on error_logs and partitions."""
+    action = "ENABLE" if enabled else "DISABLE"
+    cursor.execute(
+        """
+        SELECT inhrelid::regclass::text FROM pg_inherits
+        WHERE inhparent = 'error_logs'::regclass
+        """
+    )
+    for table in ["error_logs", *(row[0] for row in cursor.fetchall())]:
+        cursor.execute(f"ALTER TABLE {table} {action} TRIGGER error_logs_before_write")
+
+
+def _insert_accounts(
+    cursor: Cursor, rng: random.Random, projects: int, users: int
+) -> List[Tuple[int, str]]:
+    """Adds projects, users and memberships; returns (project id, style) pairs."""
+    batch = rng.getrandbits(32)
+    platforms = list(PLATFORMS)
+    project_rows = []
+    for p in range(projects):
+        project_uuid = _uuid(rng)
+        project_rows.append(
+            copy_row(
+                [
+                    project_uuid,
+                    f"Synthetic {batch:08x}-{p + 1}",
+                    _uuid(rng),
+                    rng.choices(platforms, weights=[4, 2, 1, 2, 1])[0],
+                    f"arn:aws:sns:us-east-1:000000000000:synthetic-{project_uuid}",
+                ]
+            )
+        )
+    cursor.copy_expert(
+        "COPY projects (uuid, name, api_key, platform, sns_topic_arn) FROM STDIN",
+        _LineReader(iter(project_rows)),
+    )
+    cursor.execute(
+        "SELECT id, platform FROM projects WHERE name LIKE %s ORDER BY id",
+        [f"Synthetic {batch:08x}-%"],
+    )
+    project_ids = [(row[0], PLATFORMS.get(row[1], "browser")) for row in cursor]
+
+    password_hash = bcrypt.hashpw(
+        DEFAULT_PASSWORD.encode("utf-8"), bcrypt.gensalt()
+    ).decode("utf-8")
+    user_rows = [
+        copy_row(
+            [
+                _uuid(rng),
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                f"user{u + 1}-{batch:08x}@example.com",
+                password_hash,
+                False,
+            ]
+        )
+        for u in range(users)
+    ]
+    cursor.copy_expert(
+        "COPY users (uuid, first_name, last_name, email, password_hash, is_root) "
+        "FROM STDIN",
+        _LineReader(iter(user_rows)),
+    )
+    cursor.execute(
+        "SELECT id FROM users WHERE email LIKE %s ORDER BY id", [f"%-{batch:08x}@%"]
+    )
+    user_ids = [row[0] for row in cursor]
+
+    # Popular projects have more members; everyone belongs to at least one
+    weights = zipf_cum_weights(len(project_ids), PROJECT_SKEW)
+    memberships = []
+    for user_id in user_ids:
+        count = min(len(project_ids), 1 + int(rng.expovariate(0.7)))
+        chosen = {
+            project_ids[bisect.bisect(weights, rng.random() * weights[-1])][0]
+            for _ in range(count)
+        }
+        memberships += [copy_row([project_id, user_id]) for project_id in chosen]
+    cursor.copy_expert(
+        "COPY projects_users (project_id, user_id) FROM STDIN",
+        _LineReader(iter(memberships)),
+    )
+
+    return project_ids
+
+
+def seed_synthetic_data(
+    connection: Connection,
+    projects: int,
+    users: int,
+    errors: int,
+    rejections: int,
+    days: int = 30,
+    groups: int = 500,
+    seed: Optional[int] = None,
+    batch_size: int = 250_000,
+    interval: str = "month",
+    now: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Adds synthetic projects, users, memberships, errors and rejections.
+
+    Issues are spread over the projects by a power law and over the last `days`
+    days; each project has `groups` error groups. Every generated user can log in
+    with `DEFAULT_PASSWORD`. The same `seed` generates the same rows, UUIDs
+    included, so it can be used once per database. The load runs in a single
+    transaction, so a failure leaves the database as it was. Returns the number
+    of rows added per kind.
+    """
+    rng = random.Random(seed)
+    end = now or datetime.now(timezone.utc)
+    start = end - timedelta(days=days)
+    previous_autocommit = connection.autocommit
+    connection.autocommit = False
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        _ensure_partitions(cursor, start, end, interval)
+        project_ids = _insert_accounts(cursor, rng, projects, users)
+        log(f"Added {projects} project(s) and {users} user(s)")
+
+        # Rebuilding covers the existing rows too, so it only pays for large loads
+        definitions = []
+        if errors + rejections >= _estimated_log_rows(cursor):
+            definitions = _drop_log_indexes(cursor)
+        _set_row_trigger(cursor, enabled=False)
+        _create_staging_tables(cursor)
+
+        shares = zipf_cum_weights(len(project_ids), PROJECT_SKEW)
+        shares = [weight / shares[-1] for weight in shares]
+        for index, (project_id, style) in enumerate(project_ids):
+            low = shares[index - 1] if index else 0.0
+            project_errors = round(errors * shares[index]) - round(errors * low)
+            project_rejections = round(rejections * shares[index]) - round(
+                rejections * low
+            )
+            traffic = _ProjectTraffic(rng, project_id, style, start, end)
+
+            first_id = index * groups
+            _make_error_groups(cursor, traffic, first_id, groups)
+            _copy_errors(
+                cursor,
+                _error_lines(traffic, first_id, groups, project_errors),
+                project_errors,
+                batch_size,
+            )
+            _copy_lines(
+                cursor,
+                "rejection_logs",
+                REJECTION_COLUMNS,
+                _rejection_lines(traffic, project_rejections),
+                project_rejections,
+                batch_size,
+            )
+            log(
+                f"Project {index + 1}/{len(project_ids)}: {project_errors} error(s), "
+                f"{project_rejections} rejection(s)"
+            )
+
+        _set_row_trigger(cursor, enabled=True)
+        if definitions:
+            log(f"Rebuilding {len(definitions)} index(es)")
+        for definition in definitions:
+            cursor.execute(definition)
+        cursor.execute("ANALYZE error_logs, rejection_logs, stack_traces")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.autocommit = previous_autocommit
+
+    return {
+        "projects": projects,
+        "users": users,
+        "errors": errors,
+        "rejections": rejections,
+    }
@@ -1,8 +1,41 @@
 """Validation utility."""
 
 import re
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Summary ranges are a number of hours or days, e.g. "24h" or "30d"
+SUMMARY_RANGE_PATTERN = re.compile(r"^(\d+)([hd])$")
+
+# Most buckets one summary may return, per granularity
+MAX_SUMMARY_BUCKETS = {"day": 366, "hour": 24 * 31}
 
 
 def is_valid_email(email: str) -> bool:
     """Validates an email address format."""
     return re.match(r"[^@]+@[^@]+\.[^@]+", email) is not None
+
+
+def parse_summary_params(summary_range: str, granularity: str, tz: str) -> int:
+    """Validates issue summary parameters and returns the number of buckets.
+
+    Raises ValueError with a client-facing message for invalid parameters.
+    """
+    if granularity not in MAX_SUMMARY_BUCKETS:
+        raise ValueError("Invalid granularity.")
+
+    match = SUMMARY_RANGE_PATTERN.match(summary_range)
+    hours = 0
+    if match:
+        hours = int(match.group(1)) * (24 if match.group(2) == "d" else 1)
+    hours_per_bucket = 24 if granularity == "day" else 1
+    buckets = hours // hours_per_bucket
+
+    if hours % hours_per_bucket or not 1 <= buckets <= MAX_SUMMARY_BUCKETS[granularity]:
+        raise ValueError("Invalid range.")
+
+    try:
+        ZoneInfo(tz)
+    except (ValueError, ZoneInfoNotFoundError):
+        raise ValueError("Invalid time zone.")
+
+    return buckets
@@ -0,0 +1,398 @@
+"""End-to-end HTTP load test for the Flytrap API.
+
+Drives the API over localhost with a weighted mix of real routes (login, issue
+list, error detail, issue summary and webhook) from many concurrent clients, and
+reports throughput and p50/p95/p99 latency per route. Clients are gevent greenlets,
+so one process can keep hundreds of requests in flight.
+
+The API must be backed by a database with at least one project that has errors;
+the load test logs in as a root user, picks the project with the most issues and
+collects error UUIDs for the detail route. With `--serve` it starts its own
+gunicorn server with the production worker class (one worker by default), so the
+numbers describe what a single worker sustains.
+
+Results are written as JSON. Pass a previous result as `--baseline` to compare
+against it; the exit status is 1 when a route's throughput drops, or its p95
+latency grows, by more than `--tolerance`.
+
+    python benchmarks/load_test.py --serve --duration 30 --concurrency 50 \\
+        --output results/load-test.json
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from typing import Callable, Dict, List, Optional, Tuple  # noqa: E402
+import gevent  # noqa: E402
+import requests  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER_CLASS = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+
+DEFAULT_MIX = "login=1,issues=10,detail=6,summary=4,webhook=2"
+
+PERCENTILES = (50, 95, 99)
+
+# Issue list pages (of 100) searched for errors to request details of
+MAX_DISCOVERY_PAGES = 50
+
+
+class Target:
+    """Discovered state the routes need: base URL, token, project and errors."""
+
+    def __init__(self, url: str, email: str, password: str) -> None:
+        self.url = url.rstrip("/")
+        self.email = email
+        self.password = password
+        self.token: Optional[str] = None
+        self.project_uuid: Optional[str] = None
+        self.error_uuids: List[str] = []
+
+    def login(self, session: requests.Session) -> requests.Response:
+        response = session.post(
+            f"{self.url}/api/auth/login",
+            json={"email": self.email, "password": self.password},
+        )
+        if response.status_code == 200:
+            self.token = response.json()["payload"]["access_token"]
+        return response
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def discover(self, session: requests.Session, project_uuid: Optional[str]) -> None:
+        """Logs in and picks the project and errors the routes are called with."""
+        response = self.login(session)
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed with status {response.status_code}.")
+
+        if project_uuid is None:
+            response = session.get(f"{self.url}/api/projects", headers=self.headers())
+            response.raise_for_status()
+            projects = response.json()["payload"]["projects"]
+            if not projects:
+                raise SystemExit("No projects found; seed the database first.")
+            project_uuid = max(projects, key=lambda p: p["issue_count"])["uuid"]
+        self.project_uuid = project_uuid
+
+        for page in range(1, MAX_DISCOVERY_PAGES + 1):
+            response = session.get(
+                f"{self.url}/api/projects/{project_uuid}/issues",
+                params={"page": page, "limit": 100, "count": "none"},
+                headers=self.headers(),
+            )
+            response.raise_for_status()
+            issues = response.json()["payload"]["issues"]
+            self.error_uuids += [issue["uuid"] for issue in issues if "name" in issue]
+            if len(issues) < 100 or len(self.error_uuids) >= 500:
+                break
+
+        if not self.error_uuids:
+            raise SystemExit(f"Project {project_uuid} has no errors to request.")
+
+
+def _login(target: Target, session: requests.Session, rng: random.Random):
+    return session.post(
+        f"{target.url}/api/auth/login",
+        json={"email": target.email, "password": target.password},
+    )
+
+
+def _issues(target: Target, session: requests.Session, rng: random.Random):
+    return session.get(
+        f"{target.url}/api/projects/{target.project_uuid}/issues",
+        params={"page": rng.randint(1, 3), "limit": 10},
+        headers=target.headers(),
+    )
+
+
+def _detail(target: Target, session: requests.Session, rng: random.Random):
+    error_uuid = rng.choice(target.error_uuids)
+    return session.get(
+        f"{target.url}/api/projects/{target.project_uuid}/issues/errors/{error_uuid}",
+        headers=target.headers(),
+    )
+
+
+def _summary(target: Target, session: requests.Session, rng: random.Random):
+    return session.get(
+        f"{target.url}/api/projects/{target.project_uuid}/issues/summary",
+        headers=target.headers(),
+    )
+
+
+def _webhook(target: Target, session: requests.Session, rng: random.Random):
+    return session.post(
+        f"{target.url}/api/notifications/webhook",
+        json={"project_id": target.project_uuid},
+    )
+
+
+ROUTES: Dict[str, Callable] = {
+    "login": _login,
+    "issues": _issues,
+    "detail": _detail,
+    "summary": _summary,
+    "webhook": _webhook,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parses `route=weight,...` into route weights."""
+    weights = {}
+    for item in mix.split(","):
+        route, _, weight = item.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown route '{route}'; choose from {', '.join(ROUTES)}."
+            )
+        weights[route] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict:
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / seconds, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0,
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(latencies, pct) * 1000, 2)
+    return summary
+
+
+def run_load(
+    target: Target,
+    weights: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """Runs the clients and returns latencies and error counts per route.
+
+    Requests that start during the warmup are not recorded. Each client keeps one
+    connection open and sends its next request as soon as the previous one returns
+    (a closed loop), so throughput is what the server sustains at `concurrency`.
+    """
+    routes = list(weights)
+    route_weights = [weights[route] for route in routes]
+    latencies: Dict[str, List[float]] = {route: [] for route in routes}
+    errors: Dict[str, int] = {route: 0 for route in routes}
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    def client(index: int) -> None:
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        while True:
+            route = rng.choices(routes, route_weights)[0]
+            began = time.perf_counter()
+            if began >= deadline:
+                break
+            try:
+                response = ROUTES[route](target, session, rng)
+                if response.status_code == 401 and route != "login":
+                    target.login(session)
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+            if began >= measure_from:
+                latencies[route].append(time.perf_counter() - began)
+                errors[route] += failed
+
+    gevent.joinall([gevent.spawn(client, i) for i in range(concurrency)])
+    return latencies, errors, duration
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Lists the routes that regressed against a baseline result."""
+    regressions = []
+    for route, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if not previous:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{route}: throughput {current['throughput_rps']} rps "
+                f"< {previous['throughput_rps']} rps"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{route}: p95 {current['p95_ms']} ms > {previous['p95_ms']} ms"
+            )
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(port: int, workers: int, log_path: str) -> subprocess.Popen:
+    """Starts gunicorn on localhost and waits until it answers.
+
+    The server's output goes to `log_path`, since the app logs every request.
+    """
+    log = open(log_path, "w")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-w",
+            str(workers),
+            "-k",
+            WORKER_CLASS,
+            "-b",
+            f"127.0.0.1:{port}",
+            "--log-level",
+            "warning",
+            "flytrap:app",
+        ],
+        cwd=REPO_ROOT,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    log.close()
+    for _ in range(100):
+        if server.poll() is not None:
+            raise SystemExit(f"The server exited during startup; see {log_path}.")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/api/auth/refresh", timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.1)
+
+    server.terminate()
+    raise SystemExit("The server did not start within 10 seconds.")
+
+
+def print_report(results: Dict) -> None:
+    header = f"{'route':<10}{'requests':>10}{'errors':>8}{'rps':>10}"
+    header += "".join(f"{f'p{pct} ms':>10}" for pct in PERCENTILES)
+    print(header)
+    rows = [*results["routes"].items(), ("total", results["total"])]
+    for route, stats in rows:
+        line = (
+            f"{route:<10}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['throughput_rps']:>10}"
+        )
+        line += "".join(f"{stats[f'p{pct}_ms']:>10}" for pct in PERCENTILES)
+        print(line)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="start gunicorn")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--server-log", default="load-test-server.log")
+    parser.add_argument("--email", default="admin@admin.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--project", help="project UUID (default: most issues)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with this JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    url = f"http://127.0.0.1:{args.port}" if args.serve else args.url
+    server = (
+        start_server(args.port, args.workers, args.server_log) if args.serve else None
+    )
+
+    try:
+        target = Target(url, args.email, args.password)
+        target.discover(requests.Session(), args.project)
+        latencies, errors, seconds = run_load(
+            target, args.mix, args.concurrency, args.duration, args.warmup, args.seed
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "url": url,
+            "workers": args.workers if args.serve else None,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "project_uuid": target.project_uuid,
+        },
+        "routes": {
+            route: summarize(latencies[route], errors[route], seconds)
+            for route in args.mix
+        },
+        "total": summarize(
+            [latency for values in latencies.values() for latency in values],
+            sum(errors.values()),
+            seconds,
+        ),
+    }
+    print_report(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""Model layer micro-benchmarks.
+
+Seeds a local Postgres database with growing volumes of issues and times the model
+functions the API leans on at each size, to show which queries grow with the data
+and which grow faster than it.
+
+The database named by `--database` is wiped and rebuilt from `tests/schema.sql`.
+Projects, users and assignments are inserted with the test setup helpers. Issues
+are then added in steps up to each size in `--sizes`, spread evenly over the
+projects and over the last `--days` days. Row-at-a-time inserts could not reach
+millions of rows in reasonable time, so issues are generated server-side with
+`INSERT ... SELECT generate_series(...)` in batches; every trigger still runs, so
+the aggregate tables match what the API would have built. That trigger and index
+work bounds seeding to a few thousand issues per second, so the full ladder up to
+10M issues takes around an hour.
+
+After each step the tables are analyzed and every function is timed `--repeat`
+times against the first project. The report lists the median time per size and
+the growth exponent k of time ~ rows^k from a log-log fit: around 0 means the
+query does not depend on the data volume, around 1 means linear growth, and
+functions above `SUPER_LINEAR` are flagged.
+
+    python benchmarks/model_benchmarks.py --sizes 10000,100000,1000000,10000000 \\
+        --output results/model-benchmarks.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from app import create_app  # noqa: E402
+from app.models import (  # noqa: E402
+    fetch_error,
+    fetch_issues_by_project,
+    fetch_most_recent_log,
+    fetch_projects,
+    fetch_projects_for_user,
+    get_issue_summary,
+)
+from app.utils.partitions import (  # noqa: E402
+    create_partition,
+    next_period_start,
+    period_start,
+)
+from config import load_config  # noqa: E402
+from db import (  # noqa: E402
+    get_db_connection_from_pool,
+    init_db_pool,
+    return_db_connection_to_pool,
+)
+from tests.utils.test_setup_helpers import (  # noqa: E402
+    assign_user_to_project,
+    insert_project,
+    insert_user,
+    setup_schema,
+)
+
+DEFAULT_SIZES = "10000,100000,1000000,10000000"
+
+# Share of generated issues that are rejections
+REJECTION_SHARE = 0.2
+
+INSERT_BATCH = 100_000
+
+# Growth exponents above this are reported as super-linear
+SUPER_LINEAR = 1.1
+
+ERROR_GROUPS = 500
+STACK_TRACES = 50
+
+# Issue `i` belongs to project `1 + i % projects`; ids restart with the schema
+INSERT_ERRORS = """
+INSERT INTO error_logs (
+    uuid, name, message, created_at, filename, line_number, col_number,
+    project_id, stack_trace, handled, resolved, contexts, method, path, ip, os,
+    browser, runtime, error_hash
+)
+SELECT
+    md5('error-' || i),
+    'Error' || (i %% %(groups)s %% 20),
+    'Message ' || (i %% %(groups)s),
+    %(now)s - ((i * 7919) %% %(span)s) * interval '1 second',
+    'file' || (i %% 50) || '.js',
+    i %% 500,
+    i %% 80,
+    1 + i %% %(projects)s,
+    E'Error\\n    at handler' || (i %% %(traces)s) || ' (app.js:1:1)',
+    i %% 3 = 0,
+    i %% 10 = 0,
+    jsonb_build_object('user', jsonb_build_object('id', i %% 1000)),
+    (ARRAY['GET', 'POST', 'PUT'])[1 + i %% 3],
+    '/path/' || (i %% 100),
+    (i %% 10000)::text,
+    (ARRAY['macOS', 'Windows', 'Linux'])[1 + i %% 3],
+    (ARRAY['Chrome', 'Firefox', 'Safari'])[1 + i %% 3],
+    'Node.js 20',
+    md5('group-' || (i %% %(groups)s))
+FROM generate_series(%(start)s::bigint, %(stop)s - 1) AS i
+"""
+
+INSERT_REJECTIONS = """
+INSERT INTO rejection_logs (
+    uuid, value, created_at, project_id, handled, resolved, method, path, ip, os,
+    browser, runtime
+)
+SELECT
+    md5('rejection-' || i),
+    'Rejection ' || (i %% 100),
+    %(now)s - ((i * 7907) %% %(span)s) * interval '1 second',
+    1 + i %% %(projects)s,
+    i %% 2 = 0,
+    i %% 10 = 0,
+    'GET',
+    '/path/' || (i %% 100),
+    (i %% 10000)::text,
+    'macOS',
+    'Chrome',
+    'Node.js 20'
+FROM generate_series(%(start)s::bigint, %(stop)s - 1) AS i
+"""
+
+
+def reset_database(cursor) -> None:
+    cursor.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+    setup_schema(cursor)
+
+
+def create_monthly_partitions(cursor, oldest: datetime, now: datetime) -> None:
+    """Creates a partition per month from `oldest` through next month."""
+    for table in ("error_logs", "rejection_logs"):
+        lower = period_start(oldest, "month")
+        horizon = next_period_start(next_period_start(now, "month"), "month")
+        while lower < horizon:
+            upper = next_period_start(lower, "month")
+            create_partition(cursor, table, lower, upper)
+            lower = upper
+
+
+def seed_accounts(cursor, projects: int, users: int) -> None:
+    """Inserts projects and users, assigning every user to every project."""
+    for p in range(1, projects + 1):
+        insert_project(
+            cursor,
+            {
+                "uuid": f"bench-project-{p}",
+                "name": f"Project {p:04d}",
+                "api_key": f"bench-api-key-{p}",
+                "platform": "React",
+                "sns_topic_arn": f"arn:aws:sns:us-east-1:123456789012:bench-{p}",
+            },
+        )
+    for u in range(1, users + 1):
+        insert_user(
+            cursor,
+            {
+                "uuid": f"bench-user-{u}",
+                "first_name": "Bench",
+                "last_name": f"User {u}",
+                "email": f"bench-{u}@example.com",
+                "password_hash": "unused",
+                "is_root": False,
+            },
+        )
+        for p in range(1, projects + 1):
+            assign_user_to_project(cursor, f"bench-user-{u}", f"bench-project-{p}")
+
+
+def grow_issues(
+    cursor, start: int, stop: int, projects: int, now: datetime, days: int
+) -> None:
+    """Adds issues `start` through `stop - 1`, errors and rejections alike."""
+    span = days * 86400
+    for query, share in (
+        (INSERT_ERRORS, 1 - REJECTION_SHARE),
+        (INSERT_REJECTIONS, REJECTION_SHARE),
+    ):
+        first, last = int(start * share), int(stop * share)
+        for batch_start in range(first, last, INSERT_BATCH):
+            cursor.execute(
+                query,
+                {
+                    "start": batch_start,
+                    "stop": min(batch_start + INSERT_BATCH, last),
+                    "projects": projects,
+                    "now": now,
+                    "span": span,
+                    "groups": ERROR_GROUPS,
+                    "traces": STACK_TRACES,
+                },
+            )
+
+    cursor.execute("VACUUM ANALYZE")
+
+
+def benchmarks(
+    size: int, projects: int, rng: random.Random
+) -> Dict[str, Callable[[], object]]:
+    """The timed calls, all against the first project and user."""
+    project_uuid = "bench-project-1"
+    errors = int(size * (1 - REJECTION_SHARE))
+    # Errors of the first project are those with i % projects == 0
+    project_errors = range(0, errors, projects)
+
+    def error_uuid() -> str:
+        i = rng.choice(project_errors)
+        return hashlib.md5(f"error-{i}".encode()).hexdigest()
+
+    return {
+        "fetch_issues_by_project": lambda: fetch_issues_by_project(
+            project_uuid, 1, 10, None, None, None
+        ),
+        "fetch_error": lambda: fetch_error(project_uuid, error_uuid()),
+        "get_issue_summary": lambda: get_issue_summary(project_uuid),
+        "fetch_projects": lambda: fetch_projects(1, 10),
+        "fetch_projects_for_user": lambda: fetch_projects_for_user(
+            "bench-user-1", 1, 10
+        ),
+        "fetch_most_recent_log": lambda: fetch_most_recent_log(project_uuid),
+    }
+
+
+def time_call(func: Callable[[], object], repeat: int, warmup: int) -> Dict:
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - began) * 1000)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "min_ms": round(timings[0], 3),
+    }
+
+
+def growth_exponent(sizes: List[int], medians: List[float]) -> Optional[float]:
+    """Slope of the least-squares fit of log(time) against log(rows)."""
+    if len(sizes) < 2:
+        return None
+
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(median, 1e-3)) for median in medians]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum(
+        (x - mean_x) ** 2 for x in xs
+    )
+    return round(slope, 2)
+
+
+def print_report(results: Dict) -> None:
+    sizes = results["sizes"]
+    header = f"{'function':<26}" + "".join(f"{f'{size:,}':>13}" for size in sizes)
+    print(f"\nMedian milliseconds per call\n{header}{'growth':>9}")
+    for name, stats in results["functions"].items():
+        line = f"{name:<26}"
+        line += "".join(
+            f"{stats['sizes'][str(size)]['median_ms']:>13.2f}" for size in sizes
+        )
+        growth = stats["growth"]
+        line += f"{'-' if growth is None else growth:>9}"
+        if growth is not None and growth > SUPER_LINEAR:
+            line += "  super-linear"
+        print(line)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--database",
+        default="flytrap_bench_db",
+        help="database to wipe and seed (connection settings come from PG*)",
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="total issue counts")
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90, help="issue age spread")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    rng = random.Random(args.seed)
+
+    # setup_schema reads tests/schema.sql relative to the repository root
+    os.chdir(REPO_ROOT)
+    app = create_app()
+    load_config(app, {"FLASK_ENV": "testing", "PGDATABASE": args.database})
+    init_db_pool(app)
+
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "database": args.database,
+            "projects": args.projects,
+            "users": args.users,
+            "days": args.days,
+            "repeat": args.repeat,
+        },
+        "sizes": sizes,
+        "seconds_to_seed": {},
+        "functions": {},
+    }
+
+    with app.app_context():
+        app.logger.disabled = True
+        connection = get_db_connection_from_pool()
+        connection.autocommit = True
+        cursor = connection.cursor()
+        now = datetime.now(timezone.utc)
+        try:
+            reset_database(cursor)
+            create_monthly_partitions(cursor, now - timedelta(days=args.days), now)
+            seed_accounts(cursor, args.projects, args.users)
+
+            seeded = 0
+            for size in sizes:
+                began = time.perf_counter()
+                grow_issues(cursor, seeded, size, args.projects, now, args.days)
+                seeded = size
+                seconds = round(time.perf_counter() - began, 1)
+                results["seconds_to_seed"][str(size)] = seconds
+                print(f"Seeded {size:,} issues ({seconds}s)", flush=True)
+
+                for name, func in benchmarks(size, args.projects, rng).items():
+                    stats = results["functions"].setdefault(name, {"sizes": {}})
+                    stats["sizes"][str(size)] = time_call(
+                        func, args.repeat, args.warmup
+                    )
+        finally:
+            cursor.close()
+            return_db_connection_to_pool(connection)
+
+    for stats in results["functions"].values():
+        stats["growth"] = growth_exponent(
+            sizes, [stats["sizes"][str(size)]["median_ms"] for size in sizes]
+        )
+
+    print_report(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
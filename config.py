@@ -36,6 +36,25 @@ def load_config(app, overrides=None):
     app.config["HTTPONLY"] = os.getenv("HTTPONLY") == "True"
     app.config["SECURE"] = os.getenv("SECURE") == "True"
     app.config["SAMESITE"] = os.getenv("SAMESITE")
+    app.config["ISSUE_PARTITION_INTERVAL"] = os.getenv(
+        "ISSUE_PARTITION_INTERVAL", "month"
+    )
+    app.config["ISSUE_PARTITION_PREMAKE"] = int(
+        os.getenv("ISSUE_PARTITION_PREMAKE", "3")
+    )
+    retention_days = os.getenv("ISSUE_RETENTION_DAYS")
+    app.config["ISSUE_RETENTION_DAYS"] = int(retention_days) if retention_days else None
+    app.config["PURGE_BATCH_SIZE"] = int(os.getenv("PURGE_BATCH_SIZE", "5000"))
+    app.config["PURGE_PAUSE_SECONDS"] = float(os.getenv("PURGE_PAUSE_SECONDS", "0.1"))
+    app.config["PURGE_STALE_SECONDS"] = float(os.getenv("PURGE_STALE_SECONDS", "600"))
+    app.config["EXPORT_ITERSIZE"] = int(os.getenv("EXPORT_ITERSIZE", "2000"))
+    app.config["ARCHIVE_DIR"] = overrides.get("ARCHIVE_DIR", os.getenv("ARCHIVE_DIR"))
+    archive_after_days = os.getenv("ARCHIVE_AFTER_DAYS")
+    app.config["ARCHIVE_AFTER_DAYS"] = (
+        int(archive_after_days) if archive_after_days else None
+    )
+    app.config["ARCHIVE_BATCH_SIZE"] = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+    app.config["INGEST_MAX_BATCH"] = int(os.getenv("INGEST_MAX_BATCH", "1000"))
 
     # Load production specific secrets
     if environment == "production":
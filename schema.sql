@@ -1,23 +1,37 @@
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS purge_jobs;
+DROP TABLE IF EXISTS issue_facets;
+DROP TABLE IF EXISTS project_latest_issues;
+DROP TABLE IF EXISTS issue_rollups;
+DROP TABLE IF EXISTS project_issue_counters;
+DROP TABLE IF EXISTS error_group_hourly_sketches;
+DROP TABLE IF EXISTS error_groups;
 DROP TABLE IF EXISTS error_logs;
+DROP TABLE IF EXISTS stack_traces;
 DROP TABLE IF EXISTS rejection_logs;
 DROP TABLE IF EXISTS projects_users;
 DROP TABLE IF EXISTS projects;
 DROP TABLE IF EXISTS users;
 
+-- Trigram indexes for substring and fuzzy filters on the log tables
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE projects (
   id SERIAL PRIMARY KEY,
   uuid VARCHAR(36) NOT NULL UNIQUE,
   name VARCHAR(255) NOT NULL,
   api_key VARCHAR(36) NOT NULL UNIQUE,
   platform VARCHAR(255) NOT NULL,
-  sns_topic_arn VARCHAR(255) NOT NULL
+  sns_topic_arn VARCHAR(255) NOT NULL,
+  retention_days INT
 );
 
-CREATE INDEX idx_project_uuid ON projects(uuid);
-
+-- The log tables are range partitioned by created_at. Partitions are created
+-- and dropped by the partition manager (`flask db partitions`); rows outside
+-- every range land in the default partition.
 CREATE TABLE error_logs (
-    id SERIAL PRIMARY KEY,
-    uuid VARCHAR(36) NOT NULL UNIQUE,
+    id SERIAL,
+    uuid VARCHAR(36) NOT NULL,
     name VARCHAR(255) NOT NULL,
     message TEXT NOT NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -25,6 +39,7 @@ CREATE TABLE error_logs (
     line_number INT,
     col_number INT,
     project_id INT REFERENCES projects(id) ON DELETE CASCADE,
+    -- Moved to stack_traces on write; see stack_trace_digest
     stack_trace TEXT,
     handled BOOLEAN NOT NULL,
     resolved BOOLEAN NOT NULL DEFAULT FALSE,
@@ -35,14 +50,20 @@ CREATE TABLE error_logs (
     os VARCHAR(255),
     browser VARCHAR(255),
     runtime VARCHAR(255),
-    error_hash VARCHAR(64)
-);
+    error_hash VARCHAR(64),
+    -- Full-text search document, set by the error_logs_before_write trigger
+    -- because it covers the stack trace
+    search_vector tsvector,
+    stack_trace_digest BYTEA,
+    PRIMARY KEY (id, created_at),
+    UNIQUE (uuid, created_at)
+) PARTITION BY RANGE (created_at);
 
-CREATE INDEX idx_error_log_uuid ON error_logs(uuid); 
+CREATE TABLE error_logs_default PARTITION OF error_logs DEFAULT;
 
 CREATE TABLE rejection_logs (
-  id SERIAL PRIMARY KEY,
-  uuid VARCHAR(36) NOT NULL UNIQUE,
+  id SERIAL,
+  uuid VARCHAR(36) NOT NULL,
   value TEXT NOT NULL,
   created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
   project_id INT REFERENCES projects(id) ON DELETE CASCADE,
@@ -53,10 +74,15 @@ CREATE TABLE rejection_logs (
   ip VARCHAR(64),
   os VARCHAR(255),
   browser VARCHAR(255),
-  runtime VARCHAR(255)
-);
+  runtime VARCHAR(255),
+  search_vector tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple', left(value, 65536))
+  ) STORED,
+  PRIMARY KEY (id, created_at),
+  UNIQUE (uuid, created_at)
+) PARTITION BY RANGE (created_at);
 
-CREATE INDEX idx_rejection_log_uuid ON rejection_logs(uuid);
+CREATE TABLE rejection_logs_default PARTITION OF rejection_logs DEFAULT;
 
 CREATE TABLE users (
     id SERIAL PRIMARY KEY,
@@ -69,8 +95,6 @@ CREATE TABLE users (
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_user_uuid ON users(uuid); 
-
 CREATE TABLE projects_users (
   id SERIAL PRIMARY KEY,
   project_id INT REFERENCES projects(id) ON DELETE CASCADE,
@@ -79,6 +103,697 @@ CREATE TABLE projects_users (
   UNIQUE (project_id, user_id)
 );
 
+CREATE INDEX idx_projects_users_user ON projects_users(user_id, project_id);
+
+-- Background purges of a project's issues (scope 'issues') or of the whole
+-- project (scope 'project'). Rows outlive the project so progress stays visible.
+CREATE TABLE purge_jobs (
+  id SERIAL PRIMARY KEY,
+  uuid VARCHAR(36) NOT NULL UNIQUE,
+  project_uuid VARCHAR(36) NOT NULL,
+  scope VARCHAR(16) NOT NULL,
+  status VARCHAR(16) NOT NULL DEFAULT 'pending',
+  rows_deleted BIGINT NOT NULL DEFAULT 0,
+  error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  completed_at TIMESTAMPTZ
+);
+
+-- At most one active job per project and scope
+CREATE UNIQUE INDEX idx_purge_jobs_active ON purge_jobs(project_uuid, scope)
+  WHERE status IN ('pending', 'running');
+
+CREATE TABLE schema_migrations (
+  version INT PRIMARY KEY,
+  name VARCHAR(255) NOT NULL,
+  applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- This file always describes the latest schema, so every migration in
+-- app/migrations/versions is recorded as applied.
+INSERT INTO schema_migrations (version, name) VALUES
+  (1, 'hot_path_indexes'),
+  (2, 'issue_aggregates'),
+  (3, 'partition_issue_logs'),
+  (4, 'purge_jobs'),
+  (5, 'project_latest_issues'),
+  (6, 'issue_search'),
+  (7, 'issue_trigram_indexes'),
+  (8, 'error_context_index'),
+  (9, 'issue_facets'),
+  (10, 'stack_traces');
+
+-- HyperLogLog sketches with 2^10 one-byte registers. The hashing must stay in
+-- sync with app/utils/hll.py, which merges and estimates the stored sketches.
+CREATE OR REPLACE FUNCTION hll_empty() RETURNS bytea AS $$
+  SELECT decode(repeat('00', 1024), 'hex');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION hll_register(value text) RETURNS int AS $$
+  SELECT substring(('x' || substr(md5(value), 1, 16))::bit(64) FROM 1 FOR 10)::int;
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION hll_rank(value text) RETURNS int AS $$
+  SELECT COALESCE(
+    NULLIF(
+      position(B'1' IN substring(('x' || substr(md5(value), 1, 16))::bit(64) FROM 11)),
+      0
+    ),
+    55
+  );
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION hll_set_registers(
+  sketch bytea, registers int[], ranks int[]
+) RETURNS bytea AS $$
+DECLARE
+  result bytea := COALESCE(sketch, hll_empty());
+BEGIN
+  FOR i IN 1 .. COALESCE(array_length(registers, 1), 0) LOOP
+    IF get_byte(result, registers[i]) < ranks[i] THEN
+      result := set_byte(result, registers[i], ranks[i]);
+    END IF;
+  END LOOP;
+
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION hour_bucket(ts timestamptz) RETURNS timestamptz AS $$
+  SELECT date_trunc('hour', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX idx_error_log_project_hash_ip
+  ON error_logs(project_id, error_hash, created_at DESC) INCLUDE (ip);
+
+CREATE TABLE error_groups (
+  project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  error_hash VARCHAR(64) NOT NULL,
+  first_seen TIMESTAMPTZ NOT NULL,
+  last_seen TIMESTAMPTZ NOT NULL,
+  occurrences BIGINT NOT NULL DEFAULT 0,
+  unresolved_occurrences BIGINT NOT NULL DEFAULT 0,
+  resolved BOOLEAN GENERATED ALWAYS AS (unresolved_occurrences = 0) STORED,
+  -- The newest occurrence, so (representative_uuid, last_seen) is its key
+  representative_uuid VARCHAR(36) NOT NULL,
+  ip_sketch BYTEA NOT NULL DEFAULT hll_empty(),
+  PRIMARY KEY (project_id, error_hash)
+);
+
+CREATE INDEX idx_error_group_last_seen
+  ON error_groups(project_id, last_seen DESC, error_hash DESC);
+
+CREATE TABLE error_group_hourly_sketches (
+  project_id INT NOT NULL,
+  error_hash VARCHAR(64) NOT NULL,
+  bucket TIMESTAMPTZ NOT NULL,
+  ip_sketch BYTEA NOT NULL DEFAULT hll_empty(),
+  PRIMARY KEY (project_id, error_hash, bucket),
+  FOREIGN KEY (project_id, error_hash)
+    REFERENCES error_groups(project_id, error_hash) ON DELETE CASCADE
+);
+
+-- error_groups is maintained from error_logs by statement-level triggers, so
+-- rows written by any client (including bulk COPY) are folded in set-wise.
+CREATE OR REPLACE FUNCTION error_groups_after_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO error_groups AS g (
+    project_id, error_hash, first_seen, last_seen, occurrences,
+    unresolved_occurrences, representative_uuid
+  )
+  SELECT
+    project_id,
+    error_hash,
+    MIN(created_at),
+    MAX(created_at),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE NOT resolved),
+    (ARRAY_AGG(uuid ORDER BY created_at DESC, uuid DESC))[1]
+  FROM new_rows
+  WHERE project_id IS NOT NULL AND error_hash IS NOT NULL
+  GROUP BY project_id, error_hash
+  ON CONFLICT (project_id, error_hash) DO UPDATE SET
+    first_seen = LEAST(g.first_seen, EXCLUDED.first_seen),
+    last_seen = GREATEST(g.last_seen, EXCLUDED.last_seen),
+    occurrences = g.occurrences + EXCLUDED.occurrences,
+    unresolved_occurrences =
+      g.unresolved_occurrences + EXCLUDED.unresolved_occurrences,
+    representative_uuid = CASE
+      WHEN EXCLUDED.last_seen >= g.last_seen THEN EXCLUDED.representative_uuid
+      ELSE g.representative_uuid
+    END;
+
+  -- Fold the new IPs into the distinct-user sketches. Only the registers that
+  -- the batch raises are touched.
+  UPDATE error_groups g
+  SET ip_sketch = hll_set_registers(g.ip_sketch, r.registers, r.ranks)
+  FROM (
+    SELECT project_id, error_hash, ARRAY_AGG(register) AS registers,
+      ARRAY_AGG(rank) AS ranks
+    FROM (
+      SELECT project_id, error_hash, hll_register(ip) AS register,
+        MAX(hll_rank(ip)) AS rank
+      FROM new_rows
+      WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+      GROUP BY 1, 2, 3
+    ) per_register
+    GROUP BY 1, 2
+  ) r
+  WHERE g.project_id = r.project_id AND g.error_hash = r.error_hash;
+
+  INSERT INTO error_group_hourly_sketches (project_id, error_hash, bucket)
+  SELECT DISTINCT project_id, error_hash, hour_bucket(created_at)
+  FROM new_rows
+  WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+  ON CONFLICT DO NOTHING;
+
+  UPDATE error_group_hourly_sketches s
+  SET ip_sketch = hll_set_registers(s.ip_sketch, r.registers, r.ranks)
+  FROM (
+    SELECT project_id, error_hash, bucket, ARRAY_AGG(register) AS registers,
+      ARRAY_AGG(rank) AS ranks
+    FROM (
+      SELECT project_id, error_hash, hour_bucket(created_at) AS bucket,
+        hll_register(ip) AS register, MAX(hll_rank(ip)) AS rank
+      FROM new_rows
+      WHERE project_id IS NOT NULL AND error_hash IS NOT NULL AND ip IS NOT NULL
+      GROUP BY 1, 2, 3, 4
+    ) per_register
+    GROUP BY 1, 2, 3
+  ) r
+  WHERE s.project_id = r.project_id
+    AND s.error_hash = r.error_hash
+    AND s.bucket = r.bucket;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION error_groups_after_update() RETURNS trigger AS $$
+BEGIN
+  UPDATE error_groups g
+  SET unresolved_occurrences = g.unresolved_occurrences + d.delta
+  FROM (
+    SELECT
+      n.project_id,
+      n.error_hash,
+      SUM((NOT n.resolved)::int - (NOT o.resolved)::int) AS delta
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE n.resolved IS DISTINCT FROM o.resolved AND n.error_hash IS NOT NULL
+    GROUP BY n.project_id, n.error_hash
+  ) d
+  WHERE g.project_id = d.project_id AND g.error_hash = d.error_hash;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION error_groups_after_delete() RETURNS trigger AS $$
+BEGIN
+  UPDATE error_groups g
+  SET
+    occurrences = g.occurrences - d.occurrences,
+    unresolved_occurrences = g.unresolved_occurrences - d.unresolved_occurrences
+  FROM (
+    SELECT
+      project_id,
+      error_hash,
+      COUNT(*) AS occurrences,
+      COUNT(*) FILTER (WHERE NOT resolved) AS unresolved_occurrences
+    FROM old_rows
+    WHERE project_id IS NOT NULL AND error_hash IS NOT NULL
+    GROUP BY project_id, error_hash
+  ) d
+  WHERE g.project_id = d.project_id AND g.error_hash = d.error_hash;
+
+  DELETE FROM error_groups g
+  USING (SELECT DISTINCT project_id, error_hash FROM old_rows) d
+  WHERE g.project_id = d.project_id
+    AND g.error_hash = d.error_hash
+    AND g.occurrences <= 0;
+
+  -- Groups that lost their newest or oldest row are re-pointed with two index
+  -- probes on (project_id, error_hash, created_at).
+  WITH affected AS (
+    SELECT DISTINCT g.project_id, g.error_hash
+    FROM error_groups g
+    JOIN old_rows o
+      ON o.project_id = g.project_id AND o.error_hash = g.error_hash
+    WHERE o.uuid = g.representative_uuid OR o.created_at <= g.first_seen
+  )
+  UPDATE error_groups g
+  SET
+    representative_uuid = latest.uuid,
+    last_seen = latest.created_at,
+    first_seen = earliest.created_at
+  FROM affected a
+  CROSS JOIN LATERAL (
+    SELECT e.uuid, e.created_at
+    FROM error_logs e
+    WHERE e.project_id = a.project_id AND e.error_hash = a.error_hash
+    ORDER BY e.created_at DESC, e.uuid DESC
+    LIMIT 1
+  ) latest
+  CROSS JOIN LATERAL (
+    SELECT e.created_at
+    FROM error_logs e
+    WHERE e.project_id = a.project_id AND e.error_hash = a.error_hash
+    ORDER BY e.created_at
+    LIMIT 1
+  ) earliest
+  WHERE g.project_id = a.project_id AND g.error_hash = a.error_hash;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER error_groups_insert
+  AFTER INSERT ON error_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION error_groups_after_insert();
+
+CREATE TRIGGER error_groups_update
+  AFTER UPDATE ON error_logs
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION error_groups_after_update();
+
+CREATE TRIGGER error_groups_delete
+  AFTER DELETE ON error_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION error_groups_after_delete();
+
+CREATE INDEX idx_error_log_project_recent
+  ON error_logs(project_id, created_at DESC, uuid DESC) INCLUDE (handled, resolved);
+
+CREATE INDEX idx_rejection_log_project_recent
+  ON rejection_logs(project_id, created_at DESC, uuid DESC)
+  INCLUDE (handled, resolved);
+
+CREATE INDEX idx_error_log_project_state
+  ON error_logs(project_id, handled, resolved, created_at DESC);
+
+CREATE INDEX idx_rejection_log_project_state
+  ON rejection_logs(project_id, handled, resolved, created_at DESC);
+
+CREATE INDEX idx_error_log_search ON error_logs USING GIN (search_vector);
+
+CREATE INDEX idx_rejection_log_search ON rejection_logs USING GIN (search_vector);
+
+CREATE INDEX idx_error_log_filename_trgm
+  ON error_logs USING GIN (filename gin_trgm_ops);
+
+CREATE INDEX idx_error_log_path_trgm ON error_logs USING GIN (path gin_trgm_ops);
+
+CREATE INDEX idx_error_log_name_trgm ON error_logs USING GIN (name gin_trgm_ops);
+
+CREATE INDEX idx_rejection_log_path_trgm
+  ON rejection_logs USING GIN (path gin_trgm_ops);
+
+CREATE INDEX idx_error_log_contexts
+  ON error_logs USING GIN (contexts jsonb_path_ops);
+
+CREATE TABLE project_issue_counters (
+  project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  issue_type VARCHAR(9) NOT NULL,
+  handled BOOLEAN NOT NULL,
+  resolved BOOLEAN NOT NULL,
+  issue_count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (project_id, issue_type, handled, resolved)
+);
+
+CREATE TABLE issue_rollups (
+  project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  bucket TIMESTAMPTZ NOT NULL,
+  issue_type VARCHAR(9) NOT NULL,
+  handled BOOLEAN NOT NULL,
+  resolved BOOLEAN NOT NULL,
+  issue_count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (project_id, bucket, issue_type, handled, resolved)
+);
+
+-- Per-project issue counts, in total and per hour, broken down by handled and
+-- resolved state. TG_ARGV[0] names the issue type ('error' or 'rejection').
+CREATE OR REPLACE FUNCTION issue_counts_after_change() RETURNS trigger AS $$
+DECLARE
+  project_ids int[];
+  buckets timestamptz[];
+  handled_values boolean[];
+  resolved_values boolean[];
+  deltas bigint[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+      ARRAY_AGG(resolved), ARRAY_AGG(delta)
+    INTO project_ids, buckets, handled_values, resolved_values, deltas
+    FROM (
+      SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+        COUNT(*) AS delta
+      FROM new_rows
+      GROUP BY 1, 2, 3, 4
+    ) d;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+      ARRAY_AGG(resolved), ARRAY_AGG(delta)
+    INTO project_ids, buckets, handled_values, resolved_values, deltas
+    FROM (
+      SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+        -COUNT(*) AS delta
+      FROM old_rows
+      GROUP BY 1, 2, 3, 4
+    ) d;
+  ELSE
+    SELECT ARRAY_AGG(project_id), ARRAY_AGG(bucket), ARRAY_AGG(handled),
+      ARRAY_AGG(resolved), ARRAY_AGG(delta)
+    INTO project_ids, buckets, handled_values, resolved_values, deltas
+    FROM (
+      SELECT project_id, bucket, handled, resolved, SUM(delta) AS delta
+      FROM (
+        SELECT project_id, hour_bucket(created_at) AS bucket, handled, resolved,
+          1 AS delta
+        FROM new_rows
+        UNION ALL
+        SELECT project_id, hour_bucket(created_at), handled, resolved, -1
+        FROM old_rows
+      ) changes
+      GROUP BY 1, 2, 3, 4
+      HAVING SUM(delta) <> 0
+    ) d;
+  END IF;
+
+  -- Rows removed along with their project have nothing left to count against.
+  INSERT INTO project_issue_counters AS c (
+    project_id, issue_type, handled, resolved, issue_count
+  )
+  SELECT d.project_id, TG_ARGV[0], d.handled, d.resolved, SUM(d.delta)
+  FROM unnest(project_ids, handled_values, resolved_values, deltas)
+    AS d(project_id, handled, resolved, delta)
+  JOIN projects p ON p.id = d.project_id
+  GROUP BY 1, 2, 3, 4
+  ORDER BY 1, 2, 3, 4
+  ON CONFLICT (project_id, issue_type, handled, resolved) DO UPDATE SET
+    issue_count = c.issue_count + EXCLUDED.issue_count;
+
+  INSERT INTO issue_rollups AS r (
+    project_id, bucket, issue_type, handled, resolved, issue_count
+  )
+  SELECT d.project_id, d.bucket, TG_ARGV[0], d.handled, d.resolved, d.delta
+  FROM unnest(project_ids, buckets, handled_values, resolved_values, deltas)
+    AS d(project_id, bucket, handled, resolved, delta)
+  JOIN projects p ON p.id = d.project_id
+  ORDER BY 1, 2, 3, 4, 5
+  ON CONFLICT (project_id, bucket, issue_type, handled, resolved) DO UPDATE SET
+    issue_count = r.issue_count + EXCLUDED.issue_count;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER error_counts_insert
+  AFTER INSERT ON error_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('error');
+
+CREATE TRIGGER error_counts_update
+  AFTER UPDATE ON error_logs
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('error');
+
+CREATE TRIGGER error_counts_delete
+  AFTER DELETE ON error_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('error');
+
+CREATE TRIGGER rejection_counts_insert
+  AFTER INSERT ON rejection_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('rejection');
+
+CREATE TRIGGER rejection_counts_update
+  AFTER UPDATE ON rejection_logs
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('rejection');
+
+CREATE TRIGGER rejection_counts_delete
+  AFTER DELETE ON rejection_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_counts_after_change('rejection');
+
+-- Pointer to each project's most recent issue, maintained at ingest so the
+-- latest issue is one primary-key read. (issue_uuid, last_seen) is the log
+-- table's unique key, so the issue row itself is one index lookup away.
+CREATE TABLE project_latest_issues (
+  project_id INT PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+  issue_uuid VARCHAR(36) NOT NULL,
+  issue_type VARCHAR(9) NOT NULL,
+  last_seen TIMESTAMPTZ NOT NULL
+);
+
+-- Re-points the given projects at their most recent remaining issue.
+CREATE OR REPLACE FUNCTION refresh_latest_issues(project_ids int[])
+RETURNS void AS $$
+  DELETE FROM project_latest_issues WHERE project_id = ANY(project_ids);
+
+  INSERT INTO project_latest_issues AS l (
+    project_id, issue_uuid, issue_type, last_seen
+  )
+  SELECT p.id, i.uuid, i.issue_type, i.created_at
+  FROM projects p
+  CROSS JOIN LATERAL (
+    (
+      SELECT e.uuid, 'error' AS issue_type, e.created_at
+      FROM error_logs e
+      WHERE e.project_id = p.id
+      ORDER BY e.created_at DESC, e.uuid DESC
+      LIMIT 1
+    )
+    UNION ALL
+    (
+      SELECT r.uuid, 'rejection', r.created_at
+      FROM rejection_logs r
+      WHERE r.project_id = p.id
+      ORDER BY r.created_at DESC, r.uuid DESC
+      LIMIT 1
+    )
+    ORDER BY created_at DESC, uuid DESC
+    LIMIT 1
+  ) i
+  WHERE p.id = ANY(project_ids)
+  ON CONFLICT (project_id) DO UPDATE
+  SET
+    issue_uuid = EXCLUDED.issue_uuid,
+    issue_type = EXCLUDED.issue_type,
+    last_seen = EXCLUDED.last_seen
+  WHERE (EXCLUDED.last_seen, EXCLUDED.issue_uuid) > (l.last_seen, l.issue_uuid);
+$$ LANGUAGE sql;
+
+-- TG_ARGV[0] names the issue type ('error' or 'rejection').
+CREATE OR REPLACE FUNCTION latest_issues_after_insert() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO project_latest_issues AS l (
+    project_id, issue_uuid, issue_type, last_seen
+  )
+  SELECT DISTINCT ON (n.project_id) n.project_id, n.uuid, TG_ARGV[0], n.created_at
+  FROM new_rows n
+  JOIN projects p ON p.id = n.project_id
+  ORDER BY n.project_id, n.created_at DESC, n.uuid DESC
+  ON CONFLICT (project_id) DO UPDATE
+  SET
+    issue_uuid = EXCLUDED.issue_uuid,
+    issue_type = EXCLUDED.issue_type,
+    last_seen = EXCLUDED.last_seen
+  WHERE (EXCLUDED.last_seen, EXCLUDED.issue_uuid) > (l.last_seen, l.issue_uuid);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION latest_issues_after_delete() RETURNS trigger AS $$
+BEGIN
+  PERFORM refresh_latest_issues(ARRAY(
+    SELECT l.project_id
+    FROM project_latest_issues l
+    JOIN old_rows o
+      ON o.project_id = l.project_id
+      AND o.uuid = l.issue_uuid
+      AND o.created_at = l.last_seen
+    WHERE l.issue_type = TG_ARGV[0]
+  ));
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER error_latest_insert
+  AFTER INSERT ON error_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION latest_issues_after_insert('error');
+
+CREATE TRIGGER error_latest_delete
+  AFTER DELETE ON error_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION latest_issues_after_delete('error');
+
+CREATE TRIGGER rejection_latest_insert
+  AFTER INSERT ON rejection_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION latest_issues_after_insert('rejection');
+
+CREATE TRIGGER rejection_latest_delete
+  AFTER DELETE ON rejection_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION latest_issues_after_delete('rejection');
+-- Hourly value counts of the browser, os, runtime, path and method columns,
+-- per project (error_hash '') and per error group, so breakdowns never scan
+-- the logs. Issues are only inserted and deleted as far as these columns are
+-- concerned; resolving one leaves its facets unchanged.
+CREATE TABLE issue_facets (
+  project_id INT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  error_hash VARCHAR(64) NOT NULL,
+  facet VARCHAR(16) NOT NULL,
+  bucket TIMESTAMPTZ NOT NULL,
+  value TEXT NOT NULL,
+  issue_type VARCHAR(9) NOT NULL,
+  issue_count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (project_id, error_hash, facet, bucket, value, issue_type)
+);
+
+-- TG_ARGV[0] names the issue type; rejections have no error hash and are only
+-- counted per project. Paths are truncated to keep the key small.
+CREATE OR REPLACE FUNCTION issue_facets_after_change() RETURNS trigger AS $$
+BEGIN
+  EXECUTE format(
+    $sql$
+    INSERT INTO issue_facets AS f (
+      project_id, error_hash, facet, bucket, value, issue_type, issue_count
+    )
+    SELECT c.project_id, h.error_hash, v.facet, hour_bucket(c.created_at),
+      v.value, %1$L, %2$s * COUNT(*)
+    FROM %3$I c
+    JOIN projects p ON p.id = c.project_id
+    CROSS JOIN LATERAL (
+      VALUES ('browser', c.browser), ('os', c.os), ('runtime', c.runtime),
+        ('path', left(c.path, 512)), ('method', c.method)
+    ) v(facet, value)
+    CROSS JOIN LATERAL (VALUES (''), (%4$s)) h(error_hash)
+    WHERE v.value IS NOT NULL AND h.error_hash IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5
+    ORDER BY 1, 2, 3, 4, 5
+    ON CONFLICT (project_id, error_hash, facet, bucket, value, issue_type)
+    DO UPDATE SET issue_count = f.issue_count + EXCLUDED.issue_count
+    $sql$,
+    TG_ARGV[0],
+    CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END,
+    CASE TG_OP WHEN 'INSERT' THEN 'new_rows' ELSE 'old_rows' END,
+    CASE TG_ARGV[0] WHEN 'error' THEN 'c.error_hash' ELSE 'NULL' END
+  );
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER error_facets_insert
+  AFTER INSERT ON error_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_facets_after_change('error');
+
+CREATE TRIGGER error_facets_delete
+  AFTER DELETE ON error_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_facets_after_change('error');
+
+CREATE TRIGGER rejection_facets_insert
+  AFTER INSERT ON rejection_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_facets_after_change('rejection');
+
+CREATE TRIGGER rejection_facets_delete
+  AFTER DELETE ON rejection_logs
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION issue_facets_after_change('rejection');
+
+-- Each distinct stack trace is stored once, keyed by its SHA-256 digest, and
+-- referenced from error_logs.stack_trace_digest. Writers keep inserting the full
+-- trace into error_logs.stack_trace; the trigger below moves it here.
+CREATE TABLE stack_traces (
+  digest BYTEA PRIMARY KEY,
+  stack_trace TEXT NOT NULL
+);
+
+-- Serves the partition manager's search for traces no error references
+CREATE INDEX idx_error_log_stack_trace_digest ON error_logs(stack_trace_digest);
+
+-- Long fields are truncated to stay well within the tsvector size limit.
+CREATE OR REPLACE FUNCTION error_search_vector(
+  name text, message text, stack_trace text
+) RETURNS tsvector AS $$
+  SELECT
+    setweight(to_tsvector('simple', name), 'A') ||
+    setweight(to_tsvector('simple', left(message, 65536)), 'B') ||
+    setweight(to_tsvector('simple', left(COALESCE(stack_trace, ''), 65536)), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Stores a trace unless it is already stored and returns its digest. An existing
+-- row is key-share locked, as a foreign key check would, so the partition manager
+-- cannot delete it before the referencing error commits.
+CREATE OR REPLACE FUNCTION store_stack_trace(trace text) RETURNS bytea AS $$
+DECLARE
+  trace_digest bytea := sha256(convert_to(trace, 'UTF8'));
+BEGIN
+  LOOP
+    INSERT INTO stack_traces (digest, stack_trace)
+    VALUES (trace_digest, trace)
+    ON CONFLICT (digest) DO NOTHING;
+    IF FOUND THEN
+      RETURN trace_digest;
+    END IF;
+
+    PERFORM 1 FROM stack_traces WHERE digest = trace_digest FOR KEY SHARE;
+    IF FOUND THEN
+      RETURN trace_digest;
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION error_logs_before_write() RETURNS trigger AS $$
+DECLARE
+  document_changed boolean := TG_OP = 'INSERT';
+BEGIN
+  -- Moving a trace out of the row (as the backfill does) leaves the document as is
+  IF NOT document_changed THEN
+    document_changed := (NEW.name, NEW.message, NEW.stack_trace)
+      IS DISTINCT FROM (OLD.name, OLD.message, OLD.stack_trace);
+  END IF;
+
+  IF NEW.stack_trace IS NOT NULL THEN
+    NEW.stack_trace_digest := store_stack_trace(NEW.stack_trace);
+  END IF;
+
+  IF document_changed THEN
+    NEW.search_vector := error_search_vector(
+      NEW.name,
+      NEW.message,
+      COALESCE(
+        NEW.stack_trace,
+        (
+          SELECT s.stack_trace FROM stack_traces s
+          WHERE s.digest = NEW.stack_trace_digest
+        )
+      )
+    );
+  END IF;
+  NEW.stack_trace := NULL;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER error_logs_before_write
+  BEFORE INSERT OR UPDATE OF name, message, stack_trace ON error_logs
+  FOR EACH ROW EXECUTE FUNCTION error_logs_before_write();
+
 INSERT INTO users (uuid, first_name, last_name, email, password_hash, is_root)
 VALUES (
   'root-uuid-123-456-789',
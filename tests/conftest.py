@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from app import create_app
 from app.utils.auth.token_manager import TokenManager
+from app.utils.partitions import PARTITIONED_TABLES, list_partitions
 from config import load_config
 from db import (
     init_db_pool,
@@ -31,6 +32,26 @@ from tests.utils.mock_data import (
 )
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-plans",
+        action="store_true",
+        default=False,
+        help="Check the query plans of the model layer against a seeded dataset.",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the query plan checks unless --query-plans is given."""
+    if config.getoption("--query-plans"):
+        return
+
+    skip = pytest.mark.skip(reason="needs --query-plans")
+    for item in items:
+        if "query_plans" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture(scope="session")
 def test_app():
     """Set up a Flask app instance configured for testing."""
@@ -85,6 +106,23 @@ def test_db(test_app, setup_test_db):
     return_db_connection_to_pool(connection)
 
 
+@pytest.fixture
+def db_connection(test_app, test_db):
+    """Provide a transactional connection and drop created partitions afterwards."""
+    connection = get_db_connection_from_pool()
+
+    yield connection
+
+    connection.rollback()
+    cursor = connection.cursor()
+    for table in PARTITIONED_TABLES:
+        for partition in list_partitions(cursor, table):
+            cursor.execute(f"DROP TABLE {partition.name}")
+    connection.commit()
+    cursor.close()
+    return_db_connection_to_pool(connection)
+
+
 @pytest.fixture
 def root_user(test_db):
     """Fixture to create and return the root user."""
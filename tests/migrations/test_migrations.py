@@ -0,0 +1,94 @@
+from app.migrations import (
+    load_migrations,
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+from app.migrations.versions import v0002_issue_aggregates
+
+AGGREGATE_QUERIES = [
+    "SELECT * FROM error_groups ORDER BY project_id, error_hash",
+    """
+    SELECT * FROM error_group_hourly_sketches
+    ORDER BY project_id, error_hash, bucket
+    """,
+    """
+    SELECT * FROM project_issue_counters
+    WHERE issue_count <> 0
+    ORDER BY project_id, issue_type, handled, resolved
+    """,
+    """
+    SELECT * FROM issue_rollups
+    WHERE issue_count <> 0
+    ORDER BY project_id, bucket, issue_type, handled, resolved
+    """,
+]
+
+
+def test_schema_records_every_migration(test_db):
+    """Test that schema.sql records every shipped migration as applied."""
+    test_db.execute("SELECT version, name FROM schema_migrations ORDER BY version")
+
+    assert test_db.fetchall() == [
+        (migration.VERSION, migration.NAME) for migration in load_migrations()
+    ]
+
+
+def test_db_status_command(test_app, test_db):
+    """Test listing migrations from the CLI."""
+    runner = test_app.test_cli_runner()
+
+    result = runner.invoke(args=["db", "status"])
+
+    assert result.exit_code == 0
+    assert "0001 hot_path_indexes: applied" in result.output
+    assert "pending" not in result.output
+
+
+def test_db_upgrade_command_up_to_date(test_app, test_db):
+    """Test that upgrading a current schema applies nothing."""
+    runner = test_app.test_cli_runner()
+
+    result = runner.invoke(args=["db", "upgrade"])
+
+    assert result.exit_code == 0
+    assert "Database schema is up to date." in result.output
+
+
+def test_create_index_concurrently_is_idempotent(test_db):
+    """Test that building an existing index again leaves it in place."""
+    for _ in range(2):
+        create_index_concurrently(
+            test_db, "idx_test_error_log_name", "error_logs", "(name)"
+        )
+
+    test_db.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+        ["idx_test_error_log_name"],
+    )
+    assert test_db.fetchone() == (True,)
+
+    drop_index_concurrently(test_db, "idx_test_error_log_name")
+
+    test_db.execute("SELECT to_regclass(%s)", ["idx_test_error_log_name"])
+    assert test_db.fetchone() == (None,)
+
+
+def test_issue_aggregates_migration_backfills(test_db, projects, errors, rejections):
+    """Test that the aggregates migration rebuilds what the triggers maintain."""
+    expected = []
+    for query in AGGREGATE_QUERIES:
+        test_db.execute(query)
+        expected.append(test_db.fetchall())
+
+    test_db.execute(
+        """
+        TRUNCATE error_group_hourly_sketches, error_groups, project_issue_counters,
+          issue_rollups
+        """
+    )
+    v0002_issue_aggregates.upgrade(test_db)
+
+    for query, rows in zip(AGGREGATE_QUERIES, expected):
+        test_db.execute(query)
+        assert test_db.fetchall() == rows
+    assert any(expected)
@@ -0,0 +1,447 @@
+"""Query plan checks for the SQL behind the model layer.
+
+Run with `pytest --query-plans`. The model functions are called against a seeded
+dataset while every statement they execute is recorded, and each recorded query
+is then planned with `EXPLAIN (FORMAT JSON)`. A case fails when a plan scans a
+populated log table sequentially or costs more than the case's budget. Budgets
+are planner cost units for this dataset; raise one only along with the query
+change that justifies it.
+"""
+
+import inspect
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple
+import pytest
+from psycopg2.extensions import cursor as BaseCursor, encodings
+import db
+import app.models
+from app.models import (
+    create_purge_job,
+    delete_error_by_id,
+    delete_issue_batch,
+    delete_rejection_by_id,
+    fetch_dashboard,
+    fetch_error,
+    fetch_error_groups,
+    fetch_issue_facets,
+    fetch_issues_by_project,
+    fetch_most_recent_log,
+    fetch_projects,
+    fetch_projects_for_user,
+    fetch_rejection,
+    get_issue_summary,
+    run_purge_job,
+    search_issues,
+    stream_issues_for_export,
+    update_error_resolved,
+    update_issue_batch_resolved,
+    update_rejection_resolved,
+)
+from app.utils import db_helpers
+from app.utils.partitions import PARTITIONED_TABLES, list_partitions
+from app.utils.synthetic_data import seed_synthetic_data
+from tests.utils.test_setup_helpers import clean_up_database, insert_project
+
+pytestmark = pytest.mark.query_plans
+
+# Dataset the plans are checked against
+PROJECTS = 20
+USERS = 50
+ERRORS = 150_000
+REJECTIONS = 30_000
+DAYS = 60
+
+DEFAULT_COST_BUDGET = 2_500
+
+LOG_TABLE = re.compile(r"\b(error|rejection)_logs\b")
+PLANNABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# Functions that write the log tables with COPY, which has no plan
+UNPLANNED = {"project_issues.insert_issue_batch"}
+
+# Functions that execute SQL but never touch the log tables
+LOG_FREE = {
+    "db_helpers.calculate_total_project_pages",
+    "db_helpers.calculate_total_user_project_pages",
+    "projects.add_project",
+    "projects.update_project_name",
+    "projects.update_project_retention",
+    "projects.get_project_name",
+    "projects.get_topic_arn",
+    "projects.get_all_sns_subscription_arns_for_project",
+    "projects.get_project_by_api_key",
+    "purge_jobs.create_purge_job",
+    "purge_jobs.fetch_purge_job",
+    "purge_jobs._fail_purge_job",
+    "project_users.fetch_project_users",
+    "project_users.add_user_to_project",
+    "project_users.remove_user_from_project",
+    "project_users.save_sns_subscription_arn_to_db",
+    "users.fetch_all_users",
+    "users.add_user",
+    "users.delete_user_by_id",
+    "users.update_password",
+    "users.fetch_user_by_email",
+    "users.user_is_root",
+    "users.fetch_user",
+    "users.get_all_sns_subscription_arns_for_user",
+}
+
+MODELS_DIR = os.path.dirname(app.models.__file__)
+DB_HELPERS_FILE = db_helpers.__file__
+
+
+class Statement(NamedTuple):
+    origin: str
+    sql: str
+
+
+def _origin(frame) -> str:
+    """Names the innermost model or db_helpers function on the stack."""
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename == DB_HELPERS_FILE or os.path.dirname(filename) == MODELS_DIR:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class RecordingCursor(BaseCursor):
+    """Cursor that records the statements it executes, parameters bound."""
+
+    statements: List[Statement] = []
+
+    def execute(self, query, vars=None):
+        sql = self.mogrify(query, vars).decode(encodings[self.connection.encoding])
+        self.statements.append(Statement(_origin(sys._getframe(1)), sql))
+        return super().execute(query, vars)
+
+
+class PlanCase(NamedTuple):
+    call: Callable[[Dict], object]
+    budget: int = DEFAULT_COST_BUDGET
+
+
+def _first_export_row(data: Dict) -> None:
+    rows = stream_issues_for_export(data["project"], None, None, None)
+    next(rows, None)
+    rows.close()
+
+
+def _purge_empty_project(data: Dict) -> None:
+    job_uuid = create_purge_job(data["empty_project"], "issues")
+    run_purge_job(job_uuid)
+
+
+CASES = {
+    "issues_page": PlanCase(
+        lambda d: fetch_issues_by_project(d["project"], 1, 10, None, None, None)
+    ),
+    "issues_page_deep": PlanCase(
+        lambda d: fetch_issues_by_project(d["project"], 50, 10, None, None, None)
+    ),
+    "issues_keyset": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"], 1, 10, None, None, None, after=d["after"], keyset=True
+        )
+    ),
+    "issues_unhandled_unresolved": PlanCase(
+        lambda d: fetch_issues_by_project(d["project"], 1, 10, False, None, False)
+    ),
+    "issues_since": PlanCase(
+        lambda d: fetch_issues_by_project(d["project"], 1, 10, None, d["since"], None)
+    ),
+    "issues_exact_users": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"], 1, 10, False, None, None, exact=True
+        )
+    ),
+    # Counts every matching issue, with index-only scans of the state indexes
+    "issues_exact_count": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"], 1, 10, False, None, False, count="exact"
+        ),
+        budget=20_000,
+    ),
+    "issues_by_context": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"],
+            1,
+            10,
+            None,
+            None,
+            None,
+            column_filters={"contexts": {"user": {"id": 1}}},
+        )
+    ),
+    "issues_by_path": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"], 1, 10, None, None, None, column_filters={"path": "checkout"}
+        )
+    ),
+    "issues_by_name_fuzzy": PlanCase(
+        lambda d: fetch_issues_by_project(
+            d["project"],
+            1,
+            10,
+            None,
+            None,
+            None,
+            column_filters={"name": "TypeEror"},
+            fuzzy=True,
+        )
+    ),
+    "search": PlanCase(
+        lambda d: search_issues(d["project"], "undefined", 10, None, None, None)
+    ),
+    # Reads every issue of the project, in index order
+    "export": PlanCase(_first_export_row, budget=100_000),
+    "error_groups": PlanCase(
+        lambda d: fetch_error_groups(d["project"], 10, None, None)
+    ),
+    "error_groups_exact": PlanCase(
+        lambda d: fetch_error_groups(d["project"], 10, False, d["since"], exact=True)
+    ),
+    "facets": PlanCase(
+        lambda d: fetch_issue_facets(d["project"], ["browser", "path"], 10)
+    ),
+    "facets_for_group": PlanCase(
+        lambda d: fetch_issue_facets(
+            d["project"], ["os"], 10, error_hash=d["error_hash"]
+        )
+    ),
+    "error": PlanCase(lambda d: fetch_error(d["project"], d["error"])),
+    "error_exact": PlanCase(
+        lambda d: fetch_error(d["project"], d["error"], exact=True)
+    ),
+    "rejection": PlanCase(lambda d: fetch_rejection(d["project"], d["rejection"])),
+    "resolve_error": PlanCase(
+        lambda d: update_error_resolved(d["project"], "missing-uuid", True)
+    ),
+    "resolve_rejection": PlanCase(
+        lambda d: update_rejection_resolved(d["project"], "missing-uuid", True)
+    ),
+    "delete_error": PlanCase(
+        lambda d: delete_error_by_id(d["project"], "missing-uuid")
+    ),
+    "delete_rejection": PlanCase(
+        lambda d: delete_rejection_by_id(d["project"], "missing-uuid")
+    ),
+    # Updates every matching issue; the estimate is an average project's share
+    "resolve_batch": PlanCase(
+        lambda d: update_issue_batch_resolved(
+            d["empty_project"], True, filters={"handled": False}
+        ),
+        budget=15_000,
+    ),
+    "delete_batch": PlanCase(
+        lambda d: delete_issue_batch(d["empty_project"], error_uuids=["missing-uuid"])
+    ),
+    "purge": PlanCase(_purge_empty_project),
+    "summary": PlanCase(lambda d: get_issue_summary(d["project"])),
+    "summary_hourly": PlanCase(
+        lambda d: get_issue_summary(d["project"], buckets=24, granularity="hour")
+    ),
+    "most_recent": PlanCase(lambda d: fetch_most_recent_log(d["project"])),
+    "dashboard": PlanCase(lambda d: fetch_dashboard(d["user"], False)),
+    # Covers every project
+    "dashboard_root": PlanCase(
+        lambda d: fetch_dashboard(d["user"], True), budget=6_000
+    ),
+    "projects": PlanCase(lambda d: fetch_projects(1, 10)),
+    "user_projects": PlanCase(lambda d: fetch_projects_for_user(d["user"], 1, 10)),
+}
+
+
+def walk_plan(node: Dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+@pytest.fixture(scope="module")
+def dataset(test_app, setup_test_db):
+    """Seeds the test database, records each case's statements and cleans up."""
+    connection = db.get_db_connection_from_pool()
+    cursor = connection.cursor()
+
+    seed_synthetic_data(
+        connection,
+        PROJECTS,
+        USERS,
+        ERRORS,
+        REJECTIONS,
+        days=DAYS,
+        seed=1,
+        log=lambda _: None,
+    )
+    insert_project(
+        cursor,
+        {
+            "uuid": "empty-project-uuid",
+            "name": "Empty Project",
+            "api_key": "empty-project-key",
+            "platform": "React",
+            "sns_topic_arn": "arn:aws:sns:us-east-1:000000000000:empty",
+        },
+    )
+    connection.commit()
+
+    # The project with the most issues, and samples from it
+    cursor.execute(
+        """
+        SELECT p.uuid, p.id FROM projects p
+        JOIN project_issue_counters c ON c.project_id = p.id
+        GROUP BY p.id ORDER BY sum(c.issue_count) DESC LIMIT 1
+        """
+    )
+    project_uuid, project_id = cursor.fetchone()
+    cursor.execute(
+        """
+        SELECT uuid, created_at, error_hash FROM error_logs
+        WHERE project_id = %s ORDER BY created_at DESC OFFSET 100 LIMIT 1
+        """,
+        [project_id],
+    )
+    error_uuid, error_created_at, error_hash = cursor.fetchone()
+    cursor.execute(
+        "SELECT uuid FROM rejection_logs WHERE project_id = %s LIMIT 1", [project_id]
+    )
+    rejection_uuid = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        SELECT u.uuid FROM users u JOIN projects_users pu ON pu.user_id = u.id
+        WHERE pu.project_id = %s ORDER BY u.id LIMIT 1
+        """,
+        [project_id],
+    )
+    user_uuid = cursor.fetchone()[0]
+    connection.commit()
+
+    data = {
+        "project": project_uuid,
+        "empty_project": "empty-project-uuid",
+        "error": error_uuid,
+        "error_hash": error_hash,
+        "rejection": rejection_uuid,
+        "user": user_uuid,
+        "after": (error_created_at, error_uuid),
+        "since": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),
+    }
+
+    pool = db.connection_pool
+    getconn = pool.getconn
+    pooled = set()
+
+    def recording_getconn(*args, **kwargs):
+        conn = getconn(*args, **kwargs)
+        conn.cursor_factory = RecordingCursor
+        pooled.add(conn)
+        return conn
+
+    statements = {}
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(pool, "getconn", recording_getconn)
+        for name, case in CASES.items():
+            RecordingCursor.statements = []
+            case.call(data)
+            statements[name] = RecordingCursor.statements
+    for conn in pooled:
+        conn.cursor_factory = None
+
+    yield {"statements": statements, "cursor": cursor}
+
+    connection.rollback()
+    clean_up_database(cursor)
+    for table in PARTITIONED_TABLES:
+        for partition in list_partitions(cursor, table):
+            cursor.execute(f"DROP TABLE {partition.name}")
+    connection.commit()
+    cursor.close()
+    db.return_db_connection_to_pool(connection)
+
+
+def explain(cursor, sql: str) -> Dict:
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = cursor.fetchone()[0][0]["Plan"]
+    cursor.connection.rollback()
+    return plan
+
+
+def populated_log_relations(cursor) -> set:
+    cursor.execute(
+        """
+        SELECT c.relname FROM pg_class c
+        WHERE c.relname ~ '^(error|rejection)_logs' AND c.relkind = 'r'
+        AND c.reltuples > 0
+        """
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_plan(dataset, name):
+    """Test that a model function's queries stay within budget without log scans."""
+    case = CASES[name]
+    cursor = dataset["cursor"]
+    populated = populated_log_relations(cursor)
+    checked = [
+        statement
+        for statement in dataset["statements"][name]
+        if PLANNABLE.match(statement.sql)
+    ]
+    assert checked, f"{name} executed no query"
+
+    problems = []
+    for statement in checked:
+        plan = explain(cursor, statement.sql)
+        for node in walk_plan(plan):
+            if (
+                node["Node Type"] == "Seq Scan"
+                and node.get("Relation Name") in populated
+            ):
+                problems.append(
+                    f"{statement.origin}: sequential scan on {node['Relation Name']}"
+                )
+        if plan["Total Cost"] > case.budget:
+            problems.append(
+                f"{statement.origin}: cost {plan['Total Cost']:.0f} exceeds "
+                f"budget {case.budget}"
+            )
+
+    assert not problems, "\n".join(problems)
+
+
+def test_query_plans_cover_models(dataset):
+    """Test that every function running SQL on the log tables is checked."""
+    executed = {
+        statement.origin
+        for statements in dataset["statements"].values()
+        for statement in statements
+    }
+    modules = [db_helpers] + [
+        module
+        for name, module in sys.modules.items()
+        if name.startswith("app.models.")
+    ]
+
+    unchecked = []
+    for module in modules:
+        prefix = module.__name__.rsplit(".", 1)[-1]
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if function.__module__ != module.__name__:
+                continue
+            source = inspect.getsource(inspect.unwrap(function))
+            if ".execute(" not in source and "copy_expert(" not in source:
+                continue
+            origin = f"{prefix}.{name}"
+            if origin in LOG_FREE:
+                assert not LOG_TABLE.search(source), f"{origin} uses the log tables"
+            elif origin not in executed and origin not in UNPLANNED:
+                unchecked.append(origin)
+
+    assert not unchecked, f"No plan check exercises {', '.join(sorted(unchecked))}"
@@ -0,0 +1,47 @@
+def test_get_dashboard_root(root_client, projects, errors, rejections):
+    """Test fetching the dashboard for every project as the root user."""
+    response = root_client.get("/api/dashboard")
+
+    assert response.status_code == 200
+    dashboard = response.json["payload"]["projects"]
+    assert len(dashboard) == len(projects)
+
+    project = next(p for p in dashboard if p["uuid"] == projects[0]["uuid"])
+    assert project["error_count"] == 1
+    assert project["rejection_count"] == 1
+    assert project["unresolved_count"] == 2
+    assert project["summary"] == [0, 0, 0, 0, 0, 1, 1]
+    assert project["latest_issue"]["uuid"] == rejections[0]["uuid"]
+
+
+def test_get_dashboard_regular(
+    regular_client, projects, user_project_assignment, errors, rejections
+):
+    """Test that regular users only see the projects they are assigned to."""
+    response = regular_client.get(
+        "/api/dashboard", query_string={"range": "24h", "granularity": "hour"}
+    )
+
+    assert response.status_code == 200
+    dashboard = response.json["payload"]["projects"]
+    assert [p["uuid"] for p in dashboard] == [user_project_assignment["project_uuid"]]
+    assert len(dashboard[0]["summary"]) == 24
+
+
+def test_get_dashboard_without_issues(root_client, projects):
+    """Test that projects without issues have empty counts and no latest issue."""
+    response = root_client.get("/api/dashboard")
+
+    assert response.status_code == 200
+    for project in response.json["payload"]["projects"]:
+        assert project["error_count"] == 0
+        assert project["summary"] == [0] * 7
+        assert project["latest_issue"] is None
+
+
+def test_get_dashboard_invalid_range(root_client, projects):
+    """Test rejecting an invalid summary range."""
+    response = root_client.get("/api/dashboard", query_string={"range": "soon"})
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid range."
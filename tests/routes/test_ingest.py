@@ -0,0 +1,204 @@
+from unittest.mock import patch
+from app.routes.ingest import notify_new_issues
+from app.utils import compute_error_hash
+
+API_KEY = "test-api-key-123"
+PROJECT_UUID = "project-uuid-123-456"
+
+STACK_TRACE = (
+    "TypeError: Cannot read properties of undefined\n"
+    "    at render (app.js:10:5)\n"
+    "    at main (app.js:20:1)"
+)
+
+
+def error_uuid(index):
+    return f"00000000-0000-4000-8000-{index:012d}"
+
+
+def make_error(index, **overrides):
+    return {
+        "uuid": error_uuid(index),
+        "name": "TypeError",
+        "message": "Cannot read properties of undefined",
+        "created_at": "2024-03-01T12:00:00+00:00",
+        "filename": "app.js",
+        "line_number": 10,
+        "col_number": 5,
+        "stack_trace": STACK_TRACE,
+        "handled": False,
+        "contexts": {"user": {"id": index}},
+        **overrides,
+    }
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues(mock_job, client, projects, test_db):
+    """Test that a batch is stored in one request with one notification."""
+    payload = {
+        "errors": [make_error(i) for i in range(3)],
+        "rejections": [{"value": "Request failed\twith\nstatus 500", "handled": True}],
+    }
+
+    response = client.post("/api/ingest", json=payload, headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 201
+    assert response.json["payload"] == {"errors": 3, "rejections": 1}
+    mock_job.assert_called_once_with(notify_new_issues, PROJECT_UUID)
+
+    test_db.execute(
+        """
+        SELECT e.uuid, e.project_id, e.error_hash, e.contexts, st.stack_trace
+        FROM error_logs e JOIN stack_traces st ON st.digest = e.stack_trace_digest
+        ORDER BY e.uuid
+        """
+    )
+    rows = test_db.fetchall()
+    error_hash = compute_error_hash(
+        make_error(0)["name"], make_error(0)["message"], STACK_TRACE, None, None, None
+    )
+    assert rows == [
+        (error_uuid(i), 1, error_hash, {"user": {"id": i}}, STACK_TRACE)
+        for i in range(3)
+    ]
+
+    test_db.execute("SELECT value, handled, project_id FROM rejection_logs")
+    assert test_db.fetchall() == [("Request failed\twith\nstatus 500", True, 1)]
+
+
+def test_compute_error_hash_groups_by_top_frame():
+    """Test that errors thrown from the same place share a hash."""
+    other_caller = STACK_TRACE.replace("main (app.js:20:1)", "other (lib.js:1:1)")
+    other_place = STACK_TRACE.replace("app.js:10:5", "app.js:11:5")
+    args = ("TypeError", "Cannot read properties of undefined")
+
+    error_hash = compute_error_hash(*args, STACK_TRACE, None, None, None)
+    assert compute_error_hash(*args, other_caller, None, None, None) == error_hash
+    assert compute_error_hash(*args, other_place, None, None, None) != error_hash
+    assert compute_error_hash(*args, None, "app.js", 10, 5) != compute_error_hash(
+        *args, None, "app.js", 11, 5
+    )
+
+
+def test_compute_error_hash_groups_python_by_innermost_frame():
+    """Test that Python tracebacks group by their last frame, the innermost one."""
+
+    def traceback(module):
+        return (
+            "Traceback (most recent call last):\n"
+            '  File "/app/wsgi.py", line 12, in handle\n'
+            "    return view(request)\n"
+            f'  File "/app/{module}.py", line 40, in view\n'
+            '    return payload["id"]\n'
+            "KeyError: 'id'"
+        )
+
+    args = ("KeyError", "'id'")
+    other_caller = traceback("orders").replace("wsgi.py", "worker.py")
+
+    error_hash = compute_error_hash(*args, traceback("orders"), None, None, None)
+    assert compute_error_hash(*args, other_caller, None, None, None) == error_hash
+    assert (
+        compute_error_hash(*args, traceback("users"), None, None, None) != error_hash
+    )
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_invalid_api_key(mock_job, client, projects):
+    """Test that batches need a known API key."""
+    payload = {"errors": [make_error(0)]}
+
+    response = client.post("/api/ingest", json=payload)
+    assert response.status_code == 401
+
+    response = client.post("/api/ingest", json=payload, headers={"X-API-Key": "nope"})
+    assert response.status_code == 401
+    assert response.json["message"] == "Invalid API key."
+    mock_job.assert_not_called()
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_invalid_batch(mock_job, client, projects, test_db):
+    """Test that an invalid event rejects the whole batch."""
+    payload = {"errors": [make_error(0), make_error(1, handled="no")]}
+
+    response = client.post("/api/ingest", json=payload, headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 400
+    assert response.json["message"] == "'handled' must be a boolean."
+    test_db.execute("SELECT count(*) FROM error_logs")
+    assert test_db.fetchone()[0] == 0
+    mock_job.assert_not_called()
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_duplicate_uuid(mock_job, client, projects, test_db):
+    """Test that resending an issue is a conflict and leaves no partial batch."""
+    headers = {"X-API-Key": API_KEY}
+    client.post("/api/ingest", json={"errors": [make_error(0)]}, headers=headers)
+
+    payload = {"errors": [make_error(1), make_error(0)]}
+    response = client.post("/api/ingest", json=payload, headers=headers)
+
+    assert response.status_code == 409
+    test_db.execute("SELECT uuid FROM error_logs")
+    assert test_db.fetchall() == [(error_uuid(0),)]
+    mock_job.assert_called_once()
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_repeated_uuid(mock_job, client, projects, test_db):
+    """Test that a batch sending one UUID twice is a conflict."""
+    payload = {
+        "errors": [
+            make_error(0),
+            make_error(0, created_at="2024-03-01T12:00:01+00:00"),
+        ]
+    }
+
+    response = client.post("/api/ingest", json=payload, headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 409
+    test_db.execute("SELECT count(*) FROM error_logs")
+    assert test_db.fetchone()[0] == 0
+    mock_job.assert_not_called()
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_invalid_uuid(mock_job, client, projects, test_db):
+    """Test that client UUIDs must be UUIDs and come with a timestamp."""
+    headers = {"X-API-Key": API_KEY}
+
+    for event, message in [
+        (make_error(0, uuid="not-a-uuid"), "'uuid' must be a UUID."),
+        (make_error(0, uuid=42), "'uuid' must be a UUID."),
+        (
+            make_error(0, created_at=None),
+            "'created_at' is required when 'uuid' is given.",
+        ),
+    ]:
+        response = client.post("/api/ingest", json={"errors": [event]}, headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["message"] == message
+
+    event = make_error(0, uuid=error_uuid(0).upper())
+    response = client.post("/api/ingest", json={"errors": [event]}, headers=headers)
+
+    assert response.status_code == 201
+    test_db.execute("SELECT uuid FROM error_logs")
+    assert test_db.fetchall() == [(error_uuid(0),)]
+
+
+@patch("app.routes.ingest.start_background_job")
+def test_ingest_issues_batch_too_large(mock_job, client, projects, test_app):
+    """Test that batches are capped at the configured size."""
+    payload = {"rejections": [{"value": "x", "handled": False}] * 3}
+
+    with patch.dict(test_app.config, {"INGEST_MAX_BATCH": 2}):
+        response = client.post(
+            "/api/ingest", json=payload, headers={"X-API-Key": API_KEY}
+        )
+
+    assert response.status_code == 413
+    mock_job.assert_not_called()
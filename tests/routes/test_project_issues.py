@@ -1,4 +1,15 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from db import get_db_connection_from_pool, return_db_connection_to_pool
+from app.models import run_purge_job
+from app.utils.archive import archive_issues
 from tests.utils.test_db_queries import TestDBQueries
+from tests.utils.test_setup_helpers import insert_error_log
 
 
 def test_get_issues_root(root_client, projects, errors, rejections):
@@ -49,21 +60,506 @@ def test_get_issues_regular_unauthorized(
     )
 
 
-def delete_issues(root_client, projects, errors, rejections, test_db):
-    """Test deleting all issues for a specific project."""
+def test_get_issues_keyset_pagination(root_client, projects, errors, rejections):
+    """Test walking the issues of a project with cursor pagination."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues",
+        query_string={"cursor": "", "limit": 1},
+    )
+
+    assert response.status_code == 200
+    first_page = response.json["payload"]
+    assert len(first_page["issues"]) == 1
+    assert first_page["issues"][0]["uuid"] == rejections[0]["uuid"]
+    assert first_page["next_cursor"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues",
+        query_string={"cursor": first_page["next_cursor"], "limit": 1},
+    )
+
+    assert response.status_code == 200
+    second_page = response.json["payload"]
+    assert len(second_page["issues"]) == 1
+    assert second_page["issues"][0]["uuid"] == errors[0]["uuid"]
+    assert second_page["next_cursor"] is None
+
+
+def test_get_issues_pages_interleave(root_client, projects, errors, rejections):
+    """Test that numbered pages merge errors and rejections in time order."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues", query_string={"page": 2, "limit": 1}
+    )
+
+    assert response.status_code == 200
+    assert [issue["uuid"] for issue in response.json["payload"]["issues"]] == [
+        errors[0]["uuid"]
+    ]
+    assert response.json["payload"]["total_pages"] == 2
+
+
+def test_get_issues_count_modes(root_client, projects, errors, rejections):
+    """Test that every count mode reports the same number of pages."""
+    project_uuid = projects[0]["uuid"]
+    since = (datetime.now(timezone.utc) - timedelta(hours=2, minutes=30)).isoformat()
+
+    for query_string, expected_pages in [
+        ({"limit": 1}, 2),
+        ({"limit": 1, "time": since}, 1),
+        ({"limit": 1, "handled": "true"}, 0),
+    ]:
+        for count in ["estimate", "exact"]:
+            response = root_client.get(
+                f"/api/projects/{project_uuid}/issues",
+                query_string={**query_string, "count": count},
+            )
+
+            assert response.status_code == 200
+            assert response.json["payload"]["total_pages"] == expected_pages
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues", query_string={"count": "none"}
+    )
+
+    assert response.status_code == 200
+    assert response.json["payload"]["total_pages"] is None
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues", query_string={"count": "all"}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid count mode."
+
+
+def test_get_issues_text_filters(root_client, projects, errors, rejections):
+    """Test filtering issues by substrings of their filename, path and name."""
+    project_uuid = projects[0]["uuid"]
+
+    for query_string, expected in [
+        ({"path": "SUBMIT"}, [rejections[0]["uuid"]]),
+        ({"path": "api/v1"}, [errors[0]["uuid"]]),
+        ({"filename": "dummy", "name": "my err"}, [errors[0]["uuid"]]),
+        ({"path": "/%_"}, []),
+        ({"path": "resource", "handled": "true"}, []),
+    ]:
+        response = root_client.get(
+            f"/api/projects/{project_uuid}/issues",
+            query_string={**query_string, "count": "estimate"},
+        )
+
+        assert response.status_code == 200
+        payload = response.json["payload"]
+        assert [issue["uuid"] for issue in payload["issues"]] == expected
+        assert payload["total_pages"] == len(expected)
+
+
+def test_get_issues_fuzzy_filters(root_client, projects, errors, rejections):
+    """Test fuzzy filtering tolerates typos in the filter value."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues",
+        query_string={"name": "Dumy", "fuzzy": "true"},
+    )
+
+    assert response.status_code == 200
+    assert [issue["uuid"] for issue in response.json["payload"]["issues"]] == [
+        errors[0]["uuid"]
+    ]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues", query_string={"path": "ap"}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Text filters need at least 3 characters."
+
+
+def test_get_issues_context_filter(root_client, projects, errors, test_db):
+    """Test filtering errors by the contents of their contexts."""
+    project_uuid = projects[0]["uuid"]
+    tagged_error = {
+        **errors[0],
+        "uuid": "error-uuid-tagged",
+        "contexts": {"tenant": "acme", "flags": {"checkout_v2": True}},
+    }
+    insert_error_log(test_db, tagged_error)
+
+    for context, expected in [
+        ({"tenant": "acme"}, [tagged_error["uuid"]]),
+        ({"flags": {"checkout_v2": True}}, [tagged_error["uuid"]]),
+        ({"file": "dummy.js", "line": 89}, [errors[0]["uuid"]]),
+        ({"tenant": "other"}, []),
+    ]:
+        response = root_client.get(
+            f"/api/projects/{project_uuid}/issues",
+            query_string={"context": json.dumps(context), "count": "estimate"},
+        )
+
+        assert response.status_code == 200
+        payload = response.json["payload"]
+        assert [issue["uuid"] for issue in payload["issues"]] == expected
+        assert payload["total_pages"] == len(expected)
+
+    for context in ["not-json", "[1]"]:
+        response = root_client.get(
+            f"/api/projects/{project_uuid}/issues", query_string={"context": context}
+        )
+
+        assert response.status_code == 400
+        assert response.json["message"] == "Invalid context filter."
+
+
+def test_get_issues_invalid_cursor(root_client, projects):
+    """Test fetching issues with a malformed pagination cursor."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues",
+        query_string={"cursor": "not-a-cursor"},
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid cursor."
+
+
+def test_export_issues(root_client, projects, errors, rejections):
+    """Test streaming a project's issues as NDJSON and as gzipped CSV."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/export"
+
+    response = root_client.get(url)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    issues = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [(issue["issue_type"], issue["uuid"]) for issue in issues] == [
+        ("rejection", rejections[0]["uuid"]),
+        ("error", errors[0]["uuid"]),
+    ]
+    assert issues[1]["stack_trace"] == errors[0]["stack_trace"]
+    assert issues[1]["contexts"] == errors[0]["contexts"]
+
+    response = root_client.get(url, query_string={"format": "csv", "gzip": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert [row["uuid"] for row in rows] == [
+        rejections[0]["uuid"],
+        errors[0]["uuid"],
+    ]
+    assert json.loads(rows[1]["contexts"]) == errors[0]["contexts"]
+
+    response = root_client.get(url, query_string={"handled": "true"})
+
+    assert response.status_code == 200
+    assert response.data == b""
+
+    response = root_client.get(url, query_string={"format": "xml"})
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid export format."
+
+
+def test_archived_issues(
+    root_client, test_app, projects, errors, rejections, tmp_path, monkeypatch
+):
+    """Test reading and exporting issues that were moved to the archive."""
+    monkeypatch.setitem(test_app.config, "ARCHIVE_DIR", str(tmp_path))
+    project_uuid = projects[0]["uuid"]
+    base_url = f"/api/projects/{project_uuid}/issues"
+
+    connection = get_db_connection_from_pool()
+    try:
+        archive_issues(connection, str(tmp_path), 0, log=lambda _: None)
+    finally:
+        return_db_connection_to_pool(connection)
+
+    response = root_client.get(f"{base_url}/errors/{errors[0]['uuid']}")
+
+    assert response.status_code == 200
+    assert response.json["payload"]["archived"] is True
+    assert response.json["payload"]["stack_trace"] == errors[0]["stack_trace"]
+    assert response.json["payload"]["total_occurrences"] == 0
+
+    response = root_client.get(f"{base_url}/rejections/{rejections[0]['uuid']}")
+
+    assert response.status_code == 200
+    assert response.json["payload"]["archived"] is True
+    assert response.json["payload"]["value"] == rejections[0]["value"]
+
+    response = root_client.get(f"{base_url}/export")
+
+    assert response.status_code == 200
+    assert response.data == b""
+
+    response = root_client.get(f"{base_url}/export", query_string={"archived": "true"})
+
+    assert response.status_code == 200
+    issues = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [(issue["issue_type"], issue["uuid"]) for issue in issues] == [
+        ("rejection", rejections[0]["uuid"]),
+        ("error", errors[0]["uuid"]),
+    ]
+
+
+def test_get_issue_facets(root_client, projects, errors, rejections, test_db):
+    """Test the value breakdowns of a project's issues and of one error group."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/facets"
+
+    response = root_client.get(url)
+
+    assert response.status_code == 200
+    facets = response.json["payload"]
+    assert facets["method"] == [{"value": "POST", "count": 2}]
+    assert facets["os"] == [{"value": "macOS", "count": 2}]
+    assert facets["browser"] == []
+    assert facets["path"] == [
+        {"value": "/api/v1/resource", "count": 1},
+        {"value": "/submit-form", "count": 1},
+    ]
+
+    response = root_client.get(
+        url,
+        query_string={"error_hash": errors[0]["error_hash"], "facets": "path,method"},
+    )
+
+    assert response.status_code == 200
+    assert response.json["payload"] == {
+        "path": [{"value": "/api/v1/resource", "count": 1}],
+        "method": [{"value": "POST", "count": 1}],
+    }
+
+    since = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+    response = root_client.get(url, query_string={"facets": "path", "time": since})
+
+    assert response.json["payload"]["path"] == [{"value": "/submit-form", "count": 1}]
+
+    test_db.execute(
+        "DELETE FROM rejection_logs WHERE uuid = %s", [rejections[0]["uuid"]]
+    )
+    response = root_client.get(url, query_string={"facets": "path", "limit": 1})
+
+    assert response.json["payload"]["path"] == [
+        {"value": "/api/v1/resource", "count": 1}
+    ]
+
+    response = root_client.get(url, query_string={"facets": "path,referrer"})
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid facets."
+
+
+def test_search_issues(root_client, projects, errors, rejections):
+    """Test searching issues ranks matches and walks them with a cursor."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues/search",
+        query_string={"q": "dummy", "limit": 1},
+    )
+
+    assert response.status_code == 200
+    first_page = response.json["payload"]
+    assert [issue["uuid"] for issue in first_page["issues"]] == [errors[0]["uuid"]]
+    assert first_page["next_cursor"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues/search",
+        query_string={"q": "dummy", "limit": 1, "cursor": first_page["next_cursor"]},
+    )
+
+    assert response.status_code == 200
+    second_page = response.json["payload"]
+    assert [issue["uuid"] for issue in second_page["issues"]] == [
+        rejections[0]["uuid"]
+    ]
+    assert second_page["issues"][0]["rank"] <= first_page["issues"][0]["rank"]
+    assert second_page["next_cursor"] is None
+
+    for query, expected in [
+        ("stack", [errors[0]["uuid"]]),
+        ("dummy -stack", [rejections[0]["uuid"]]),
+        ('"rejection value"', [rejections[0]["uuid"]]),
+        ("missing", []),
+    ]:
+        response = root_client.get(
+            f"/api/projects/{project_uuid}/issues/search", query_string={"q": query}
+        )
+
+        assert response.status_code == 200
+        assert [issue["uuid"] for issue in response.json["payload"]["issues"]] == (
+            expected
+        )
+
+
+def test_search_issues_invalid(root_client, projects):
+    """Test searching issues without a query or with a malformed cursor."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(f"/api/projects/{project_uuid}/issues/search")
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Search query is required."
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues/search",
+        query_string={"q": "dummy", "cursor": "not-a-cursor"},
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid cursor."
+
+
+def test_get_error_groups(root_client, projects, errors):
+    """Test fetching the error groups of a project."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(f"/api/projects/{project_uuid}/issues/groups")
+
+    assert response.status_code == 200
+    groups = response.json["payload"]["groups"]
+    assert len(groups) == 1
+    assert groups[0]["error_hash"] == errors[0]["error_hash"]
+    assert groups[0]["uuid"] == errors[0]["uuid"]
+    assert groups[0]["total_occurrences"] == 1
+    assert groups[0]["resolved"] is False
+    assert groups[0]["distinct_users"] == 1
+    assert response.json["payload"]["next_cursor"] is None
+
+
+def test_error_groups_follow_error_changes(root_client, projects, errors, test_db):
+    """Test that error groups track resolving and deleting their errors."""
+    project_uuid = projects[0]["uuid"]
+    error = errors[0]
+
+    root_client.patch(
+        f"/api/projects/{project_uuid}/issues/errors/{error['uuid']}",
+        json={"resolved": True},
+    )
+
+    group = TestDBQueries.get_error_group(test_db, project_uuid, error["error_hash"])
+    assert group == (1, 0, True, error["uuid"])
+
+    root_client.delete(f"/api/projects/{project_uuid}/issues/errors/{error['uuid']}")
+
+    group = TestDBQueries.get_error_group(test_db, project_uuid, error["error_hash"])
+    assert group is None, "Group should be removed with its last occurrence."
+
+
+def test_get_error_distinct_users(root_client, projects, errors):
+    """Test that estimated and exact distinct user counts agree."""
+    project_uuid = projects[0]["uuid"]
+    error_uuid = errors[0]["uuid"]
+
+    estimated = root_client.get(
+        f"/api/projects/{project_uuid}/issues/errors/{error_uuid}"
+    )
+    exact = root_client.get(
+        f"/api/projects/{project_uuid}/issues/errors/{error_uuid}",
+        query_string={"exact": "true"},
+    )
+
+    assert estimated.status_code == 200
+    assert exact.status_code == 200
+    assert estimated.json["payload"]["distinct_users"] == 1
+    assert exact.json["payload"]["distinct_users"] == 1
+
+
+def test_delete_issues(root_client, projects, errors, rejections, test_db):
+    """Test purging all issues for a specific project in batches."""
     project_uuid = projects[0]["uuid"]
 
     # Verify issues exist prior to deletion
-    assert TestDBQueries.count_errors_by_project(test_db, project_uuid) > 0
-    assert TestDBQueries.count_rejections_by_project(test_db, project_uuid) > 0
+    error_count = TestDBQueries.count_errors_by_project(test_db, project_uuid)
+    rejection_count = TestDBQueries.count_rejections_by_project(test_db, project_uuid)
+    assert error_count > 0
+    assert rejection_count > 0
 
-    response = root_client.delete(f"/api/projects/{project_uuid}/issues")
+    # Start the job without running it, then run it with a one-row batch size
+    with patch("app.routes.project_issues.start_background_job") as start:
+        response = root_client.delete(f"/api/projects/{project_uuid}/issues")
 
-    assert response.status_code == 204
+    assert response.status_code == 202
+    job_uuid = response.json["payload"]["job_uuid"]
+    start.assert_called_once()
+
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/{job_uuid}")
+
+    assert response.status_code == 200
+    assert response.json["payload"]["status"] == "pending"
+    assert response.json["payload"]["rows_deleted"] == 0
+
+    # A second request reuses the queued job
+    with patch("app.routes.project_issues.start_background_job"):
+        response = root_client.delete(f"/api/projects/{project_uuid}/issues")
+
+    assert response.json["payload"]["job_uuid"] == job_uuid
+
+    run_purge_job(job_uuid, batch_size=1)
+
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/{job_uuid}")
 
-    # Verify issues were deleted
+    assert response.json["payload"]["status"] == "completed"
+    assert response.json["payload"]["rows_deleted"] == error_count + rejection_count
+
+    # Verify issues were deleted and the project kept
     assert TestDBQueries.count_errors_by_project(test_db, project_uuid) == 0
     assert TestDBQueries.count_rejections_by_project(test_db, project_uuid) == 0
+    assert TestDBQueries.get_project_by_uuid(test_db, project_uuid) is not None
+
+
+def test_delete_issues_abandoned_job(root_client, projects, errors, test_db):
+    """Test that a running job without progress is taken over, but not before."""
+    project_uuid = projects[0]["uuid"]
+
+    with patch("app.routes.project_issues.start_background_job"):
+        response = root_client.delete(f"/api/projects/{project_uuid}/issues")
+    job_uuid = response.json["payload"]["job_uuid"]
+
+    # A worker claimed the job and is still making progress
+    test_db.execute(
+        "UPDATE purge_jobs SET status = 'running' WHERE uuid = %s", [job_uuid]
+    )
+    assert run_purge_job(job_uuid) is None
+
+    # The worker died an hour ago
+    test_db.execute(
+        """
+        UPDATE purge_jobs SET updated_at = CURRENT_TIMESTAMP - INTERVAL '1 hour'
+        WHERE uuid = %s
+        """,
+        [job_uuid],
+    )
+    with patch("app.routes.project_issues.start_background_job") as start:
+        response = root_client.delete(f"/api/projects/{project_uuid}/issues")
+
+    assert response.json["payload"]["job_uuid"] == job_uuid
+    assert start.call_args.args[1] == job_uuid
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/{job_uuid}")
+    assert response.json["payload"]["status"] == "pending"
+
+    run_purge_job(job_uuid, batch_size=1)
+
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/{job_uuid}")
+    assert response.json["payload"]["status"] == "completed"
+    assert TestDBQueries.count_errors_by_project(test_db, project_uuid) == 0
+
+
+def test_get_purge_job_not_found(root_client, projects):
+    """Test fetching a purge job that does not exist."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/missing-job")
+
+    assert response.status_code == 404
 
 
 def test_get_error_root(root_client, projects, errors):
@@ -79,6 +575,25 @@ def test_get_error_root(root_client, projects, errors):
     assert response.json["payload"]["uuid"] == error_uuid
 
 
+def test_get_error_shared_stack_trace(root_client, projects, errors, test_db):
+    """Test that errors share one stored copy of an identical stack trace."""
+    project_uuid = projects[0]["uuid"]
+    insert_error_log(test_db, {**errors[0], "uuid": "error-uuid-copy"})
+
+    test_db.execute("SELECT COUNT(*) FROM stack_traces")
+    assert test_db.fetchone()[0] == 1
+    test_db.execute("SELECT COUNT(*) FROM error_logs WHERE stack_trace IS NOT NULL")
+    assert test_db.fetchone()[0] == 0
+
+    for error_uuid in (errors[0]["uuid"], "error-uuid-copy"):
+        response = root_client.get(
+            f"/api/projects/{project_uuid}/issues/errors/{error_uuid}"
+        )
+
+        assert response.status_code == 200
+        assert response.json["payload"]["stack_trace"] == errors[0]["stack_trace"]
+
+
 def test_get_error_regular(regular_client, projects, user_project_assignment, errors):
     """Test fetching a specific error authenticated as regular user."""
     project_uuid = projects[0]["uuid"]
@@ -126,6 +641,18 @@ def test_get_error_invalid_uuid(root_client, projects):
     assert response.json["message"] == "Error not found."
 
 
+def test_get_error_other_project(root_client, projects, errors):
+    """Test that an error is not found through a project it does not belong to."""
+    project_uuid = projects[0]["uuid"]
+    error_uuid = errors[1]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues/errors/{error_uuid}"
+    )
+
+    assert response.status_code == 404
+
+
 def test_get_rejection_root(root_client, projects, rejections):
     """Test fetching a specific rejection authenticated as the root user."""
     project_uuid = projects[0]["uuid"]
@@ -188,6 +715,18 @@ def test_get_rejection_invalid_uuid(root_client, projects):
     assert response.json["message"] == "Rejection not found."
 
 
+def test_get_rejection_other_project(root_client, projects, rejections):
+    """Test that a rejection is not found through a project it does not belong to."""
+    project_uuid = projects[0]["uuid"]
+    rejection_uuid = rejections[1]["uuid"]
+
+    response = root_client.get(
+        f"/api/projects/{project_uuid}/issues/rejections/{rejection_uuid}"
+    )
+
+    assert response.status_code == 404
+
+
 def test_toggle_error_resolved_root(root_client, projects, errors, test_db):
     """Test toggling the resolved state of an error authenticated as the root user."""
     project_uuid = projects[0]["uuid"]
@@ -336,6 +875,68 @@ def test_toggle_rejection_resolved_regular_unauthorized(
     )
 
 
+def test_toggle_issue_batch(root_client, projects, errors, rejections, test_db):
+    """Test resolving a batch of errors and rejections by UUID."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.patch(
+        f"/api/projects/{project_uuid}/issues/batch",
+        json={
+            "resolved": True,
+            # The second error belongs to another project and is left alone
+            "errors": [errors[0]["uuid"], errors[1]["uuid"]],
+            "rejections": [rejections[0]["uuid"]],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json["payload"] == {"errors": 1, "rejections": 1}
+    assert TestDBQueries.get_error_by_uuid(test_db, errors[0]["uuid"])[11] is True
+    assert TestDBQueries.get_error_by_uuid(test_db, errors[1]["uuid"])[11] is False
+    assert (
+        TestDBQueries.get_rejection_by_uuid(test_db, rejections[0]["uuid"])[6] is True
+    )
+
+
+def test_toggle_issue_batch_invalid(root_client, projects):
+    """Test rejecting batch requests without a valid selection."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/batch"
+
+    response = root_client.patch(url, json={"resolved": True})
+    assert response.status_code == 400
+
+    response = root_client.patch(
+        url, json={"resolved": True, "errors": ["a"], "filter": {"resolved": False}}
+    )
+    assert response.status_code == 400
+
+    response = root_client.patch(
+        url, json={"resolved": True, "filter": {"message": "x"}}
+    )
+    assert response.status_code == 400
+
+
+def test_delete_issue_batch_by_filter(
+    root_client, projects, errors, rejections, test_db
+):
+    """Test deleting the unresolved errors with a given hash."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.delete(
+        f"/api/projects/{project_uuid}/issues/batch",
+        json={
+            "filter": {"resolved": False, "error_hash": errors[0]["error_hash"]}
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json["payload"] == {"errors": 1, "rejections": 0}
+    assert TestDBQueries.get_error_by_uuid(test_db, errors[0]["uuid"]) is None
+    assert TestDBQueries.get_error_by_uuid(test_db, errors[1]["uuid"]) is not None
+    assert TestDBQueries.count_rejections_by_project(test_db, project_uuid) == 1
+
+
 def test_delete_error_root(root_client, projects, errors, test_db):
     """Test deleting an error as root user."""
     project_uuid = projects[0]["uuid"]
@@ -358,6 +959,48 @@ def test_delete_error_root(root_client, projects, errors, test_db):
     ), "Error should not exist in the database after deletion."
 
 
+def test_issue_writes_scoped_to_project(root_client, projects, errors, test_db):
+    """Test that resolving or deleting an issue leaves other projects' copies."""
+    project_uuid = projects[0]["uuid"]
+    error_uuid = errors[0]["uuid"]
+    insert_error_log(
+        test_db,
+        {
+            **errors[0],
+            "project_id": 2,
+            "created_at": datetime.now() - timedelta(days=2),
+        },
+    )
+
+    response = root_client.patch(
+        f"/api/projects/{project_uuid}/issues/errors/{error_uuid}",
+        json={"resolved": True},
+    )
+    assert response.status_code == 204
+
+    test_db.execute(
+        "SELECT project_id, resolved FROM error_logs WHERE uuid = %s ORDER BY 1",
+        [error_uuid],
+    )
+    assert test_db.fetchall() == [(1, True), (2, False)]
+
+    response = root_client.delete(
+        f"/api/projects/{project_uuid}/issues/errors/{error_uuid}"
+    )
+    assert response.status_code == 204
+
+    test_db.execute("SELECT project_id FROM error_logs WHERE uuid = %s", [error_uuid])
+    assert test_db.fetchall() == [(2,)]
+
+    response = root_client.get(f"/api/projects/{projects[1]['uuid']}/issues")
+    copies = [
+        issue
+        for issue in response.get_json()["payload"]["issues"]
+        if issue["uuid"] == error_uuid
+    ]
+    assert len(copies) == 1 and copies[0]["resolved"] is False
+
+
 def test_delete_error_regular(
     regular_client, projects, user_project_assignment, errors, test_db
 ):
@@ -500,3 +1143,80 @@ def test_get_summary(root_client, projects, errors, rejections):
     assert (
         actual_summary == expected_summary
     ), f"Expected {expected_summary}, but got {actual_summary}."
+
+
+def hours_ago(created_at):
+    """Returns how many hour buckets before the current one a fixture falls in."""
+    current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    created_hour = datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S").replace(
+        minute=0, second=0
+    )
+    return round((current_hour - created_hour) / timedelta(hours=1))
+
+
+def test_get_summary_granularity(root_client, projects, errors, rejections):
+    """Test fetching hourly and time-zone-aware daily issue summaries."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/summary"
+
+    response = root_client.get(
+        url, query_string={"range": "48h", "granularity": "hour"}
+    )
+
+    assert response.status_code == 200
+    hourly = response.json["payload"]
+    assert len(hourly) == 48
+    expected = [0] * 48
+    for issue in (errors[0], rejections[0]):
+        expected[-1 - hours_ago(issue["created_at"])] += 1
+    assert hourly == expected
+
+    response = root_client.get(url, query_string={"range": "3d", "tz": "Asia/Tokyo"})
+
+    assert response.status_code == 200
+    assert len(response.json["payload"]) == 3
+    assert sum(response.json["payload"]) == 2
+
+
+def test_get_summary_invalid(root_client, projects):
+    """Test rejecting invalid summary parameters."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/summary"
+
+    for query in (
+        {"granularity": "week"},
+        {"range": "36h"},
+        {"range": "0d"},
+        {"range": "2000d"},
+        {"tz": "Mars/Olympus_Mons"},
+    ):
+        response = root_client.get(url, query_string=query)
+        assert response.status_code == 400, query
+
+
+def test_get_latest_issue(root_client, projects, errors, rejections):
+    """Test that the latest issue follows inserts and deletes."""
+    project_uuid = projects[0]["uuid"]
+    url = f"/api/projects/{project_uuid}/issues/latest"
+
+    response = root_client.get(url)
+
+    assert response.status_code == 200
+    assert response.json["payload"]["uuid"] == rejections[0]["uuid"]
+    assert response.json["payload"]["value"] == rejections[0]["value"]
+
+    root_client.delete(
+        f"/api/projects/{project_uuid}/issues/rejections/{rejections[0]['uuid']}"
+    )
+    response = root_client.get(url)
+
+    assert response.status_code == 200
+    assert response.json["payload"]["uuid"] == errors[0]["uuid"]
+    assert response.json["payload"]["name"] == errors[0]["name"]
+
+    root_client.delete(
+        f"/api/projects/{project_uuid}/issues/errors/{errors[0]['uuid']}"
+    )
+    response = root_client.get(url)
+
+    assert response.status_code == 404
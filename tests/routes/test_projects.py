@@ -33,24 +33,47 @@ def test_create_project(root_client, test_db):
 
 
 @mock_aws
-def test_delete_project(root_client, projects, test_db):
-    """Test deleting a project."""
+def test_delete_project(root_client, projects, errors, test_db, monkeypatch):
+    """Test deleting a project through a background purge job."""
     project_uuid = projects[0]["uuid"]
 
+    # Run the purge inline instead of in a background task
+    monkeypatch.setattr(
+        "app.routes.projects.start_background_job",
+        lambda func, *args: func(*args),
+    )
+
     # Verify the project exists in the database before deletion
     existing_project = TestDBQueries.get_project_by_uuid(test_db, project_uuid)
     assert (
         existing_project is not None
     ), "Project should exist in the database before deletion."
+    error_count = TestDBQueries.count_errors_by_project(test_db, project_uuid)
 
     response = root_client.delete(f"/api/projects/{project_uuid}")
 
-    assert response.status_code == 204
+    assert response.status_code == 202
+    job_uuid = response.json["payload"]["job_uuid"]
 
     # Verify the project no longer exists in the database
     existing_project = TestDBQueries.get_project_by_uuid(test_db, project_uuid)
     assert existing_project is None, "Project should not exist in the database."
 
+    # Progress stays visible after the project is gone
+    response = root_client.get(f"/api/projects/{project_uuid}/purges/{job_uuid}")
+
+    assert response.status_code == 200
+    assert response.json["payload"]["scope"] == "project"
+    assert response.json["payload"]["status"] == "completed"
+    assert response.json["payload"]["rows_deleted"] == error_count
+
+
+def test_delete_project_not_found(root_client, projects):
+    """Test deleting a project that does not exist."""
+    response = root_client.delete("/api/projects/missing-project-uuid")
+
+    assert response.status_code == 404
+
 
 def test_update_project(root_client, projects, test_db):
     """Test updating the name of a project."""
@@ -80,3 +103,34 @@ def test_update_project(root_client, projects, test_db):
 
     # Compare
     assert old_project_name != updated_project_name, "Project name should be updated."
+
+
+def test_update_project_retention(root_client, projects, test_db):
+    """Test setting and clearing a project's issue retention."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.put(
+        f"/api/projects/{project_uuid}/retention", json={"retention_days": 30}
+    )
+
+    assert response.status_code == 204
+    assert TestDBQueries.get_project_by_uuid(test_db, project_uuid)[6] == 30
+
+    response = root_client.put(
+        f"/api/projects/{project_uuid}/retention", json={"retention_days": None}
+    )
+
+    assert response.status_code == 204
+    assert TestDBQueries.get_project_by_uuid(test_db, project_uuid)[6] is None
+
+
+def test_update_project_retention_invalid(root_client, projects):
+    """Test rejecting a non-positive retention period."""
+    project_uuid = projects[0]["uuid"]
+
+    response = root_client.put(
+        f"/api/projects/{project_uuid}/retention", json={"retention_days": 0}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid retention days."
@@ -0,0 +1,212 @@
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.utils.archive import (
+    ARCHIVE_LOCK_KEY,
+    BLOCK_ROWS,
+    archive_issues,
+    compact_segments,
+    delete_project_archive,
+    find_archived_issue,
+    iter_archived_issues,
+    list_segments,
+    write_segment,
+)
+from tests.utils.mock_data import errors as mock_errors, rejections as mock_rejections
+from tests.utils.test_setup_helpers import insert_error_log, insert_rejection_log
+
+PROJECT_UUID = "project-uuid-123-456"
+
+
+def make_row(index, created_at, handled=False):
+    return {
+        "issue_type": "rejection",
+        "uuid": f"rejection-{index:05d}",
+        "created_at": created_at,
+        "value": f"value {index}",
+        "handled": handled,
+        "resolved": False,
+    }
+
+
+def test_write_segment_round_trip(tmp_path):
+    """Test that issues spanning several blocks are found by UUID and in order."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        make_row(i, start + timedelta(minutes=i), handled=i % 2 == 0)
+        for i in range(BLOCK_ROWS * 2 + 10)
+    ]
+    write_segment(str(tmp_path), PROJECT_UUID, "rejection", rows[:BLOCK_ROWS])
+    write_segment(str(tmp_path), PROJECT_UUID, "rejection", rows[BLOCK_ROWS:])
+
+    assert list_segments(str(tmp_path), PROJECT_UUID) == [
+        ("rejection", 2),
+        ("rejection", 1),
+    ]
+
+    for row in (rows[0], rows[BLOCK_ROWS + 3], rows[-1]):
+        found = find_archived_issue(
+            str(tmp_path), PROJECT_UUID, "rejection", row["uuid"]
+        )
+        assert found == row
+    assert find_archived_issue(str(tmp_path), PROJECT_UUID, "rejection", "x") is None
+    assert find_archived_issue(str(tmp_path), PROJECT_UUID, "error", "x") is None
+
+    archived = list(iter_archived_issues(str(tmp_path), PROJECT_UUID))
+    assert archived == rows[::-1]
+
+    since = start + timedelta(minutes=BLOCK_ROWS * 2)
+    handled = list(
+        iter_archived_issues(
+            str(tmp_path), PROJECT_UUID, handled="true", time=since.isoformat()
+        )
+    )
+    assert handled == [row for row in rows[::-1] if row["handled"]][:5]
+
+    delete_project_archive(str(tmp_path), PROJECT_UUID)
+    assert list(iter_archived_issues(str(tmp_path), PROJECT_UUID)) == []
+
+
+def test_compact_segments(tmp_path):
+    """Test that segments merge like a binary counter and keep every issue once."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [make_row(i, start + timedelta(minutes=i)) for i in range(BLOCK_ROWS * 4)]
+    counts = []
+    for batch in range(8):
+        write_segment(
+            str(tmp_path),
+            PROJECT_UUID,
+            "rejection",
+            rows[batch * BLOCK_ROWS // 2 : (batch + 1) * BLOCK_ROWS // 2],
+        )
+        compact_segments(str(tmp_path), PROJECT_UUID, "rejection")
+        counts.append(len(list_segments(str(tmp_path), PROJECT_UUID)))
+
+    assert counts == [1, 1, 2, 1, 2, 2, 3, 1]
+    assert list(iter_archived_issues(str(tmp_path), PROJECT_UUID)) == rows[::-1]
+    for row in (rows[0], rows[BLOCK_ROWS * 2 + 7], rows[-1]):
+        found = find_archived_issue(
+            str(tmp_path), PROJECT_UUID, "rejection", row["uuid"]
+        )
+        assert found == row
+
+    # Copies left by an interrupted compaction are merged back into one
+    write_segment(str(tmp_path), PROJECT_UUID, "rejection", rows)
+    assert compact_segments(str(tmp_path), PROJECT_UUID, "rejection") == 2
+    assert list(iter_archived_issues(str(tmp_path), PROJECT_UUID)) == rows[::-1]
+
+
+def test_write_segment_concurrent_writers(tmp_path):
+    """Test that two writers to one project never overwrite each other's segments."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [make_row(i, start + timedelta(minutes=i)) for i in range(400)]
+    barrier = threading.Barrier(2, timeout=10)
+
+    def write(offset):
+        for index in range(offset, len(rows), 2):
+            barrier.wait()
+            write_segment(str(tmp_path), PROJECT_UUID, "rejection", [rows[index]])
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(2)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    assert len(list_segments(str(tmp_path), PROJECT_UUID)) == len(rows)
+    assert list(iter_archived_issues(str(tmp_path), PROJECT_UUID)) == rows[::-1]
+
+
+def test_write_segment_rejects_unsafe_project(tmp_path):
+    """Test that project identifiers cannot escape the archive directory."""
+    with pytest.raises(ValueError):
+        write_segment(str(tmp_path), "../escape", "error", [])
+
+    assert list(iter_archived_issues(str(tmp_path), "../escape")) == []
+
+
+def test_archive_issues(db_connection, projects, test_db, tmp_path):
+    """Test that old issues move to the archive and leave the aggregates."""
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    insert_error_log(test_db, {**mock_errors[0], "created_at": old})
+    insert_error_log(test_db, mock_errors[1])
+    insert_rejection_log(test_db, {**mock_rejections[0], "created_at": old})
+
+    summary = archive_issues(db_connection, str(tmp_path), 30, log=lambda _: None)
+
+    assert summary == {"error": 1, "rejection": 1}
+    test_db.execute(
+        "SELECT uuid FROM error_logs UNION ALL SELECT uuid FROM rejection_logs"
+    )
+    assert test_db.fetchall() == [(mock_errors[1]["uuid"],)]
+    test_db.execute("SELECT occurrences FROM error_groups WHERE project_id = 1")
+    assert test_db.fetchall() == []
+
+    error = find_archived_issue(
+        str(tmp_path), PROJECT_UUID, "error", mock_errors[0]["uuid"]
+    )
+    assert error["created_at"] == old
+    assert error["contexts"] == mock_errors[0]["contexts"]
+    assert error["error_hash"] == mock_errors[0]["error_hash"]
+
+    archived = list(iter_archived_issues(str(tmp_path), PROJECT_UUID))
+    assert [(row["issue_type"], row["uuid"]) for row in archived] == [
+        ("rejection", mock_rejections[0]["uuid"]),
+        ("error", mock_errors[0]["uuid"]),
+    ]
+
+    summary = archive_issues(db_connection, str(tmp_path), 30, log=lambda _: None)
+    assert summary == {"error": 0, "rejection": 0}
+
+
+def test_archive_issues_compacts_segments(db_connection, projects, test_db, tmp_path):
+    """Test that a run of small batches leaves a project with few segments."""
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    for index in range(8):
+        insert_error_log(
+            test_db,
+            {
+                **mock_errors[0],
+                "uuid": f"00000000-0000-4000-8000-{index:012d}",
+                "created_at": old + timedelta(minutes=index),
+            },
+        )
+
+    summary = archive_issues(
+        db_connection, str(tmp_path), 30, batch_size=1, log=lambda _: None
+    )
+
+    assert summary == {"error": 8, "rejection": 0}
+    assert [segment[0] for segment in list_segments(str(tmp_path), PROJECT_UUID)] == [
+        "error"
+    ]
+    archived = list(iter_archived_issues(str(tmp_path), PROJECT_UUID))
+    assert [row["created_at"] for row in archived] == [
+        old + timedelta(minutes=index) for index in reversed(range(8))
+    ]
+
+
+def test_archive_issues_waits_for_running_archive(
+    db_connection, projects, test_db, tmp_path
+):
+    """Test that an archive run waits until an overlapping one has finished."""
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    insert_error_log(test_db, {**mock_errors[0], "created_at": old})
+    test_db.execute("SELECT pg_advisory_lock(%s)", [ARCHIVE_LOCK_KEY])
+    summaries = []
+
+    run = threading.Thread(
+        target=lambda: summaries.append(
+            archive_issues(db_connection, str(tmp_path), 30, log=lambda _: None)
+        )
+    )
+    try:
+        run.start()
+        run.join(0.5)
+        assert run.is_alive()
+        assert list_segments(str(tmp_path), PROJECT_UUID) == []
+    finally:
+        test_db.execute("SELECT pg_advisory_unlock(%s)", [ARCHIVE_LOCK_KEY])
+        run.join()
+
+    assert summaries == [{"error": 1, "rejection": 0}]
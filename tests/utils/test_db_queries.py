@@ -112,3 +112,14 @@ class TestDBQueries:
     def update_rejection_resolved_status(cursor, rejection_uuid, resolved):
         query = "UPDATE rejection_logs SET resolved = %s WHERE uuid = %s;"
         cursor.execute(query, (resolved, rejection_uuid))
+
+    @staticmethod
+    def get_error_group(cursor, project_uuid, error_hash):
+        query = """
+        SELECT occurrences, unresolved_occurrences, resolved, representative_uuid
+        FROM error_groups
+        WHERE project_id = (SELECT id FROM projects WHERE uuid = %s)
+        AND error_hash = %s;
+        """
+        cursor.execute(query, (project_uuid, error_hash))
+        return cursor.fetchone()
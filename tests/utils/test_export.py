@@ -0,0 +1,61 @@
+import gzip
+import zlib
+from datetime import datetime, timezone
+
+from app.utils import chunked, csv_lines, gzip_chunks, ndjson_lines
+
+
+def test_chunked_groups_lines():
+    """Test that lines are joined into chunks of at least the chunk size."""
+    chunks = list(chunked(["ab\n", "cd\n", "ef\n", "gh\n"], chunk_size=5))
+
+    assert chunks == [b"ab\n", b"cd\nef\n", b"gh\n"]
+
+
+def test_chunked_flushes_on_interval():
+    """Test that a partial chunk is sent once the flush interval has passed."""
+    times = iter([0.0, 0.5, 1.0, 1.2, 1.4])
+
+    chunks = list(
+        chunked(
+            ["ab\n", "cd\n", "ef\n", "gh\n", "ij\n"],
+            chunk_size=100,
+            flush_interval=1.0,
+            clock=lambda: next(times),
+        )
+    )
+
+    assert chunks == [b"ab\n", b"cd\nef\n", b"gh\nij\n"]
+
+
+def test_gzip_chunks_round_trip():
+    """Test that compressed chunks form one gzip stream."""
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [{"uuid": str(n), "created_at": created_at} for n in range(1000)]
+
+    data = b"".join(gzip_chunks(chunked(ndjson_lines(rows), chunk_size=100)))
+
+    lines = gzip.decompress(data).decode().splitlines()
+    assert len(lines) == 1000
+    assert lines[0] == '{"uuid":"0","created_at":"2025-01-01T00:00:00+00:00"}'
+
+
+def test_gzip_chunks_flushes_each_chunk():
+    """Test that every chunk can be decompressed as soon as it is sent."""
+    stream = gzip_chunks([b"first\n", b"second\n"])
+    decompressor = zlib.decompressobj(wbits=31)
+
+    assert decompressor.decompress(next(stream)) == b"first\n"
+    assert decompressor.decompress(next(stream)) == b"second\n"
+
+
+def test_csv_lines_encodes_nested_values():
+    """Test that CSV rows JSON-encode nested values and keep the column order."""
+    rows = [{"uuid": "a", "contexts": {"tenant": "acme"}, "line_number": None}]
+
+    lines = list(csv_lines(rows, ["uuid", "line_number", "contexts"]))
+
+    assert lines == [
+        "uuid,line_number,contexts\r\n",
+        'a,,"{""tenant"": ""acme""}"\r\n',
+    ]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from app.utils.partitions import maintain_partitions, partition_name, period_start
+from tests.utils.mock_data import errors as mock_errors
+from tests.utils.test_setup_helpers import insert_error_log
+from tests.utils.test_db_queries import TestDBQueries
+
+
+def insert_error_at(cursor, uuid, created_at):
+    insert_error_log(
+        cursor, {**mock_errors[0], "uuid": uuid, "created_at": created_at}
+    )
+
+
+def test_maintain_partitions_creates_partitions(db_connection, projects, test_db):
+    """Test that partitions are pre-created and take over rows in their range."""
+    now = datetime.now(timezone.utc)
+    insert_error_at(test_db, "error-uuid-now", now)
+
+    summary = maintain_partitions(db_connection, premake=2, log=lambda _: None)
+
+    assert summary == {"created": 6, "dropped": 0, "deleted": 0}
+    test_db.execute(
+        "SELECT tableoid::regclass::text FROM error_logs WHERE uuid = %s",
+        ["error-uuid-now"],
+    )
+    assert test_db.fetchone()[0] == partition_name(
+        "error_logs", period_start(now, "month")
+    )
+
+
+def test_maintain_partitions_drops_expired(db_connection, projects, test_db):
+    """Test that expired partitions are dropped along with their aggregates."""
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=400)
+    maintain_partitions(db_connection, premake=0, now=old, log=lambda _: None)
+    insert_error_at(test_db, "error-uuid-old", old)
+
+    project_uuid = projects[0]["uuid"]
+    error_hash = mock_errors[0]["error_hash"]
+    assert TestDBQueries.get_error_group(test_db, project_uuid, error_hash)
+
+    summary = maintain_partitions(
+        db_connection, premake=0, retention_days=30, log=lambda _: None
+    )
+
+    assert summary["dropped"] >= 2
+    assert TestDBQueries.count_errors_by_project(test_db, project_uuid) == 0
+    assert TestDBQueries.get_error_group(test_db, project_uuid, error_hash) is None
+    for rollup in ("issue_rollups", "issue_facets"):
+        test_db.execute(f"SELECT COALESCE(SUM(issue_count), 0) FROM {rollup}")
+        assert test_db.fetchone()[0] == 0
+
+
+def test_maintain_partitions_project_retention(db_connection, projects, test_db):
+    """Test that a project's shorter retention deletes its expired rows."""
+    now = datetime.now(timezone.utc)
+    project_uuid = projects[0]["uuid"]
+    test_db.execute(
+        "UPDATE projects SET retention_days = 1 WHERE uuid = %s", [project_uuid]
+    )
+    insert_error_at(test_db, "error-uuid-old", now - timedelta(days=5))
+    insert_error_at(test_db, "error-uuid-new", now)
+
+    summary = maintain_partitions(db_connection, premake=0, log=lambda _: None)
+
+    assert summary["deleted"] == 1
+    assert TestDBQueries.count_errors_by_project(test_db, project_uuid) == 1
+    test_db.execute(
+        """
+        SELECT SUM(issue_count) FROM project_issue_counters
+        WHERE project_id = (SELECT id FROM projects WHERE uuid = %s)
+        """,
+        [project_uuid],
+    )
+    assert test_db.fetchone()[0] == 1
+
+
+def test_maintain_partitions_deletes_unreferenced_stack_traces(
+    db_connection, projects, test_db
+):
+    """Test that stack traces outlive only the errors that reference them."""
+    now = datetime.now(timezone.utc)
+    insert_error_at(test_db, "error-uuid-1", now)
+    insert_error_log(
+        test_db,
+        {
+            **mock_errors[0],
+            "uuid": "error-uuid-2",
+            "created_at": now,
+            "stack_trace": "Other Stack",
+        },
+    )
+    test_db.execute("DELETE FROM error_logs WHERE uuid = 'error-uuid-2'")
+
+    maintain_partitions(db_connection, premake=0, log=lambda _: None)
+
+    test_db.execute("SELECT stack_trace FROM stack_traces")
+    assert test_db.fetchall() == [(mock_errors[0]["stack_trace"],)]
@@ -10,7 +10,15 @@ def clean_up_database(cursor):
     cursor.execute(
         """
         TRUNCATE TABLE
+            purge_jobs,
+            issue_facets,
+            project_latest_issues,
+            issue_rollups,
+            project_issue_counters,
+            error_group_hourly_sketches,
+            error_groups,
             error_logs,
+            stack_traces,
             rejection_logs,
             projects_users,
             projects,
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from app.utils.synthetic_data import seed_synthetic_data
+
+NOW = datetime(2024, 3, 15, 12, tzinfo=timezone.utc)
+
+
+def seed(connection, **overrides):
+    options = {
+        "projects": 2,
+        "users": 5,
+        "errors": 3000,
+        "rejections": 500,
+        "groups": 40,
+        "seed": 1,
+        "now": NOW,
+        "log": lambda _: None,
+        **overrides,
+    }
+    return seed_synthetic_data(connection, **options)
+
+
+def test_seed_synthetic_data(db_connection, test_db):
+    """Test that seeded rows match what the row trigger and aggregates produce."""
+    test_db.execute(
+        "SELECT count(*) FROM pg_indexes WHERE tablename = ANY(%s)",
+        [["error_logs", "rejection_logs"]],
+    )
+    index_count = test_db.fetchone()[0]
+
+    summary = seed(db_connection)
+
+    assert summary == {"projects": 2, "users": 5, "errors": 3000, "rejections": 500}
+    test_db.execute(
+        """
+        SELECT count(*), min(created_at), max(created_at), count(*) FILTER (
+          WHERE e.search_vector = error_search_vector(name, message, st.stack_trace)
+        )
+        FROM error_logs e JOIN stack_traces st ON st.digest = e.stack_trace_digest
+        """
+    )
+    count, first, last, documented = test_db.fetchone()
+    assert count == documented == 3000
+    assert NOW - timedelta(days=30) <= first and last <= NOW
+
+    test_db.execute("SELECT sum(occurrences) FROM error_groups")
+    assert test_db.fetchone()[0] == 3000
+    test_db.execute("SELECT count(*) FROM rejection_logs")
+    assert test_db.fetchone()[0] == 500
+    test_db.execute(
+        "SELECT count(DISTINCT user_id), count(DISTINCT project_id) FROM projects_users"
+    )
+    assert test_db.fetchone() == (5, 2)
+
+    test_db.execute(
+        "SELECT count(*) FROM pg_indexes WHERE tablename = ANY(%s)",
+        [["error_logs", "rejection_logs"]],
+    )
+    assert test_db.fetchone()[0] == index_count
+    test_db.execute(
+        """
+        SELECT DISTINCT tgenabled FROM pg_trigger
+        WHERE tgname = 'error_logs_before_write'
+        """
+    )
+    assert test_db.fetchall() == [("O",)]
+
+
+def test_seed_synthetic_data_is_skewed(db_connection, test_db):
+    """Test that a few error groups account for most errors."""
+    seed(db_connection, projects=1, errors=5000, rejections=0)
+
+    test_db.execute(
+        "SELECT count(*) FROM error_logs GROUP BY error_hash ORDER BY 1 DESC"
+    )
+    counts = [row[0] for row in test_db.fetchall()]
+    assert sum(counts[:5]) > sum(counts) / 3
+    assert counts[0] > 10 * counts[len(counts) // 2]